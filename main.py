@@ -6,6 +6,8 @@ TicTacToe field divided into nine inner TicTacToe fields, forming a 3x3 grid. Pl
 the inner fields, and the goal is to win the game by achieving victory in the outer field.
 
 The program uses the `TicTacToe_Board_2_layers` class from the `src.board` module to represent and manage the game board.
+The rules and the course of a game are handled by the headless `GameSession` class from the `src.game` module; this
+program only renders the session and forwards the clicks of the players to it.
 
 Note: For a better understanding of the code, it may be helpful to familiarize yourself with the rules of the game.
       To view the rules, you could search for "meta-TicTacToe" on Wikipedia or read the README.
@@ -14,6 +16,18 @@ Controls:
     - Click on an empty cell in the inner field to make a move.
     - The game ends when a player wins the outer field or when there is a draw.
 
+Game modes:
+    - Human vs Human (default): Both players click their moves.
+    - Human vs AI: The computer opponent from the `src.engine` module plays one side. It searches each move
+      within a fixed time budget and shows its search depth and speed (nodes per second) in the window title.
+      With `--book`, it plays the first moves from an opening book (`src.book`) instead of searching them.
+      With `--tablebase`, it plays the endgames in an endgame tablebase (`src.tablebase`) perfectly without searching.
+
+Profiling:
+    - With `--profile PATH` (or the environment variable TTT_PROFILE=PATH), the `src.instrumentation` module times
+      the frames, the event handling, the rendering, the moves, the win and draw checks and the AI searches. The
+      timings are shown in an overlay and written as JSON at exit. `--cprofile PATH` (TTT_CPROFILE) also runs cProfile.
+
 Dependencies:
     - Pygame library
     - 'game_background.jpeg' image in the 'assets/images' directory for the game background.
@@ -21,17 +35,21 @@ Dependencies:
 Usage:
     - Ensure the Pygame library is installed (`pip install pygame`).
     - Run the script to start the 2-layered-TicTacToe game.
+    - Run `python main.py --mode human-vs-ai` to play against the computer (see `python main.py --help`).
 """
 
 from src.board import TicTacToe_Board_2_layers
-import pygame
+from src.game import GameSession
+from src import instrumentation
+import argparse
+import os
 import sys
 import time
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Start Setup everything ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-# Pygame initialization.
-pygame.display.init()
-pygame.font.init()
+# Pygame is imported on first use (see `import_pygame`), so that tools importing this module for the board or the
+# coordinate helpers do not load SDL. Nothing here initializes the display, loads assets or creates a game.
+pygame = None
 
 # Screen dimensions.
 SCREEN_WIDTH, SCREEN_HEIGHT = 1000, 1000
@@ -52,6 +70,18 @@ OUTER_LINE_THICKNESS = 5
 INNER_LINE_THICKNESS = 3
 PLAYERS_SYMBOL_THICKNESS = 3
 
+# Upper limit of the frame rate of the game loop.
+MAX_FRAMES_PER_SECOND = 60
+
+# Profiling overlay (only drawn if the instrumentation is enabled): the timings shown, their font size and the
+# interval in milliseconds in which it is refreshed while the game waits for a click.
+OVERLAY_NAMES = ['frame', 'events', 'render', 'TicTacToe_Board_2_layers.push', 'TicTacToe_Board_2_layers.make_move',
+                 'TicTacToe_Board_2_layers.check_for_win_inner_field', 'TicTacToe_Board_2_layers.check_for_win_outer_field',
+                 'AlphaBetaEngine.search', 'BookEngine.search', 'TablebaseEngine.search']
+OVERLAY_FONT_SIZE = 20
+OVERLAY_REFRESH_INTERVAL = 500
+OVERLAY_RECT = (0, 0, SCREEN_WIDTH, OVERLAY_FONT_SIZE * len(OVERLAY_NAMES) + 10)
+
 # Coordinates of grid reference points for cell positions (top left of a cell).
 GRID_REFERENCE_POINTS = {
     f'{["top", "mid", "bottom"][row]}-{["left", "mid", "right"][col]}': (col * SCREEN_WIDTH // 3, row * SCREEN_HEIGHT // 3)
@@ -59,40 +89,283 @@ GRID_REFERENCE_POINTS = {
     for col in range(3)
 }
 
-# Loading background image.
-BACKGROUND_IMAGE = pygame.transform.scale(pygame.image.load('assets/images/game_background.jpeg'), (SCREEN_WIDTH, SCREEN_HEIGHT))
+# Background image and its copy scaled to the screen size. Decoding and scaling the JPEG takes tens of
+# milliseconds, the cached bitmap loads in about one.
+BACKGROUND_IMAGE_PATH = 'assets/images/game_background.jpeg'
+BACKGROUND_CACHE_PATH = f'assets/cache/game_background_{SCREEN_WIDTH}x{SCREEN_HEIGHT}.bmp'
+
+def import_pygame():
+    """
+    Import Pygame into the namespace of this module (only the first call does the work).
+
+    Usage:
+        import_pygame()
+    """
+    global pygame
+    import pygame
+
+def load_background_image() -> "pygame.Surface":
+    """
+    Load the background image in the size of the game screen, converted to the pixel format of the display.
+
+    The scaled image is cached as an uncompressed bitmap on disk and reused as long as it is not older than the
+    original image. If the cache cannot be written (e.g., a read-only installation), the image is scaled on every start.
+
+    Returns:
+        pygame.Surface: The background image.
+
+    Usage:
+        background_image = load_background_image()
+    """
+    try:
+        cache_is_valid = os.path.getmtime(BACKGROUND_CACHE_PATH) >= os.path.getmtime(BACKGROUND_IMAGE_PATH)
+    except OSError:
+        cache_is_valid = False
+
+    if cache_is_valid:
+        background_image = pygame.image.load(BACKGROUND_CACHE_PATH)
+    else:
+        background_image = pygame.transform.scale(pygame.image.load(BACKGROUND_IMAGE_PATH), (SCREEN_WIDTH, SCREEN_HEIGHT))
+        try:
+            os.makedirs(os.path.dirname(BACKGROUND_CACHE_PATH), exist_ok=True)
+            pygame.image.save(background_image, BACKGROUND_CACHE_PATH)
+        except (OSError, pygame.error):
+            pass
+
+    # A surface in the pixel format of the display is blitted without conversion.
+    return background_image.convert()
+
+class TicTacToeApp:
+    """
+    The state of the program: the game session, the window and the background image, each created on first use.
 
-# Pygame screen setup.
-game_screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("2-layered-TicTacToe")
+    Attributes:
+        game_session (GameSession): The session of the game, created on first access.
+        game_board (TicTacToe_Board_2_layers): The board of the game session.
+        game_screen (pygame.Surface): The window surface. Pygame and the display are initialized on first access.
+        background_image (pygame.Surface): The background image, loaded on first access (needs the window).
+    """
 
-# Initialize the game board.
-active_game_board = TicTacToe_Board_2_layers()
+    def __init__(self):
+        """
+        Create the app without touching Pygame.
+
+        Usage:
+            app = TicTacToeApp()
+        """
+        self._game_session = None
+        self._game_screen = None
+        self._background_image = None
+
+    @property
+    def game_session(self) -> GameSession:
+        if self._game_session is None:
+            self._game_session = GameSession()
+        return self._game_session
+
+    @property
+    def game_board(self) -> TicTacToe_Board_2_layers:
+        return self.game_session.board
+
+    @property
+    def game_screen(self) -> "pygame.Surface":
+        if self._game_screen is None:
+            # Pygame initialization and screen setup.
+            import_pygame()
+            pygame.display.init()
+            pygame.font.init()
+            self._game_screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("2-layered-TicTacToe")
+        return self._game_screen
+
+    @property
+    def background_image(self) -> "pygame.Surface":
+        if self._background_image is None:
+            self.game_screen  # Converting the image to the display format needs the window.
+            self._background_image = load_background_image()
+        return self._background_image
+
+# The app of this program. Creating it is cheap, everything else happens on first use.
+app = TicTacToeApp()
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ End Setup everything ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
 
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Start Sprite cache ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+# Pre-rendered surfaces of everything drawn during a game, so that drawing is a blit instead of rasterizing
+# primitives and text (and constructing fonts) in every frame. The cache is built on first use and has to be
+# invalidated when the window size changes.
+SPRITE_CACHE = {}
+
+# Space around the symbol sprites, since symbols and lines reach a few pixels beyond their cell.
+SPRITE_MARGIN = OUTER_LINE_THICKNESS
+
+# Color of the transparent pixels of the sprites. The primitives are drawn without antialiasing, so a color key
+# (with run-length encoding, which skips transparent runs) is lossless and blits faster than per-pixel alpha.
+SPRITE_COLOR_KEY = (255, 0, 255)
+
+def new_sprite(width, height) -> "pygame.Surface":
+    """
+    Create a transparent surface for a sprite, including the sprite margin on each side.
+
+    Args:
+        width (int): The width of the sprite without margin.
+        height (int): The height of the sprite without margin.
+
+    Returns:
+        pygame.Surface: The transparent surface.
+    """
+    sprite = pygame.Surface((width + 2 * SPRITE_MARGIN, height + 2 * SPRITE_MARGIN))
+    sprite.fill(SPRITE_COLOR_KEY)
+    sprite.set_colorkey(SPRITE_COLOR_KEY, pygame.RLEACCEL)
+    return sprite
+
+def build_sprite_cache():
+    """
+    Render all sprites and texts once and store them in the sprite cache.
+
+    The sprites of the player symbols are stored under the key (player, cell size) for the cells of the inner
+    fields and of the outer field. The sprites are drawn with the same primitives and offsets as the board used
+    to draw directly on the game screen, shifted by the sprite margin.
+
+    Usage:
+        build_sprite_cache()
+    """
+    SPRITE_CACHE.clear()
+    offset = SPRITE_MARGIN
+
+    # Small player symbols in the cells of the inner fields. Added some constants for better looking (no overlap with field lines).
+    x_sprite = new_sprite(CELL_SIZE_INNER_FIELD, CELL_SIZE_INNER_FIELD)
+    pygame.draw.line(x_sprite, PLAYER_X_COLOR, (offset + 2.5, offset + 2.5),
+                     (offset + CELL_SIZE_INNER_FIELD - 2.5, offset + CELL_SIZE_INNER_FIELD - 2.5), PLAYERS_SYMBOL_THICKNESS)
+    pygame.draw.line(x_sprite, PLAYER_X_COLOR, (offset + CELL_SIZE_INNER_FIELD - 2.5, offset + 2.5),
+                     (offset + 2.5, offset + CELL_SIZE_INNER_FIELD - 2.5), PLAYERS_SYMBOL_THICKNESS)
+    SPRITE_CACHE[(TicTacToe_Board_2_layers.PLAYER_X, CELL_SIZE_INNER_FIELD)] = x_sprite
+
+    o_sprite = new_sprite(CELL_SIZE_INNER_FIELD, CELL_SIZE_INNER_FIELD)
+    pygame.draw.circle(o_sprite, PLAYER_O_COLOR, (offset + CELL_SIZE_INNER_FIELD // 2, offset + CELL_SIZE_INNER_FIELD // 2),
+                       CELL_SIZE_INNER_FIELD // 2.1, PLAYERS_SYMBOL_THICKNESS)
+    SPRITE_CACHE[(TicTacToe_Board_2_layers.PLAYER_O, CELL_SIZE_INNER_FIELD)] = o_sprite
+
+    # Big player symbols in the cells of the outer field (won inner fields).
+    x_sprite = new_sprite(CELL_SIZE_OUTER_FIELD, CELL_SIZE_OUTER_FIELD)
+    pygame.draw.line(x_sprite, PLAYER_X_COLOR, (offset, offset),
+                     (offset + CELL_SIZE_OUTER_FIELD, offset + CELL_SIZE_OUTER_FIELD), PLAYERS_SYMBOL_THICKNESS)
+    pygame.draw.line(x_sprite, PLAYER_X_COLOR, (offset, offset + CELL_SIZE_OUTER_FIELD),
+                     (offset + CELL_SIZE_OUTER_FIELD, offset), PLAYERS_SYMBOL_THICKNESS)
+    SPRITE_CACHE[(TicTacToe_Board_2_layers.PLAYER_X, CELL_SIZE_OUTER_FIELD)] = x_sprite
+
+    o_sprite = new_sprite(CELL_SIZE_OUTER_FIELD, CELL_SIZE_OUTER_FIELD)
+    pygame.draw.circle(o_sprite, PLAYER_O_COLOR, (offset + CELL_SIZE_OUTER_FIELD // 2, offset + CELL_SIZE_OUTER_FIELD // 2),
+                       CELL_SIZE_OUTER_FIELD // 2, PLAYERS_SYMBOL_THICKNESS)
+    SPRITE_CACHE[(TicTacToe_Board_2_layers.PLAYER_O, CELL_SIZE_OUTER_FIELD)] = o_sprite
+
+    # Grid of an inner field.
+    inner_grid = new_sprite(3 * CELL_SIZE_INNER_FIELD, 3 * CELL_SIZE_INNER_FIELD)
+    for i in range(1, 3):
+        position = offset + i * CELL_SIZE_INNER_FIELD
+        pygame.draw.line(inner_grid, INNER_FIELD_LINE_COLOR, (position, offset), (position, offset + 3 * CELL_SIZE_INNER_FIELD), INNER_LINE_THICKNESS)
+        pygame.draw.line(inner_grid, INNER_FIELD_LINE_COLOR, (offset, position), (offset + 3 * CELL_SIZE_INNER_FIELD, position), INNER_LINE_THICKNESS)
+    SPRITE_CACHE['inner_grid'] = inner_grid
+
+    # Grid of the outer field, covering the whole game screen (no margin needed).
+    outer_grid = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    outer_grid.fill(SPRITE_COLOR_KEY)
+    outer_grid.set_colorkey(SPRITE_COLOR_KEY, pygame.RLEACCEL)
+    for x in range(SCREEN_WIDTH // 3, SCREEN_WIDTH - 1, SCREEN_WIDTH // 3): # The "-1" ensures that a third line is not drawn.
+        pygame.draw.line(outer_grid, OUTER_FIELD_LINE_COLOR, (x, 0), (x, SCREEN_HEIGHT), OUTER_LINE_THICKNESS)
+    for y in range(SCREEN_HEIGHT // 3, SCREEN_HEIGHT - 1, SCREEN_HEIGHT // 3):
+        pygame.draw.line(outer_grid, OUTER_FIELD_LINE_COLOR, (0, y), (SCREEN_WIDTH, y), OUTER_LINE_THICKNESS)
+    SPRITE_CACHE['outer_grid'] = outer_grid
+
+    # Texts.
+    draw_symbol_font = get_font(CELL_SIZE_OUTER_FIELD)
+    SPRITE_CACHE['draw_symbol'] = draw_symbol_font.render(TicTacToe_Board_2_layers.DRAW_SYMBOL, True, DRAW_SYMBOL_COLOR)
+    end_screen_font = get_font(75)
+    for player in [TicTacToe_Board_2_layers.PLAYER_X, TicTacToe_Board_2_layers.PLAYER_O]:
+        SPRITE_CACHE[('winner_text', player)] = end_screen_font.render(f"Player {player} wins!", True, (0, 0, 0))
+    SPRITE_CACHE['draw_text'] = end_screen_font.render("It's a draw!", True, (0, 0, 0))
+
+    # Convert the sprites to the pixel format of the display for fast blits (only possible with a window).
+    # The texts are antialiased and keep their alpha channel.
+    if pygame.display.get_surface() is not None:
+        for key, sprite in SPRITE_CACHE.items():
+            SPRITE_CACHE[key] = sprite.convert_alpha() if sprite.get_flags() & pygame.SRCALPHA else sprite.convert()
+
+# Fonts by size, created on first use. Constructing a font loads and parses the font file.
+FONT_CACHE = {}
+
+def get_font(size) -> "pygame.font.Font":
+    """
+    Return the default font in a size, creating it on first use.
+
+    Args:
+        size (int): The font size in pixels.
+
+    Returns:
+        pygame.font.Font: The font.
+
+    Usage:
+        text_surface = get_font(20).render("text", True, (255, 255, 255))
+    """
+    font = FONT_CACHE.get(size)
+    if font is None:
+        font = FONT_CACHE[size] = pygame.font.Font(None, size)
+    return font
+
+def get_sprite(key) -> "pygame.Surface":
+    """
+    Return a sprite from the sprite cache, building the cache on first use.
+
+    Args:
+        key: The key of the sprite, e.g., ('X', CELL_SIZE_INNER_FIELD), 'inner_grid' or 'draw_text'.
+
+    Returns:
+        pygame.Surface: The sprite.
+
+    Usage:
+        app.game_screen.blit(get_sprite('inner_grid'), (x, y))
+    """
+    if not SPRITE_CACHE:
+        build_sprite_cache()
+    return SPRITE_CACHE[key]
+
+def invalidate_sprite_cache():
+    """
+    Drop all sprites, so that they are rendered again on next use (e.g., after the window size changed).
+
+    Usage:
+        invalidate_sprite_cache()
+    """
+    SPRITE_CACHE.clear()
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ End Sprite cache ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~ Start Functions for drawing everything ~~~~~~~~~~~~~~~~~~~~~~~~ #
-def draw_game_board(no_needed_inner_fields):
+def draw_game_board(no_needed_inner_fields, dirty_rect=None):
     """
     Draw the entire game board, including outer and inner fields, on the game screen.
 
+    With a dirty rectangle, the drawing is clipped to it and only that part of the display is updated. Clipped
+    drawing costs little, since only the pixels inside the rectangle are blitted and rasterized.
+
     Args:
         no_needed_inner_fields (list): A list of outer field positions that have already been won and do not need to be drawn.
+        dirty_rect (pygame.Rect): The part of the game screen to redraw, None for the whole game screen.
 
     Usage:
         draw_game_board(['top-left', 'top-mid', ...])
 
     Note:
-        This function assumes the existence of certain global variables, such as `game_screen`, `BACKGROUND_IMAGE`,
-        `OUTER_FIELD_LINE_COLOR`, `OUTER_LINE_THICKNESS`, `GRID_REFERENCE_POINTS`, and others. Ensure these variables
-        are defined before calling this function.
+        This function draws the board of `app` on its game screen and assumes the existence of certain global variables,
+        such as `GRID_REFERENCE_POINTS` and the sprite cache. The window is opened on first use.
     """
+    app.game_screen.set_clip(dirty_rect)
+
     # Draw the background.
-    game_screen.blit(BACKGROUND_IMAGE, (0, 0)) 
+    app.game_screen.blit(app.background_image, (0, 0)) 
     
     # ~~~~~~~~~~~~~~ Start Draw inner field (white) ~~~~~~~~~~~~~~ #
     # Draw the inner fields 9x based on the reference points in "GRID_REFERENCE_POINTS." 
     # Each field is drawn individually, as they need to be modified independently during the game.
-    for pos_outer_field in active_game_board.OUTER_FIELD_POSITIONS:
+    for pos_outer_field in app.game_board.OUTER_FIELD_POSITIONS:
         # Only draw inner fields that have not been won yet. If so, this cell only needs a player or draw symbol.
         if pos_outer_field not in no_needed_inner_fields:
             reference_point = GRID_REFERENCE_POINTS[pos_outer_field]
@@ -100,36 +373,89 @@ def draw_game_board(no_needed_inner_fields):
     # ~~~~~~~~~~~~~~~ End Draw inner field (white) ~~~~~~~~~~~~~~~ #
     
     # ~~~~~~~~~~~~~~~ Start Draw outer field (red) ~~~~~~~~~~~~~~~ #
-    # Draw vertikal lines
-    for x in range(SCREEN_WIDTH // 3, SCREEN_WIDTH - 1, SCREEN_WIDTH // 3): # The "-1" ensures that a third line is not drawn.
-        pygame.draw.line(game_screen, OUTER_FIELD_LINE_COLOR, (x, 0), (x, SCREEN_HEIGHT), OUTER_LINE_THICKNESS)
-        
-    # Draw horizontal lines
-    for y in range(SCREEN_HEIGHT // 3, SCREEN_HEIGHT - 1, SCREEN_HEIGHT // 3): # The "-1" ensures that a third line is not drawn.
-        pygame.draw.line(game_screen, OUTER_FIELD_LINE_COLOR, (0, y), (SCREEN_WIDTH, y), OUTER_LINE_THICKNESS)
+    app.game_screen.blit(get_sprite('outer_grid'), (0, 0))
     # ~~~~~~~~~~~~~~~~ End Draw outer field (red) ~~~~~~~~~~~~~~~~ #
     
     # Draw all player-pick symbols by looping through (only small symbols in inner fields).
-    for pos_outer_field in active_game_board.OUTER_FIELD_POSITIONS:
-        inner_field = active_game_board.board_status[pos_outer_field]
+    # The board status is a view built from the bitboards, so it is fetched once per frame.
+    board_status = app.game_board.board_status
+    for pos_outer_field in app.game_board.OUTER_FIELD_POSITIONS:
+        inner_field = board_status[pos_outer_field]
         # Check if the inner field has not been won or is not a draw yet. If yes, it is represented by a list (game field not finished).
         if type(inner_field) == list:
             for row_inner_field in range(3):
                 for col_inner_field in range(3):
                     # Check which player symbol is in the current cell.
-                    if inner_field[row_inner_field][col_inner_field] == active_game_board.PLAYER_X:
-                        draw_player_symbol(game_screen, (pos_outer_field, row_inner_field, col_inner_field), active_game_board.PLAYER_X)
-                    elif inner_field[row_inner_field][col_inner_field] == active_game_board.PLAYER_O:
-                        draw_player_symbol(game_screen, (pos_outer_field, row_inner_field, col_inner_field), active_game_board.PLAYER_O)
+                    if inner_field[row_inner_field][col_inner_field] == app.game_board.PLAYER_X:
+                        draw_player_symbol(app.game_screen, (pos_outer_field, row_inner_field, col_inner_field), app.game_board.PLAYER_X)
+                    elif inner_field[row_inner_field][col_inner_field] == app.game_board.PLAYER_O:
+                        draw_player_symbol(app.game_screen, (pos_outer_field, row_inner_field, col_inner_field), app.game_board.PLAYER_O)
         # Inner field is already won. Draw a bigger player symbol.              
-        elif type(inner_field) == str and inner_field in [active_game_board.PLAYER_O, active_game_board.PLAYER_X]:
-            draw_inner_field_win(game_screen, pos_outer_field, inner_field)
+        elif type(inner_field) == str and inner_field in [app.game_board.PLAYER_O, app.game_board.PLAYER_X]:
+            draw_inner_field_win(app.game_screen, pos_outer_field, inner_field)
         # Inner field is a draw. Draw a big draw symbol.    
-        elif type(inner_field) == str and inner_field == active_game_board.DRAW_SYMBOL:
-            draw_inner_field_draw(game_screen, pos_outer_field)
+        elif type(inner_field) == str and inner_field == app.game_board.DRAW_SYMBOL:
+            draw_inner_field_draw(app.game_screen, pos_outer_field)
     
-    # Display all drawings on the game board. 
-    pygame.display.update()
+    # The profiling overlay is part of the board, so that redrawing the board does not erase it.
+    if instrumentation.enabled:
+        draw_profiling_overlay()
+
+    # Display all drawings on the game board (or only the redrawn part of it).
+    app.game_screen.set_clip(None)
+    if dirty_rect is None:
+        pygame.display.update()
+    else:
+        pygame.display.update(dirty_rect)
+
+def draw_profiling_overlay():
+    """
+    Draw the timings of the instrumentation (see `src.instrumentation`) in the top left corner of the game screen.
+
+    The overlay is drawn within the current clip of the game screen and not displayed; `draw_game_board` draws it
+    last, so call `draw_game_board` with `OVERLAY_RECT` as dirty rectangle to refresh it.
+
+    Usage:
+        draw_profiling_overlay()
+    """
+    font = get_font(OVERLAY_FONT_SIZE)
+    lines = instrumentation.summary_lines(OVERLAY_NAMES)
+    for line_index, line in enumerate(lines):
+        text_surface = font.render(line, True, (255, 255, 255), (0, 0, 0))
+        app.game_screen.blit(text_surface, (5, 5 + line_index * OVERLAY_FONT_SIZE))
+
+def draw_move(move) -> list:
+    """
+    Redraw only the part of the game screen changed by a move and update it on the display.
+
+    A move into an inner field that is still open only adds a small player symbol to one cell. A move that wins
+    or draws its inner field collapses the whole cell of the outer field to a big symbol, so that cell is redrawn.
+    The rectangle is enlarged by the line thickness, since symbols and lines reach a few pixels beyond their cell.
+
+    Args:
+        move (int): The cell (0-80) of the move, already made on the board (see `TicTacToe_Board_2_layers.push`).
+
+    Returns:
+        list: The rectangles of the game screen that were redrawn (dirty rectangles).
+
+    Usage:
+        dirty_rects = draw_move(40)
+    """
+    pos_outer_field, row_inner_field, col_inner_field = app.game_board.move_to_coordinates(move)
+    reference_point = GRID_REFERENCE_POINTS[pos_outer_field]
+
+    # The inner field was decided by the move. Redraw the whole cell of the outer field.
+    if app.game_board.is_cell_of_outer_field_won(pos_outer_field):
+        dirty_rect = pygame.Rect(reference_point, (CELL_SIZE_OUTER_FIELD, CELL_SIZE_OUTER_FIELD))
+    # The inner field is still open. Only the symbol in the picked cell is new.
+    else:
+        dirty_rect = pygame.Rect(reference_point[0] + CELL_SIZE_INNER_FIELD * col_inner_field,
+                                 reference_point[1] + CELL_SIZE_INNER_FIELD * row_inner_field,
+                                 CELL_SIZE_INNER_FIELD, CELL_SIZE_INNER_FIELD)
+    dirty_rect = dirty_rect.inflate(2 * OUTER_LINE_THICKNESS, 2 * OUTER_LINE_THICKNESS).clip(app.game_screen.get_rect())
+
+    draw_game_board(app.game_session.decided_outer_fields, dirty_rect)
+    return [dirty_rect]
 
 def draw_inner_field(reference_point):
     """
@@ -145,15 +471,8 @@ def draw_inner_field(reference_point):
     Usage:
         draw_inner_field((x, y))
     """
-    # Draw vertical lines
-    for i in range(1, 3):
-        x_position = reference_point[0] + i * CELL_SIZE_INNER_FIELD
-        pygame.draw.line(game_screen, INNER_FIELD_LINE_COLOR, (x_position, reference_point[1]), (x_position, reference_point[1] + 3 * CELL_SIZE_INNER_FIELD), INNER_LINE_THICKNESS)
-
-    # Draw horizontal lines
-    for i in range(1, 3):
-        y_position = reference_point[1] + i * CELL_SIZE_INNER_FIELD
-        pygame.draw.line(game_screen, INNER_FIELD_LINE_COLOR, (reference_point[0], y_position), (reference_point[0] + 3 * CELL_SIZE_INNER_FIELD, y_position), INNER_LINE_THICKNESS)
+    # Blit the pre-rendered grid lines of an inner field.
+    app.game_screen.blit(get_sprite('inner_grid'), (reference_point[0] - SPRITE_MARGIN, reference_point[1] - SPRITE_MARGIN))
         
 def draw_player_symbol(game_screen, coordinates, player):
     """
@@ -171,18 +490,9 @@ def draw_player_symbol(game_screen, coordinates, player):
     
     reference_point = GRID_REFERENCE_POINTS[pos_outer_field]
     
-    if player == active_game_board.PLAYER_X:
-        # Draw an 'X' symbol for Player X with respect to the reference point in the outer field. Added some constants for better looking (no overlap with field lines).
-        pygame.draw.line(game_screen, PLAYER_X_COLOR, (reference_point[0] + CELL_SIZE_INNER_FIELD * col_inner_field + 2.5, reference_point[1] + CELL_SIZE_INNER_FIELD * row_inner_field + 2.5), 
-                         (reference_point[0] + CELL_SIZE_INNER_FIELD * (col_inner_field + 1) - 2.5, reference_point[1] + CELL_SIZE_INNER_FIELD * (row_inner_field + 1) - 2.5), PLAYERS_SYMBOL_THICKNESS)
-        
-        pygame.draw.line(game_screen, PLAYER_X_COLOR, (reference_point[0] + CELL_SIZE_INNER_FIELD * (col_inner_field + 1) - 2.5, reference_point[1] + CELL_SIZE_INNER_FIELD * row_inner_field + 2.5), 
-                         (reference_point[0] + CELL_SIZE_INNER_FIELD * col_inner_field + 2.5, reference_point[1] + CELL_SIZE_INNER_FIELD * (row_inner_field + 1) - 2.5), PLAYERS_SYMBOL_THICKNESS)
-    
-    elif player == active_game_board.PLAYER_O:
-        # Draw an 'O' symbol for Player O with respect to the reference point in the outer field. Scaling the radius a bit for a better looking (no overlap with field lines).
-        pygame.draw.circle(game_screen, PLAYER_O_COLOR, (reference_point[0] + CELL_SIZE_INNER_FIELD * col_inner_field + CELL_SIZE_INNER_FIELD // 2, 
-                                                         reference_point[1] + CELL_SIZE_INNER_FIELD * row_inner_field + CELL_SIZE_INNER_FIELD // 2), CELL_SIZE_INNER_FIELD // 2.1, PLAYERS_SYMBOL_THICKNESS)
+    # Blit the pre-rendered symbol of the player into the cell of the inner field.
+    game_screen.blit(get_sprite((player, CELL_SIZE_INNER_FIELD)), (reference_point[0] + CELL_SIZE_INNER_FIELD * col_inner_field - SPRITE_MARGIN,
+                                                                  reference_point[1] + CELL_SIZE_INNER_FIELD * row_inner_field - SPRITE_MARGIN))
         
 def draw_inner_field_win(game_screen, pos_outer_field, player):
     """
@@ -191,7 +501,7 @@ def draw_inner_field_win(game_screen, pos_outer_field, player):
     Parameters:
         game_screen (pygame.Surface): The surface to draw on.
         pos_outer_field (str): The position of the outer field.
-        player (str): The player who won the inner field (active_game_board.PLAYER_X or active_game_board.PLAYER_O).
+        player (str): The player who won the inner field (app.game_board.PLAYER_X or app.game_board.PLAYER_O).
     
     Usage:
         draw_inner_field_win(game_screen, 'top-left', 'X')
@@ -199,19 +509,8 @@ def draw_inner_field_win(game_screen, pos_outer_field, player):
     # Retrieve the reference point for drawing based on the outer field position.
     reference_point = GRID_REFERENCE_POINTS[pos_outer_field]
 
-    # Check which player has won the inner field and draw the corresponding symbol.
-    if player == active_game_board.PLAYER_X:
-        # Draw an X symbol for Player X.
-        pygame.draw.line(game_screen, PLAYER_X_COLOR, (reference_point[0], reference_point[1]), 
-                         (reference_point[0] + CELL_SIZE_OUTER_FIELD, reference_point[1] + CELL_SIZE_OUTER_FIELD), 3)
-        
-        pygame.draw.line(game_screen, PLAYER_X_COLOR, (reference_point[0], reference_point[1] + CELL_SIZE_OUTER_FIELD), 
-                         (reference_point[0] + CELL_SIZE_OUTER_FIELD, reference_point[1]), PLAYERS_SYMBOL_THICKNESS)
-    
-    elif player == active_game_board.PLAYER_O:
-        # Draw a circle symbol for Player O.
-        pygame.draw.circle(game_screen, PLAYER_O_COLOR, (reference_point[0] + CELL_SIZE_OUTER_FIELD // 2, 
-                                                  reference_point[1] + CELL_SIZE_OUTER_FIELD // 2), CELL_SIZE_OUTER_FIELD // 2, PLAYERS_SYMBOL_THICKNESS)
+    # Blit the pre-rendered big symbol of the player who has won the inner field.
+    game_screen.blit(get_sprite((player, CELL_SIZE_OUTER_FIELD)), (reference_point[0] - SPRITE_MARGIN, reference_point[1] - SPRITE_MARGIN))
 
         
 def draw_inner_field_draw(game_screen, pos_outer_field):
@@ -228,11 +527,8 @@ def draw_inner_field_draw(game_screen, pos_outer_field):
     # Retrieve the reference point for drawing based on the outer field position.
     reference_point = GRID_REFERENCE_POINTS[pos_outer_field]
 
-    # Set the font for the 'D' symbol.
-    font = pygame.font.Font(None, CELL_SIZE_OUTER_FIELD)
-
-    # Render the 'D' symbol.
-    draw_text = font.render(active_game_board.DRAW_SYMBOL, True, DRAW_SYMBOL_COLOR)  # White color
+    # The pre-rendered 'D' symbol.
+    draw_text = get_sprite('draw_symbol')
 
     # Get the rect object to center the 'D' symbol in the inner field.
     draw_rect = draw_text.get_rect(center=(reference_point[0] + CELL_SIZE_OUTER_FIELD // 2, reference_point[1] + CELL_SIZE_OUTER_FIELD // 2))
@@ -252,19 +548,16 @@ def draw_winner_screen(winner):
         draw_winner_screen('X')
     """
     # Fill the screen with white color.
-    game_screen.fill((255, 255, 255))
+    app.game_screen.fill((255, 255, 255))
 
-    # Set up the font.
-    font = pygame.font.Font(None, 75)
-
-    # Render the text with the winner information.
-    text = font.render(f"Player {winner} wins!", True, (0, 0, 0))
+    # The pre-rendered text with the winner information.
+    text = get_sprite(('winner_text', winner))
 
     # Get the rectangle of the text and center it on the screen.
     text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
     
     # Draw the text on the screen.
-    game_screen.blit(text, text_rect)
+    app.game_screen.blit(text, text_rect)
 
     # Update the display.
     pygame.display.update()
@@ -273,12 +566,11 @@ def draw_winner_screen(winner):
     display_duration = 5000  # 5 seconds
     start_time = pygame.time.get_ticks()
 
-    # Give the player the option to quit early.
-    while pygame.time.get_ticks() - start_time < display_duration:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    # Give the player the option to quit early. Wait for events instead of polling, so that the screen idles.
+    while (remaining_duration := display_duration - (pygame.time.get_ticks() - start_time)) > 0:
+        if pygame.event.wait(remaining_duration).type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
     
 def draw_draw_screen():
     """
@@ -288,19 +580,16 @@ def draw_draw_screen():
         draw_draw_screen()
     """
     # Fill the screen with white color.
-    game_screen.fill((255, 255, 255))
+    app.game_screen.fill((255, 255, 255))
 
-    # Set up the font.
-    font = pygame.font.Font(None, 75)
-
-    # Render the text for a draw.
-    text = font.render("It's a draw!", True, (0, 0, 0))
+    # The pre-rendered text for a draw.
+    text = get_sprite('draw_text')
 
     # Get the rectangle of the text and center it on the screen.
     text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
     
     # Draw the text on the screen.
-    game_screen.blit(text, text_rect)
+    app.game_screen.blit(text, text_rect)
 
     # Update the display.
     pygame.display.update()
@@ -331,7 +620,7 @@ def transform_coordinates_to_indices(x_coordinate, y_coordinate) -> tuple:
 
     # Find the corresponding outer field position (str) based on indices.
     str_outer_field = ""
-    for key, value in active_game_board.POSITIONS_MAPPING_DICT.items():
+    for key, value in TicTacToe_Board_2_layers.POSITIONS_MAPPING_DICT.items():
         if value == (row_outer_field, col_outer_field):
             str_outer_field = key
             break
@@ -340,28 +629,84 @@ def transform_coordinates_to_indices(x_coordinate, y_coordinate) -> tuple:
     return (str_outer_field, row_inner_field, col_inner_field)
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ End helper functions ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Start Game loop ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-def main():
+def main(game_mode="human-vs-human", ai_player=TicTacToe_Board_2_layers.PLAYER_O, ai_time_limit=0.1, book_path=None,
+         tablebase_path=None):
     """
     Main function to run the 2-layered-TicTacToe game loop.
+
+    Args:
+        game_mode (str): Either "human-vs-human" or "human-vs-ai".
+        ai_player (str): The player ('X' or 'O') controlled by the AI in the "human-vs-ai" mode.
+        ai_time_limit (float): Time budget of the AI per move in seconds.
+        book_path (str): Path of an opening book (see `src.book`) the AI plays its first moves from, None for no book.
+        tablebase_path (str): Path of an endgame tablebase (see `src.tablebase`) the AI plays its endgames from, None for none.
     """
-    # Keep track of won inner fields because they should not be drawn anymore.
-    no_needed_inner_fields = []
+    # The instrumentation is enabled by `instrumentation.configure` before. If it is disabled, the loop only checks
+    # this flag, and no function is wrapped.
+    profiling = instrumentation.enabled
+    if profiling:
+        instrumentation.instrument(sys.modules[__name__], 'draw_game_board', 'render')
+        next_overlay_refresh = time.perf_counter()
+
+    # The computer opponent, only used in the "human-vs-ai" mode (the engine is only imported then).
+    if game_mode == "human-vs-ai":
+        from src.engine import AlphaBetaEngine
+        ai_engine = AlphaBetaEngine(time_limit=ai_time_limit)
+
+        # Positions in the opening book cost a lookup instead of a search.
+        if book_path is not None:
+            from src.book import BookEngine, OpeningBook
+            ai_engine = BookEngine(OpeningBook(book_path), ai_engine)
+
+        # Endgames in the tablebase file are played perfectly without a search. Positions missing in the file are
+        # searched instead of solved, which could stall the game for a few hundred milliseconds.
+        if tablebase_path is not None:
+            from src.tablebase import Tablebase, TablebaseEngine
+            ai_engine = TablebaseEngine(Tablebase(tablebase_path, solve_misses=False), ai_engine)
+        app.game_session.ai_engines[ai_player] = ai_engine
     
     game_is_active = True
 
+    # Draw the whole game board once. Afterwards only the parts changed by a move are redrawn.
+    draw_game_board(app.game_session.decided_outer_fields)
+    clock = pygame.time.Clock()
+
     # Main game loop.
     while game_is_active:
-        
+
+        # Sleep until the next event while waiting for a human player, instead of spinning through the loop.
+        # During the turn of the AI or at the end of the game, only the events already queued are handled.
+        # While profiling, the wait ends in time to refresh the overlay (a NOEVENT is ignored below).
+        if app.game_session.is_ai_turn() or app.game_session.is_game_over():
+            events = pygame.event.get()
+        elif profiling:
+            events = [pygame.event.wait(OVERLAY_REFRESH_INTERVAL)] + pygame.event.get()
+        else:
+            events = [pygame.event.wait()] + pygame.event.get()
+
+        # The frame is timed from the end of the wait, the time spent idle is not part of it.
+        if profiling:
+            frame_start_time = time.perf_counter()
+
         # Event handling loop.
-        for event in pygame.event.get():
+        for event in events:
             
             # Quit event handling.
             if event.type == pygame.QUIT:
                 game_is_active = False
                 break
+
+            # The window size changed. The sprites have to be rendered again before the board is redrawn.
+            elif event.type == pygame.WINDOWSIZECHANGED:
+                invalidate_sprite_cache()
+                draw_game_board(app.game_session.decided_outer_fields)
+
+            # The window was uncovered or restored. Its content has to be drawn completely again.
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                draw_game_board(app.game_session.decided_outer_fields)
             
-            # Mouse button down event handling. Player is picking a cell in the inner field.
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # Mouse button down event handling. Player is picking a cell in the inner field (not during the turn of the AI).
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not app.game_session.is_ai_turn():
                 
                 # Get mouse coordinates from player pick.
                 mouse_event_x = event.pos[0]
@@ -369,53 +714,47 @@ def main():
                 
                 # Transform pixel coordinates to game board indices.
                 transformed_board_indices = transform_coordinates_to_indices(mouse_event_x, mouse_event_y)
-                pos_outer_field, row_inner_field, col_inner_field = transformed_board_indices
-                
-                # Check if the outer field cell is already won. If so, the player can choose any inner field.
-                if active_game_board.where_to_play_next != None and active_game_board.is_cell_of_outer_field_won(active_game_board.where_to_play_next):
-                    active_game_board.where_to_play_next = None
                 
-                # Check if the clicked cell is valid and not already occupied.
-                if (pos_outer_field == active_game_board.where_to_play_next or active_game_board.where_to_play_next == None) and active_game_board.is_cell_of_inner_field_empty(pos_outer_field, row_inner_field, col_inner_field):
-                    # Update game board by given move.
-                    active_game_board.make_move(
-                        active_game_board.active_player,
-                        pos_outer_field,
-                        row_inner_field,
-                        col_inner_field,
-                    )
-                    
-                    # Check if the inner field is won, and if so, update the board by placing the player's symbol in the game state.
-                    winner_inner_field = active_game_board.check_for_win_inner_field(pos_outer_field)
-                    if winner_inner_field != None:
-                        active_game_board.mark_outer_cell_as_won(active_game_board.active_player, pos_outer_field)
-                        no_needed_inner_fields.append(pos_outer_field)  
-                    
-                    # Check if the inner field is a draw, and if so, update the board by putting a "D" in the active board.
-                    if active_game_board.board_status[pos_outer_field] != active_game_board.DRAW_SYMBOL and active_game_board.is_inner_field_full(pos_outer_field):
-                        active_game_board.mark_outer_field_as_draw(pos_outer_field)
-                        no_needed_inner_fields.append(pos_outer_field)  
-                    
-                    # Update the 'where_to_play_next' attribute, based on previous move.
-                    active_game_board.update_where_to_play_next(row_inner_field, col_inner_field)
-
-                    # Change the active player after valid move.
-                    active_game_board.active_player = active_game_board.PLAYER_O if active_game_board.active_player == active_game_board.PLAYER_X else active_game_board.PLAYER_X
-                   
-        # Update the game screen.   
-        draw_game_board(no_needed_inner_fields)
+                # Make the move if the clicked cell is a legal move. Illegal clicks are ignored by the session.
+                if app.game_session.play_coordinates(*transformed_board_indices):
+                    draw_move(app.game_board.coordinates_to_move(*transformed_board_indices))
+
+        if profiling:
+            instrumentation.record('events', time.perf_counter() - frame_start_time)
+
+        if not game_is_active:
+            break
         
         # Check if the entire game is a draw.
-        if active_game_board.is_outer_field_full() and active_game_board.check_for_win_outer_field() == None:
+        if app.game_board.game_result == app.game_board.DRAW_SYMBOL:
             game_is_active = False
             draw_draw_screen()
             time.sleep(5)
         
         # Check if one player has won the entire game.
-        winner = active_game_board.check_for_win_outer_field()
-        if winner != None:
+        elif app.game_board.game_result != None:
             game_is_active = False
-            draw_winner_screen(winner)
+            draw_winner_screen(app.game_board.game_result)
+
+        # Let the AI make its move. The search stays within the time budget, so the game loop does not stall.
+        if game_is_active and app.game_session.is_ai_turn():
+            search_result = app.game_session.play_ai_move()
+            draw_move(search_result.best_move)
+
+            # Report the search statistics of the AI in the window title. Book and tablebase moves are not searched (no nodes).
+            if search_result.nodes == 0:
+                pygame.display.set_caption(f"2-layered-TicTacToe - AI: book or tablebase move (depth {search_result.depth})")
+            else:
+                pygame.display.set_caption(f"2-layered-TicTacToe - AI: depth {search_result.depth}, {search_result.nodes_per_second:,.0f} nodes/s")
+
+        if profiling:
+            instrumentation.record('frame', time.perf_counter() - frame_start_time)
+            if time.perf_counter() >= next_overlay_refresh:
+                draw_game_board(app.game_session.decided_outer_fields, pygame.Rect(OVERLAY_RECT))
+                next_overlay_refresh = time.perf_counter() + OVERLAY_REFRESH_INTERVAL / 1000
+
+        # Cap the frame rate, so that a burst of events or AI moves does not keep a core busy.
+        clock.tick(MAX_FRAMES_PER_SECOND)
 
     # Stop the game.
     pygame.quit()
@@ -424,4 +763,20 @@ def main():
 
 # Start the game.
 if __name__ == "__main__":
-    main()
+    argument_parser = argparse.ArgumentParser(description="2-layered-TicTacToe")
+    argument_parser.add_argument("--mode", choices=["human-vs-human", "human-vs-ai"], default="human-vs-human",
+                                 help="Play against another human or against the computer.")
+    argument_parser.add_argument("--ai-player", choices=[TicTacToe_Board_2_layers.PLAYER_X, TicTacToe_Board_2_layers.PLAYER_O],
+                                 default=TicTacToe_Board_2_layers.PLAYER_O, help="The player controlled by the AI.")
+    argument_parser.add_argument("--ai-time", type=int, default=100, help="Time budget of the AI per move in milliseconds.")
+    argument_parser.add_argument("--book", help="Opening book of the AI, built with 'python -m src.book'.")
+    argument_parser.add_argument("--tablebase", help="Endgame tablebase of the AI, built with 'python -m src.tablebase'.")
+    argument_parser.add_argument("--profile", metavar="PATH",
+                                 help=f"Show timings in an overlay and write them as JSON to PATH at exit (or set {instrumentation.ENV_PROFILE}).")
+    argument_parser.add_argument("--cprofile", metavar="PATH",
+                                 help=f"Run cProfile and write its statistics to PATH at exit (or set {instrumentation.ENV_CPROFILE}).")
+    arguments = argument_parser.parse_args()
+
+    instrumentation.configure(arguments.profile, arguments.cprofile)
+
+    main(arguments.mode, arguments.ai_player, arguments.ai_time / 1000, arguments.book, arguments.tablebase)
@@ -0,0 +1,234 @@
+"""
+Vectorized engine for many 2-layered-TicTacToe games at once, based on NumPy.
+
+A `BatchBoard` holds N independent games as arrays and steps all of them in lockstep with array operations,
+e.g., for bulk self-play and dataset generation. It follows the rules of `TicTacToe_Board_2_layers`
+move for move: Same move numbering (cell 0-80, '9 * index_outer_field + row_inner_field * 3 + col_inner_field'),
+same resolution of inner fields, same forced inner field and the same results.
+
+Array layout (N = number of games):
+    cells (N, 9, 9) int8:      Cell [game, outer field index, inner cell index], 0 empty, 1 X, 2 O.
+    field_status (N, 9) int8:  Inner field result per outer field index, 0 open, 1 X, 2 O, 3 draw.
+    where_to_play_next (N,) int8: Forced outer field index, -1 for a free choice.
+    active_player (N,) int8:   1 for X, 2 for O.
+    result (N,) int8:          0 while running, 1 X won, 2 O won, 3 draw.
+
+Dependencies:
+    - NumPy (`pip install numpy`)
+
+Usage:
+    batch_board = BatchBoard(100000)
+    rng = numpy.random.default_rng(1)
+    while not batch_board.is_game_over().all():
+        batch_board.apply(batch_board.random_legal_moves(rng))
+"""
+
+import numpy as np
+
+from src.board import FULL_MASK, WINNING_LINES_TABLE
+
+EMPTY = 0
+PLAYER_X = 1
+PLAYER_O = 2
+DRAW = 3
+NO_MOVE = -1
+
+# Lookup tables over 9-bit cell masks (bit 'row * 3 + col'), built from the tables of `src.board`.
+HAS_LINE_TABLE = np.array(WINNING_LINES_TABLE) != 0
+POPCOUNT_TABLE = np.array([mask.bit_count() for mask in range(FULL_MASK + 1)], dtype=np.int8)
+NTH_BIT_TABLE = np.array([[[bit for bit in range(9) if mask >> bit & 1][rank] if rank < mask.bit_count() else 0
+                           for rank in range(9)] for mask in range(FULL_MASK + 1)], dtype=np.int8)
+
+# Symbols of the results in the same order as the codes, for conversion to `TicTacToe_Board_2_layers` results.
+RESULT_SYMBOLS = (None, 'X', 'O', 'D')
+
+
+class BatchBoard:
+    """
+    N games of 2-layered-TicTacToe stored as NumPy arrays.
+
+    Besides the public arrays, the board keeps 9-bit masks of the cells of each player per inner field and of the
+    decided outer cells, so that wins are detected by a lookup in HAS_LINE_TABLE and random moves are drawn
+    from the (N, 9) masks instead of the (N, 81) cells.
+
+    Attributes:
+        number_of_games (int): The number of games N.
+        cells (numpy.ndarray): (N, 9, 9) cells, 0 empty, 1 X, 2 O.
+        field_status (numpy.ndarray): (N, 9) inner field results, 0 open, 1 X, 2 O, 3 draw.
+        where_to_play_next (numpy.ndarray): (N,) forced outer field index, -1 for a free choice.
+        active_player (numpy.ndarray): (N,) player to move, 1 for X, 2 for O.
+        result (numpy.ndarray): (N,) game results, 0 while running, 1 X won, 2 O won, 3 draw.
+        move_count (numpy.ndarray): (N,) number of moves made in each game.
+    """
+
+    def __init__(self, number_of_games):
+        """
+        Start N new games.
+
+        Args:
+            number_of_games (int): The number of games.
+
+        Usage:
+            batch_board = BatchBoard(100000)
+        """
+        self.number_of_games = number_of_games
+        self.cells = np.zeros((number_of_games, 9, 9), dtype=np.int8)
+        self.field_status = np.zeros((number_of_games, 9), dtype=np.int8)
+        self.where_to_play_next = np.full(number_of_games, -1, dtype=np.int8)
+        self.active_player = np.full(number_of_games, PLAYER_X, dtype=np.int8)
+        self.result = np.zeros(number_of_games, dtype=np.int8)
+        self.move_count = np.zeros(number_of_games, dtype=np.int16)
+
+        # Cell masks [player code, game, outer field index] and outer masks [result code, game], index 0 unused.
+        self._cell_masks = np.zeros((3, number_of_games, 9), dtype=np.int16)
+        self._outer_masks = np.zeros((4, number_of_games), dtype=np.int16)
+
+    def is_game_over(self) -> np.ndarray:
+        """
+        Return a (N,) boolean array, True for the games that are won or drawn.
+        """
+        return self.result != EMPTY
+
+    def _allowed_fields(self) -> tuple:
+        """
+        Compute the empty cells of every inner field and the inner fields the active players may play in.
+
+        Returns:
+            tuple: (N, 9) masks of the empty cells and a (N, 9) boolean array of the allowed inner fields.
+        """
+        empty_masks = FULL_MASK & ~(self._cell_masks[PLAYER_X] | self._cell_masks[PLAYER_O])
+        allowed_fields = self.field_status == EMPTY
+        forced = self.where_to_play_next >= 0
+        allowed_fields[forced] = np.arange(9) == self.where_to_play_next[forced, None]
+        allowed_fields &= (self.result == EMPTY)[:, None]
+        return empty_masks, allowed_fields
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        Return the legal moves of every game as a (N, 81) boolean array, column 'move' True for legal cells.
+
+        A forced inner field restricts the moves to its empty cells. Without a forced inner field (start of
+        the game, or the previous move sent the player to a decided inner field), every empty cell of every
+        open inner field is legal. Finished games have no legal moves.
+
+        Returns:
+            numpy.ndarray: The legal moves.
+
+        Usage:
+            legal_moves = batch_board.legal_mask()
+        """
+        empty_masks, allowed_fields = self._allowed_fields()
+        empty_cells = (empty_masks[:, :, None] >> np.arange(9, dtype=np.int16)) & 1 == 1
+        return (empty_cells & allowed_fields[:, :, None]).reshape(self.number_of_games, 81)
+
+    def count_legal_moves(self) -> np.ndarray:
+        """
+        Return the (N,) numbers of legal moves of the games.
+        """
+        empty_masks, allowed_fields = self._allowed_fields()
+        return (POPCOUNT_TABLE[empty_masks] * allowed_fields).sum(axis=1)
+
+    def random_legal_moves(self, rng) -> np.ndarray:
+        """
+        Draw a uniformly random legal move for every running game.
+
+        Args:
+            rng (numpy.random.Generator): The random number generator.
+
+        Returns:
+            numpy.ndarray: (N,) moves (0-80), NO_MOVE (-1) for finished games.
+        """
+        empty_masks, allowed_fields = self._allowed_fields()
+
+        # Draw the rank k of the move among all legal moves of a game, find the inner field holding the k-th
+        # legal move and look up the cell in NTH_BIT_TABLE.
+        counts = POPCOUNT_TABLE[empty_masks] * allowed_fields
+        running_counts = np.cumsum(counts, axis=1, dtype=np.int16)
+        number_of_moves = running_counts[:, -1]
+        ranks = (rng.random(self.number_of_games, dtype=np.float32) * number_of_moves).astype(np.int16)
+        fields = np.argmax(running_counts > ranks[:, None], axis=1)
+        games = np.arange(self.number_of_games)
+        ranks_in_field = ranks - running_counts[games, fields] + counts[games, fields]
+        moves = 9 * fields + NTH_BIT_TABLE[empty_masks[games, fields], ranks_in_field]
+        return np.where(number_of_moves > 0, moves, NO_MOVE)
+
+    def apply(self, moves):
+        """
+        Make one move in every game.
+
+        The moves are applied like `TicTacToe_Board_2_layers.push`: The symbol of the active player is placed,
+        the inner field is resolved, the game result is updated, the forced inner field is selected and the
+        other player becomes active. Games with the move NO_MOVE (-1) are left unchanged.
+
+        Args:
+            moves (numpy.ndarray): (N,) moves (0-80) or NO_MOVE.
+
+        Raises:
+            ValueError: If a move is not legal in its game.
+
+        Usage:
+            batch_board.apply(moves)
+        """
+        moves = np.asarray(moves)
+        games = np.flatnonzero(moves != NO_MOVE)
+        moves = moves[games]
+        if ((moves < 0) | (moves >= 81)).any():
+            raise ValueError("Illegal move. Choose an empty cell in an allowed inner field.")
+
+        # Check only the chosen cells instead of building the whole legal mask.
+        fields, inner_cells = np.divmod(moves, 9)
+        forced_fields = self.where_to_play_next[games]
+        if not ((self.cells[games, fields, inner_cells] == EMPTY) & (self.field_status[games, fields] == EMPTY)
+                & ((forced_fields == -1) | (forced_fields == fields)) & (self.result[games] == EMPTY)).all():
+            raise ValueError("Illegal move. Choose an empty cell in an allowed inner field.")
+
+        players = self.active_player[games]
+        self.cells[games, fields, inner_cells] = players
+        self.move_count[games] += 1
+        player_masks = self._cell_masks[players, games, fields] | (1 << inner_cells).astype(np.int16)
+        self._cell_masks[players, games, fields] = player_masks
+
+        # Resolve the inner fields. Only the player who just moved can have won them.
+        won_field = HAS_LINE_TABLE[player_masks]
+        occupied_masks = self._cell_masks[PLAYER_X, games, fields] | self._cell_masks[PLAYER_O, games, fields]
+        drawn_field = ~won_field & (occupied_masks == FULL_MASK)
+        decided = won_field | drawn_field
+        decided_games, decided_fields = games[decided], fields[decided]
+        field_results = np.where(won_field, players, DRAW)[decided]
+        self.field_status[decided_games, decided_fields] = field_results
+        self._outer_masks[field_results, decided_games] |= (1 << decided_fields).astype(np.int16)
+
+        # Update the game results of the games where an inner field was decided.
+        decided_players = players[decided]
+        won_game = HAS_LINE_TABLE[self._outer_masks[decided_players, decided_games]]
+        decided_outer_masks = self._outer_masks[PLAYER_X] | self._outer_masks[PLAYER_O] | self._outer_masks[DRAW]
+        drawn_game = ~won_game & (decided_outer_masks[decided_games] == FULL_MASK)
+        self.result[decided_games] = np.where(won_game, decided_players, np.where(drawn_game, DRAW, EMPTY))
+
+        # Select the inner field for the next move and hand over to the other player.
+        self.where_to_play_next[games] = np.where(self.field_status[games, inner_cells] == EMPTY, inner_cells, -1)
+        self.active_player[games] = PLAYER_X + PLAYER_O - players
+
+    def reset(self, games=None) -> np.ndarray:
+        """
+        Start new games in place of finished ones (or of the given games).
+
+        Args:
+            games (numpy.ndarray): Indices or boolean mask of the games to reset, None for all finished games.
+
+        Returns:
+            numpy.ndarray: The indices of the reset games.
+
+        Usage:
+            finished_games = batch_board.reset()
+        """
+        games = np.flatnonzero(self.is_game_over()) if games is None else np.arange(self.number_of_games)[games]
+        self.cells[games] = EMPTY
+        self.field_status[games] = EMPTY
+        self.where_to_play_next[games] = -1
+        self.active_player[games] = PLAYER_X
+        self.result[games] = EMPTY
+        self.move_count[games] = 0
+        self._cell_masks[:, games] = 0
+        self._outer_masks[:, games] = 0
+        return games
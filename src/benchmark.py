@@ -0,0 +1,172 @@
+"""
+Micro-benchmarks of the 2-layered-TicTacToe board, a regression gate for optimizations of `src/board.py`.
+
+The benchmarks replay a fixed set of random games (seeded, so every run measures the same positions) and
+report operations per second for:
+
+    make_move:   Moves made with 'make_move' (board coordinates, the interface of the game).
+    push:        Moves made with 'push' (cell numbers, the interface of the search engines).
+    pop:         Moves taken back with 'pop'.
+    legal_moves: Move lists generated with 'legal_moves'.
+    win_checks:  Win queries 'check_for_win_inner_field' of all nine inner fields and 'check_for_win_outer_field'.
+
+Each benchmark is timed with `timeit` and the best of several repetitions is reported. A run can be saved as
+JSON and later runs compared against it; the comparison fails if an operation got slower than the tolerance.
+
+Usage:
+    python -m src.benchmark
+    python -m src.benchmark --save benchmark_baseline.json
+    python -m src.benchmark --compare benchmark_baseline.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from src.board import TicTacToe_Board_2_layers
+from src.game import play_random_games
+
+
+def _random_games(number_of_games, seed) -> list:
+    """
+    Play random games and return their moves (lists of cells 0-80).
+    """
+    return [list(board.game_record()) for board in play_random_games(number_of_games, seed)]
+
+
+def _benchmark_functions(games) -> dict:
+    """
+    Build the benchmark functions over the moves of the games.
+
+    Returns:
+        dict: Maps each benchmark name to a tuple of the function running it once over all games and the number
+              of operations it performs.
+    """
+    number_of_moves = sum(len(moves) for moves in games)
+    coordinates = [[TicTacToe_Board_2_layers().move_to_coordinates(move) for move in moves] for moves in games]
+
+    # Boards at the end of each game, for 'pop', and the positions within each game, for the queries.
+    final_boards = [TicTacToe_Board_2_layers.from_game_record(bytes(moves)) for moves in games]
+    positions = [TicTacToe_Board_2_layers.from_game_record(bytes(moves[:length]))
+                 for moves in games for length in range(len(moves))]
+    outer_field_positions = TicTacToe_Board_2_layers.OUTER_FIELD_POSITIONS
+
+    def make_move():
+        for game_coordinates in coordinates:
+            board = TicTacToe_Board_2_layers()
+            for pos_outer_field, row_inner_field, col_inner_field in game_coordinates:
+                board.make_move(board.active_player, pos_outer_field, row_inner_field, col_inner_field)
+
+    def push():
+        for moves in games:
+            board = TicTacToe_Board_2_layers()
+            for move in moves:
+                board.push(move)
+
+    def push_and_pop():
+        for board, moves in zip(final_boards, games):
+            for _ in moves:
+                board.pop()
+            for move in moves:
+                board.push(move)
+
+    def legal_moves():
+        for board in positions:
+            board.legal_moves()
+
+    def win_checks():
+        for board in positions:
+            for pos_outer_field in outer_field_positions:
+                board.check_for_win_inner_field(pos_outer_field)
+            board.check_for_win_outer_field()
+
+    return {
+        'make_move': (make_move, number_of_moves),
+        'push': (push, number_of_moves),
+        'push_and_pop': (push_and_pop, 2 * number_of_moves),
+        'legal_moves': (legal_moves, len(positions)),
+        'win_checks': (win_checks, 10 * len(positions)),
+    }
+
+
+def run_benchmarks(number_of_games=100, repeat=5, seed=1) -> dict:
+    """
+    Run all benchmarks and measure the operations per second.
+
+    'pop' is measured together with 'push' (the only way to get boards to undo moves on repeatedly); its rate
+    is derived from the time left after subtracting the time of the pushes.
+
+    Args:
+        number_of_games (int): The number of random games to replay.
+        repeat (int): The number of repetitions of each benchmark, the fastest one counts.
+        seed (int): The seed of the random games.
+
+    Returns:
+        dict: The operations per second of 'make_move', 'push', 'pop', 'legal_moves' and 'win_checks'.
+
+    Usage:
+        results = run_benchmarks()
+    """
+    seconds = {}
+    operations = {}
+    for name, (function, number_of_operations) in _benchmark_functions(_random_games(number_of_games, seed)).items():
+        seconds[name] = min(timeit.repeat(function, number=1, repeat=repeat))
+        operations[name] = number_of_operations
+
+    # The pushes of 'push_and_pop' cost about as much as the pushes of 'push'.
+    seconds['pop'] = max(seconds.pop('push_and_pop') - seconds['push'], 1e-9)
+    operations['pop'] = operations.pop('push_and_pop') // 2
+
+    return {name: operations[name] / seconds[name] for name in ['make_move', 'push', 'pop', 'legal_moves', 'win_checks']}
+
+
+def compare_benchmarks(results, baseline, tolerance=0.1) -> list:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results (dict): The operations per second of the current run.
+        baseline (dict): The operations per second of the baseline run.
+        tolerance (float): The allowed slowdown as fraction, e.g., 0.1 for 10 %.
+
+    Returns:
+        list: The names of the benchmarks that got slower than allowed.
+
+    Usage:
+        slower_benchmarks = compare_benchmarks(run_benchmarks(), baseline)
+    """
+    return [name for name, rate in baseline.items() if name in results and results[name] < rate * (1 - tolerance)]
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Benchmark the operations of the 2-layered-TicTacToe board.")
+    argument_parser.add_argument("--games", type=int, default=100, help="Number of random games to replay.")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark, the fastest counts.")
+    argument_parser.add_argument("--save", help="Save the results as JSON to this file.")
+    argument_parser.add_argument("--compare", help="Compare the results with a JSON file saved before.")
+    argument_parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed slowdown for --compare, e.g. 0.1.")
+    arguments = argument_parser.parse_args()
+
+    benchmark_results = run_benchmarks(arguments.games, arguments.repeat)
+
+    baseline_results = {}
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline_results = json.load(baseline_file)
+
+    for benchmark_name, operations_per_second in benchmark_results.items():
+        line = f"{benchmark_name:<12} {operations_per_second:>14,.0f} ops/s"
+        if benchmark_name in baseline_results:
+            line += f"  ({operations_per_second / baseline_results[benchmark_name] - 1:+.1%} vs. baseline)"
+        print(line)
+
+    if arguments.save:
+        with open(arguments.save, 'w') as results_file:
+            json.dump(benchmark_results, results_file, indent=4)
+
+    if arguments.compare:
+        slower_benchmarks = compare_benchmarks(benchmark_results, baseline_results, arguments.tolerance)
+        if slower_benchmarks:
+            print(f"Slower than the baseline by more than {arguments.tolerance:.0%}: {', '.join(slower_benchmarks)}")
+            sys.exit(1)
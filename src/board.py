@@ -1,13 +1,209 @@
+"""
+Game rules and state of the 2-layered-TicTacToe board.
+
+Besides the board class, this module precomputes lookup tables over every possible 3x3 field at import time,
+so that win and draw queries on inner fields and on the outer field are single table lookups:
+
+    WINNING_LINES_TABLE[mask]:  Bitmask of the lines in WIN_LINES (bit k for WIN_LINES[k]) that are
+                                complete in the 9-bit cell mask of one player (512 entries).
+    TERNARY_INDEX_TABLE[mask]:  Base-3 value of a 9-bit cell mask, bit i contributing 3**i (512 entries).
+    INNER_OUTCOME_TABLE[index]: Outcome of a 3x3 field at 'TERNARY_INDEX_TABLE[mask_x] + 2 * TERNARY_INDEX_TABLE[mask_o]'
+                                (3**9 entries). 'X' or 'O' for a winner, 'D' for a full field without a winner
+                                and None for an open field.
+    OPEN_CELLS_TABLE[mask]:     81-bit mask of all cells of the inner fields in a 9-bit outer field mask (512 entries).
+    FIELD_MOVES_TABLE[i][mask]: Moves (0-80) of the cells in a 9-bit mask of the inner field at index i (9 x 512 entries).
+    TERNARY_MASKS_TABLE[index]: The masks (mask_x, mask_o) of the 3x3 field with the base-3 encoding 'index', i.e., the
+                                inverse of the encoding of INNER_OUTCOME_TABLE (3**9 entries).
+    SYMMETRY_MASKS_TABLE[s][mask]: The 9-bit mask transformed by the symmetry s of SYMMETRY_PERMUTATIONS (8 x 512 entries).
+
+It also holds the random 64-bit keys for Zobrist hashing of positions (see `TicTacToe_Board_2_layers.zobrist_hash`).
+"""
+
+import random
+
+# 9-bit mask with every cell of a 3x3 field set. Bit 'row * 3 + col' represents the cell (row, col).
+FULL_MASK = 0b111111111
+
+# 9-bit masks of the eight lines of a 3x3 field.
+WIN_LINES = (0b000000111, 0b000111000, 0b111000000,  # Rows.
+             0b001001001, 0b010010010, 0b100100100,  # Columns.
+             0b100010001, 0b001010100)               # Diagonals.
+
+
+def _build_winning_lines_table() -> tuple:
+    """
+    Build the table of complete lines for every 9-bit cell mask.
+
+    Returns:
+        tuple: 512 entries, each a bitmask of the indices of the complete lines in WIN_LINES.
+    """
+    return tuple(sum(1 << index for index, line in enumerate(WIN_LINES) if mask & line == line)
+                 for mask in range(FULL_MASK + 1))
+
+
+def _build_ternary_index_table() -> tuple:
+    """
+    Build the table converting a 9-bit cell mask into its base-3 value.
+
+    Returns:
+        tuple: 512 entries, the sum of 3**i for every set bit i of the mask.
+    """
+    return tuple(sum(3 ** bit for bit in range(9) if mask >> bit & 1) for mask in range(FULL_MASK + 1))
+
+
+WINNING_LINES_TABLE = _build_winning_lines_table()
+TERNARY_INDEX_TABLE = _build_ternary_index_table()
+
+
+def _build_inner_outcome_table() -> tuple:
+    """
+    Build the outcome table of every 3x3 field, indexed by its base-3 encoding (0 = empty, 1 = X, 2 = O).
+
+    Returns:
+        tuple: 3**9 entries, each 'X', 'O', 'D' or None.
+    """
+    outcome_table = [None] * 3 ** 9
+    for mask_x in range(FULL_MASK + 1):
+        # Enumerate only the submasks of the cells left free by X, i.e., every possible mask of O.
+        free_cells = FULL_MASK ^ mask_x
+        mask_o = free_cells
+        while True:
+            if WINNING_LINES_TABLE[mask_x]:
+                outcome = 'X'
+            elif WINNING_LINES_TABLE[mask_o]:
+                outcome = 'O'
+            elif mask_x | mask_o == FULL_MASK:
+                outcome = 'D'
+            else:
+                outcome = None
+            outcome_table[TERNARY_INDEX_TABLE[mask_x] + 2 * TERNARY_INDEX_TABLE[mask_o]] = outcome
+            if mask_o == 0:
+                break
+            mask_o = (mask_o - 1) & free_cells
+    return tuple(outcome_table)
+
+
+INNER_OUTCOME_TABLE = _build_inner_outcome_table()
+
+
+def _build_ternary_masks_table() -> tuple:
+    """
+    Build the table decoding the base-3 value of a 3x3 field (0 = empty, 1 = X, 2 = O) into the masks of both players.
+
+    Returns:
+        tuple: 3**9 entries, each a tuple (mask_x, mask_o).
+    """
+    masks_table = [None] * 3 ** 9
+    for mask_x in range(FULL_MASK + 1):
+        free_cells = FULL_MASK ^ mask_x
+        mask_o = free_cells
+        while True:
+            masks_table[TERNARY_INDEX_TABLE[mask_x] + 2 * TERNARY_INDEX_TABLE[mask_o]] = (mask_x, mask_o)
+            if mask_o == 0:
+                break
+            mask_o = (mask_o - 1) & free_cells
+    return tuple(masks_table)
+
+
+TERNARY_MASKS_TABLE = _build_ternary_masks_table()
+
+
+def _build_open_cells_table() -> tuple:
+    """
+    Build the table spreading a 9-bit mask of outer field cells to the 81-bit mask of all their inner cells.
+
+    Returns:
+        tuple: 512 entries, with bits '9 * i' to '9 * i + 8' set for every set bit i of the outer mask.
+    """
+    return tuple(sum(FULL_MASK << 9 * index for index in range(9) if outer_mask >> index & 1)
+                 for outer_mask in range(FULL_MASK + 1))
+
+
+OPEN_CELLS_TABLE = _build_open_cells_table()
+
+
+def _build_field_moves_table() -> tuple:
+    """
+    Build the table listing the moves (0-80) of the set cells of a 9-bit mask in each inner field.
+
+    Returns:
+        tuple: 9 tuples (one per outer field index) of 512 entries, each a tuple of moves in ascending order.
+    """
+    return tuple(tuple(tuple(9 * index + bit for bit in range(9) if mask >> bit & 1) for mask in range(FULL_MASK + 1))
+                 for index in range(9))
+
+
+FIELD_MOVES_TABLE = _build_field_moves_table()
+
+# Zobrist keys, drawn from a fixed seed so that hashes are reproducible between runs and processes.
+_zobrist_random = random.Random(20240229)
+ZOBRIST_CELL_X_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(81))
+ZOBRIST_CELL_O_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(81))
+ZOBRIST_OUTER_X_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(9))
+ZOBRIST_OUTER_O_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(9))
+ZOBRIST_OUTER_DRAW_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(9))
+ZOBRIST_WHERE_TO_PLAY_NEXT_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(10))  # Index 9: free choice.
+ZOBRIST_PLAYER_O_KEY = _zobrist_random.getrandbits(64)
+del _zobrist_random
+
+# The 8 symmetries of the square (rotations and reflections), as permutations of the cells of a 3x3 field:
+# Cell 'row * 3 + col' is moved to 'SYMMETRY_PERMUTATIONS[s][row * 3 + col]'. The rules are invariant under each
+# of them when it is applied to the outer field and to every inner field at the same time.
+SYMMETRY_NAMES = ('identity', 'rotate-90', 'rotate-180', 'rotate-270',
+                  'mirror-horizontal', 'mirror-vertical', 'mirror-diagonal', 'mirror-anti-diagonal')
+SYMMETRY_PERMUTATIONS = tuple(
+    tuple(new_row * 3 + new_col for new_row, new_col in (transform(row, col) for row in range(3) for col in range(3)))
+    for transform in (lambda row, col: (row, col),
+                      lambda row, col: (col, 2 - row),
+                      lambda row, col: (2 - row, 2 - col),
+                      lambda row, col: (2 - col, row),
+                      lambda row, col: (row, 2 - col),
+                      lambda row, col: (2 - row, col),
+                      lambda row, col: (col, row),
+                      lambda row, col: (2 - col, 2 - row)))
+
+# Index of the symmetry undoing each symmetry.
+SYMMETRY_INVERSES = tuple(next(inverse for inverse in range(8) if all(SYMMETRY_PERMUTATIONS[inverse][SYMMETRY_PERMUTATIONS[symmetry][cell]] == cell
+                                                                      for cell in range(9)))
+                          for symmetry in range(8))
+
+# Permutations of the 81 cells (moves): Move '9 * i + k' is moved to '9 * p[i] + p[k]' for the permutation p.
+SYMMETRY_MOVE_PERMUTATIONS = tuple(tuple(9 * permutation[move // 9] + permutation[move % 9] for move in range(81))
+                                   for permutation in SYMMETRY_PERMUTATIONS)
+
+SYMMETRY_MASKS_TABLE = tuple(tuple(sum(1 << permutation[bit] for bit in range(9) if mask >> bit & 1) for mask in range(FULL_MASK + 1))
+                             for permutation in SYMMETRY_PERMUTATIONS)
+
+# Size of the binary encoding of a position (see `TicTacToe_Board_2_layers.to_bytes`).
+POSITION_SIZE = 19
+
+# Columns of the text notation of moves. Column 'a' to 'i' and row 1 to 9 address the 9x9 grid of all cells.
+NOTATION_COLUMNS = 'abcdefghi'
+
+
 class TicTacToe_Board_2_layers:
     """
-    Represents a 2-layered Tic-Tac-Toe board. In the project, the large TicTacToe field, that is, 
-    the one on the first level, is referred to as the outer field, and the TicTacToe fields in the 
-    cells of the large TicTacToe field, i.e., the TicTacToe fields within the TicTacToe field (second level), 
+    Represents a 2-layered Tic-Tac-Toe board. In the project, the large TicTacToe field, that is,
+    the one on the first level, is referred to as the outer field, and the TicTacToe fields in the
+    cells of the large TicTacToe field, i.e., the TicTacToe fields within the TicTacToe field (second level),
     are referred to as the inner field.
-    
+
     Note: For a better understanding of the code, it may be helpful to familiarize yourself with the rules of the game.
           To view the rules, you could search for "meta-TicTacToe" on Wikipedia or read the README.
 
+    Internally the board is stored as bitboards. Every inner field owns two 9-bit masks (one per player),
+    where bit 'row * 3 + col' is set if the player occupies that cell. The nine masks of a player are packed
+    into a single 81-bit integer, the mask of the outer field at index 'i' (see POSITIONS_MAPPING_DICT)
+    starting at bit '9 * i'. The outer field is stored as three 9-bit masks for cells won by X, won by O
+    and drawn. Win and full checks are therefore single mask tests.
+
+    Moves can be taken back with 'pop' without copying the board: Since a decided inner field keeps its cells,
+    undoing a move only needs a small undo record on the move stack (see 'push' and 'pop').
+
+    'make_move' applies a move atomically: it places the symbol, resolves the inner field, updates the result
+    of the outer field, the forced inner field for the next move and the active player. Callers read the
+    cached results in O(1) instead of rescanning the board after every move.
+
     Attributes:
         EMPTY_CELL (str): Represents an empty cell on the board.
         PLAYER_X (str): Represents player X.
@@ -15,17 +211,21 @@ class TicTacToe_Board_2_layers:
         DRAW_SYMBOL (str) : Represents a draw in an inner field.
         POSITIONS_MAPPING_DICT (dict): Dictionary mapping each outer field position (str) to its numeric positions (Tuple).
         OUTER_FIELD_POSITIONS (list): List of positions for the outer field.
-        board_status (dict): Dictionary to store the status of each position on the board.
+        FULL_MASK (int): 9-bit mask with every cell of a 3x3 field set.
+        WIN_LINES (tuple): 9-bit masks of the eight lines (rows, columns, diagonals) of a 3x3 field.
+        board_status (dict): Read-only view of the board in the dict/list layout (see the property).
         where_to_play_next: Represents the position in the outer field where the next move should be made.
+                            None if the player may choose any inner field that is not decided yet.
         active_player (str): Represents the player (either 'X' or 'O') who is currently making a move.
+        game_result: The result of the whole game; 'X' or 'O' for a winner, 'D' for a draw and None while running.
     """
 
     EMPTY_CELL = ''
-    
+
     PLAYER_X = 'X'
     PLAYER_O = 'O'
     DRAW_SYMBOL = "D"
-    
+
     POSITIONS_MAPPING_DICT = {
             'top-left': (0, 0),
             'top-mid': (0, 1),
@@ -38,36 +238,205 @@ class TicTacToe_Board_2_layers:
             'bottom-right': (2, 2)
         }
 
+    # List of positions for the outer field. The index of a position is its bit index in the outer masks.
+    OUTER_FIELD_POSITIONS = ["top-left", "top-mid", "top-right",
+                             "mid-left", "mid-mid", "mid-right",
+                             "bottom-left", "bottom-mid", "bottom-right"]
+
+    # Maps each outer field position (str) to its index (0-8).
+    OUTER_FIELD_INDICES = {position: index for index, position in enumerate(OUTER_FIELD_POSITIONS)}
+
+    FULL_MASK = FULL_MASK
+
+    WIN_LINES = WIN_LINES
+
     # Constructor.
     def __init__(self):
         """
         Initialize the 2-layered Tic-Tac-Toe board.
 
         Each position on the board is a 3x3 grid, and the outer field consists of nine such positions.
-        The board is represented as a dictionary with outer field positions as keys and 3x3 grids as values.
-        Each grid contains empty cells initially.
+        Every cell mask starts empty, i.e., each grid contains empty cells initially.
 
         Usage:
             tic_tac_toe_board = TicTacToe_Board_2_layers()
         """
+        # Occupied cells of player X and O, nine 9-bit inner field masks packed into one integer each.
+        self._cells_x = 0
+        self._cells_o = 0
+
+        # Outer field cells won by X, won by O and drawn.
+        self._outer_x = 0
+        self._outer_o = 0
+        self._outer_draw = 0
+
+        # Index (0-8) of the outer field position where the next move should be made, None for a free choice.
+        self._where_to_play_next_index = None
 
-        # List of positions for the outer field.
-        self.OUTER_FIELD_POSITIONS = ["top-left", "top-mid", "top-right",
-                                      "mid-left", "mid-mid", "mid-right",
-                                      "bottom-left", "bottom-mid", "bottom-right"]
-
-        # Initialize the board status with empty cells.
-        self.board_status = {position: [[self.EMPTY_CELL, self.EMPTY_CELL, self.EMPTY_CELL],
-                                        [self.EMPTY_CELL, self.EMPTY_CELL, self.EMPTY_CELL],
-                                        [self.EMPTY_CELL, self.EMPTY_CELL, self.EMPTY_CELL]]
-                             for position in self.OUTER_FIELD_POSITIONS}
-        
-        # Represents the position in the outer field where the next move should be made.
-        self.where_to_play_next = None
-        
         # Represents the player who is currently making a move.
         self.active_player = self.PLAYER_X  # Start with player X.
-        
+
+        # Result of the whole game, None while the game is running.
+        self.game_result = None
+
+        # Zobrist hash of the cells and decided inner fields, updated with every change of the masks.
+        self._zobrist_hash = 0
+
+        # Undo records (move, where_to_play_next index, active player, game result, Zobrist hash) of the moves made so far.
+        self._move_stack = []
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        64-bit Zobrist hash of the position.
+
+        The hash covers the 81 cells, the decided inner fields, 'where_to_play_next' and the active player.
+        The part for the cells and inner fields is maintained incrementally by every move, the keys for the
+        forced inner field and the player to move are added when the hash is read.
+
+        Returns:
+            int: The hash, equal for equal positions regardless of the order of the moves leading to them.
+
+        Usage:
+            key = tic_tac_toe_board.zobrist_hash
+        """
+        index = self._where_to_play_next_index
+        zobrist_hash = self._zobrist_hash ^ ZOBRIST_WHERE_TO_PLAY_NEXT_KEYS[9 if index is None else index]
+        return zobrist_hash ^ ZOBRIST_PLAYER_O_KEY if self.active_player == self.PLAYER_O else zobrist_hash
+
+    def _outer_zobrist_key(self, index_outer_field) -> int:
+        """
+        Return the Zobrist key of the current state (won by X or O, drawn, open) of one outer field cell.
+        """
+        bit = 1 << index_outer_field
+        if self._outer_x & bit:
+            return ZOBRIST_OUTER_X_KEYS[index_outer_field]
+        if self._outer_o & bit:
+            return ZOBRIST_OUTER_O_KEYS[index_outer_field]
+        if self._outer_draw & bit:
+            return ZOBRIST_OUTER_DRAW_KEYS[index_outer_field]
+        return 0
+
+    @property
+    def where_to_play_next(self) -> str:
+        """
+        The position in the outer field where the next move should be made.
+
+        Returns:
+            str: The outer field position, or None if the player may choose any undecided inner field.
+
+        Usage:
+            pos_outer_field = tic_tac_toe_board.where_to_play_next
+        """
+        index = self._where_to_play_next_index
+        return None if index is None else self.OUTER_FIELD_POSITIONS[index]
+
+    @where_to_play_next.setter
+    def where_to_play_next(self, pos_outer_field):
+        self._where_to_play_next_index = None if pos_outer_field is None else self.OUTER_FIELD_INDICES[pos_outer_field]
+
+    @property
+    def board_status(self) -> dict:
+        """
+        Compatibility view of the board in the original dict/list layout.
+
+        Each outer field position maps to a 3x3 list of cells while its inner field is undecided,
+        and to the symbol 'X', 'O' or 'D' once the inner field has been won or drawn. The view is
+        rebuilt from the bitboards on every access, so changes made to it do not affect the board.
+
+        Returns:
+            dict: The outer field positions mapped to their 3x3 grids or result symbols.
+
+        Usage:
+            inner_field = tic_tac_toe_board.board_status['top-left']
+        """
+        board_status = {}
+        for index, pos_outer_field in enumerate(self.OUTER_FIELD_POSITIONS):
+            bit = 1 << index
+            if self._outer_x & bit:
+                board_status[pos_outer_field] = self.PLAYER_X
+            elif self._outer_o & bit:
+                board_status[pos_outer_field] = self.PLAYER_O
+            elif self._outer_draw & bit:
+                board_status[pos_outer_field] = self.DRAW_SYMBOL
+            else:
+                mask_x, mask_o = self._inner_masks(index)
+                board_status[pos_outer_field] = [[self.PLAYER_X if mask_x >> (row * 3 + col) & 1 else
+                                                  self.PLAYER_O if mask_o >> (row * 3 + col) & 1 else
+                                                  self.EMPTY_CELL
+                                                  for col in range(3)] for row in range(3)]
+        return board_status
+
+    def _inner_masks(self, index_outer_field) -> tuple:
+        """
+        Extract the 9-bit masks of both players for one inner field.
+
+        Args:
+            index_outer_field (int): The index (0-8) of the outer field position.
+
+        Returns:
+            tuple: The masks (mask_x, mask_o) of the inner field.
+        """
+        shift = 9 * index_outer_field
+        return (self._cells_x >> shift) & self.FULL_MASK, (self._cells_o >> shift) & self.FULL_MASK
+
+    def bitboards(self) -> tuple:
+        """
+        Return the raw bitboards of the board, e.g., for search engines and evaluation functions.
+
+        Returns:
+            tuple: (cells_x, cells_o, outer_x, outer_o, outer_draw). The cell masks have 81 bits
+                   (bit 'move', see 'push'), the outer masks 9 bits (bit index of OUTER_FIELD_POSITIONS).
+
+        Usage:
+            cells_x, cells_o, outer_x, outer_o, outer_draw = tic_tac_toe_board.bitboards()
+        """
+        return (self._cells_x, self._cells_o, self._outer_x, self._outer_o, self._outer_draw)
+
+    def _inner_outcome(self, index_outer_field) -> str:
+        """
+        Look up the outcome of the cells of one inner field in INNER_OUTCOME_TABLE.
+
+        Args:
+            index_outer_field (int): The index (0-8) of the outer field position.
+
+        Returns:
+            str: 'X' or 'O' for a winner, 'D' for a draw and None if the inner field is still open.
+        """
+        mask_x, mask_o = self._inner_masks(index_outer_field)
+        return INNER_OUTCOME_TABLE[TERNARY_INDEX_TABLE[mask_x] + 2 * TERNARY_INDEX_TABLE[mask_o]]
+
+    def _decided_outer_mask(self) -> int:
+        """
+        Return the 9-bit mask of outer field cells that are won or drawn.
+        """
+        return self._outer_x | self._outer_o | self._outer_draw
+
+    def _update_game_result(self):
+        """
+        Recompute the cached result of the whole game from the outer field masks.
+        """
+        if WINNING_LINES_TABLE[self._outer_x]:
+            self.game_result = self.PLAYER_X
+        elif WINNING_LINES_TABLE[self._outer_o]:
+            self.game_result = self.PLAYER_O
+        elif self._decided_outer_mask() == self.FULL_MASK:
+            self.game_result = self.DRAW_SYMBOL
+        else:
+            self.game_result = None
+
+    def is_game_over(self) -> bool:
+        """
+        Check if the whole game is over, i.e., won by a player or drawn.
+
+        Returns:
+            bool: True if the game is over, False otherwise.
+
+        Usage:
+            game_over = tic_tac_toe_board.is_game_over()
+        """
+        return self.game_result is not None
+
     def is_inner_field_full(self, pos_outer_field) -> bool:
         """
         Check if the specified inner field is full. This would cause a draw.
@@ -81,14 +450,16 @@ class TicTacToe_Board_2_layers:
         Usage:
             is_full = tic_tac_toe_board.is_inner_field_full('top-left')
         """
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
+
         # Check if the inner field is already won or a draw.
-        if type(self.board_status[pos_outer_field]) == str:
+        if self._decided_outer_mask() >> index & 1:
             return False
-        
-        # Check if every cell in the specified inner field is filled. 
-        else:     
-            return all([all([inner_cell != self.EMPTY_CELL for inner_cell in inner_row]) for inner_row in self.board_status[pos_outer_field]])
-    
+
+        # Check if every cell in the specified inner field is filled.
+        mask_x, mask_o = self._inner_masks(index)
+        return mask_x | mask_o == self.FULL_MASK
+
     def is_outer_field_full(self) -> bool:
         """
         Check if the entire outer field is full. This would cause an overall draw.
@@ -100,11 +471,12 @@ class TicTacToe_Board_2_layers:
             is_full = tic_tac_toe_board.is_outer_field_full()
         """
         # Check if every cell on the outer field is won (full).
-        return all([self.is_cell_of_outer_field_won(pos_outer_field) for pos_outer_field in self.board_status.keys()])
-   
-    def update_where_to_play_next(self, row_inner_field, col_inner_field):   
+        return self._decided_outer_mask() == self.FULL_MASK
+
+    def update_where_to_play_next(self, row_inner_field, col_inner_field):
         """
         Update the 'where_to_play_next' attribute based on the inner field position specified in the last made move.
+        If the inner field the move points to is already won or a draw, the next player may play anywhere.
 
         Args:
             row_inner_field (int): The row index of the inner field from last move.
@@ -113,12 +485,10 @@ class TicTacToe_Board_2_layers:
         Usage:
             tic_tac_toe_board.update_where_to_play_next(row_inner_field, col_inner_field)
         """
-        # Iterate through the POSITIONS_MAPPING_DICT to find the outer position for the next move corresponding to the given inner field position.
-        for key, value in self.POSITIONS_MAPPING_DICT.items():
-            if value == (row_inner_field, col_inner_field):
-                self.where_to_play_next = key
-                break
-    
+        # The cell index inside the inner field is the index of the outer position for the next move.
+        index = row_inner_field * 3 + col_inner_field
+        self._where_to_play_next_index = None if self._decided_outer_mask() >> index & 1 else index
+
     def mark_outer_cell_as_won(self, player, pos_outer_field):
         """
         Mark the specified outer cell as won by the given player.
@@ -130,12 +500,23 @@ class TicTacToe_Board_2_layers:
         Usage:
             tic_tac_toe_board.mark_outer_cell_as_won('X', 'top-left')
         """
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
+        bit = 1 << index
+        self._zobrist_hash ^= self._outer_zobrist_key(index)
+
         if player == self.PLAYER_X:
-            self.board_status[pos_outer_field] = self.PLAYER_X
+            self._outer_x |= bit
+            self._outer_o &= ~bit
+            self._outer_draw &= ~bit
 
         elif player == self.PLAYER_O:
-            self.board_status[pos_outer_field] = self.PLAYER_O
-            
+            self._outer_o |= bit
+            self._outer_x &= ~bit
+            self._outer_draw &= ~bit
+
+        self._zobrist_hash ^= self._outer_zobrist_key(index)
+        self._update_game_result()
+
     def mark_outer_field_as_draw(self, pos_outer_field):
         """
         Mark the specified inner field as a draw.
@@ -144,10 +525,19 @@ class TicTacToe_Board_2_layers:
             pos_outer_field (str): The position in the outer field.
 
         Usage:
-            tic_tac_toe_board.mark_outer_field_as_won('X', 'top-left')
+            tic_tac_toe_board.mark_outer_field_as_draw('top-left')
         """
-        self.board_status[pos_outer_field] = self.DRAW_SYMBOL
-    
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
+        bit = 1 << index
+        self._zobrist_hash ^= self._outer_zobrist_key(index)
+
+        self._outer_draw |= bit
+        self._outer_x &= ~bit
+        self._outer_o &= ~bit
+
+        self._zobrist_hash ^= self._outer_zobrist_key(index)
+        self._update_game_result()
+
     def is_cell_of_outer_field_won(self, pos_outer_field) -> bool:
         """
         Check if the entire inner field is won.
@@ -161,12 +551,9 @@ class TicTacToe_Board_2_layers:
         Usage:
             is_won = tic_tac_toe_board.is_cell_of_outer_field_won('top-left')
         """
-        # If the outer field is won, the structure of board.status has changed, 
-        # and the value associated with its key is no longer a two-dimensional list. 
-        # It would be set to either 'X' or 'O'. Therefore, the value associated with 
-        # the key "pos_outer_field" would be a string.
-        return False if type(self.board_status[pos_outer_field]) == list else True
-            
+        # A cell of the outer field counts as won once it is decided, i.e., won by a player or drawn.
+        return bool(self._decided_outer_mask() >> self.OUTER_FIELD_INDICES[pos_outer_field] & 1)
+
     def is_cell_of_inner_field_empty(self, pos_outer_field, row_inner_field, col_inner_field) -> bool:
         """
         Check if a cell in the inner field is empty.
@@ -182,29 +569,34 @@ class TicTacToe_Board_2_layers:
         Usage:
             is_empty = tic_tac_toe_board.is_cell_of_inner_field_empty('top-left', 1, 1)
         """
-        
-        # Check if the outer field is won, as in that case, the structure of board.status has changed, 
-        # and the value associated with its key is no longer a two-dimensional list. 
-        # It would be set to either 'X' or 'O'.
-        if not self.is_cell_of_outer_field_won(pos_outer_field):
-            return self.board_status[pos_outer_field][row_inner_field][col_inner_field] == ''  
-        else:
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
+
+        # Cells of an inner field that is already won or a draw can no longer be played.
+        if self._decided_outer_mask() >> index & 1:
             return False
-    
+
+        cell = 9 * index + row_inner_field * 3 + col_inner_field
+        return not (self._cells_x | self._cells_o) >> cell & 1
+
     def make_move(self, player, pos_outer_field, row_inner_field, col_inner_field):
         """
         Update the board status based on the inner field where the player made their move.
 
+        The move is applied atomically: If it wins or fills the inner field, the outer cell is marked as won
+        or drawn and the result of the whole game is updated. Afterwards 'where_to_play_next' points to the
+        inner field selected by the move (None if that field is already decided) and the other player is active.
+
         Args:
             player (str): The player making the move ('X' or 'O').
             pos_outer_field (str): The position in the outer field.
             row_inner_field (int): The row index of the inner field.
             col_inner_field (int): The column index of the inner field.
-            
+
         Raises:
             ValueError: If the player is not 'X' or 'O'.
             ValueError: If the outer field position is invalid.
             ValueError: If the inner field position is invalid.
+            ValueError: If the game is already over.
 
         Usage:
             tic_tac_toe_board.make_move('X', 'top-left', 1, 1)
@@ -214,7 +606,7 @@ class TicTacToe_Board_2_layers:
             raise ValueError("Invalid player. Player must be 'X' or 'O'.")
 
         # Validate outer field position.
-        if pos_outer_field not in self.OUTER_FIELD_POSITIONS:
+        if pos_outer_field not in self.OUTER_FIELD_INDICES:
             raise ValueError("Invalid outer field position.")
 
         # Validate inner field position
@@ -224,13 +616,572 @@ class TicTacToe_Board_2_layers:
         # Check if the selected cell is empty before making a move
         if not self.is_cell_of_inner_field_empty(pos_outer_field, row_inner_field, col_inner_field):
             raise ValueError("Selected cell is not empty. Choose an empty cell for the move.")
-        
+
+        # No more moves once the whole game is decided.
+        if self.game_result is not None:
+            raise ValueError("The game is already over.")
+
+        self._apply_move(player, self.coordinates_to_move(pos_outer_field, row_inner_field, col_inner_field))
+
+    def _apply_move(self, player, move):
+        """
+        Apply a validated move and record how to undo it on the move stack.
+
+        Args:
+            player (str): The player making the move ('X' or 'O').
+            move (int): The cell (0-80) of the move, '9 * index_outer_field + row_inner_field * 3 + col_inner_field'.
+        """
+        index, index_inner_field = divmod(move, 9)
+
+        # The undo record only holds the state that cannot be derived from the move itself.
+        self._move_stack.append((move, self._where_to_play_next_index, self.active_player, self.game_result, self._zobrist_hash))
+
         if player == self.PLAYER_X:
-            self.board_status[pos_outer_field][row_inner_field][col_inner_field] = "X"
+            self._cells_x |= 1 << move
+            self._zobrist_hash ^= ZOBRIST_CELL_X_KEYS[move]
+        else:
+            self._cells_o |= 1 << move
+            self._zobrist_hash ^= ZOBRIST_CELL_O_KEYS[move]
+
+        # Resolve the inner field. Only the player who just moved can have won it.
+        outcome = self._inner_outcome(index)
+        if outcome is not None:
+            if outcome == self.DRAW_SYMBOL:
+                self._outer_draw |= 1 << index
+                self._zobrist_hash ^= ZOBRIST_OUTER_DRAW_KEYS[index]
+            elif player == self.PLAYER_X:
+                self._outer_x |= 1 << index
+                self._zobrist_hash ^= ZOBRIST_OUTER_X_KEYS[index]
+            else:
+                self._outer_o |= 1 << index
+                self._zobrist_hash ^= ZOBRIST_OUTER_O_KEYS[index]
+            self._update_game_result()
+
+        # Select the inner field for the next move and hand over to the other player.
+        self._where_to_play_next_index = None if self._decided_outer_mask() >> index_inner_field & 1 else index_inner_field
+        self.active_player = self.PLAYER_O if player == self.PLAYER_X else self.PLAYER_X
+
+    def push(self, move):
+        """
+        Make a move for the active player, given as a cell index, and put it on the move stack.
+
+        The cells are numbered from 0 to 80: The cell (row_inner_field, col_inner_field) of the inner field at
+        outer field index 'index_outer_field' (see OUTER_FIELD_POSITIONS) has the number
+        '9 * index_outer_field + row_inner_field * 3 + col_inner_field'. Unlike 'make_move', the move has to
+        follow 'where_to_play_next'. Every move, also one made by 'make_move', can be taken back by 'pop'.
+
+        Args:
+            move (int): The cell (0-80) to place the symbol of the active player in.
+
+        Raises:
+            ValueError: If the game is already over.
+            ValueError: If the move is not a legal cell for the active player.
+
+        Usage:
+            tic_tac_toe_board.push(40)
+        """
+        # No more moves once the whole game is decided.
+        if self.game_result is not None:
+            raise ValueError("The game is already over.")
+
+        if not self.is_legal_move(move):
+            raise ValueError("Illegal move. Choose an empty cell in an allowed inner field.")
+
+        self._apply_move(self.active_player, move)
+
+    def legal_moves_mask(self) -> int:
+        """
+        Return the legal moves of the active player as an 81-bit mask, bit 'move' set for every legal cell.
+
+        The rules are applied here in one place: If 'where_to_play_next' is set, only the empty cells of that
+        inner field are legal. If it is None, because the previous move sent the player to an inner field
+        that is already won or a draw (or at the start of the game), every empty cell of every undecided
+        inner field is legal. There are no legal moves once the game is over.
+
+        Returns:
+            int: The mask of legal moves.
+
+        Usage:
+            mask = tic_tac_toe_board.legal_moves_mask()
+        """
+        if self.game_result is not None:
+            return 0
+
+        index = self._where_to_play_next_index
+        if index is not None:
+            return ~(self._cells_x | self._cells_o) & (FULL_MASK << 9 * index)
+
+        return ~(self._cells_x | self._cells_o) & OPEN_CELLS_TABLE[FULL_MASK ^ self._decided_outer_mask()]
+
+    def legal_moves(self) -> list:
+        """
+        Return the legal moves of the active player as cells (0-80) in ascending order.
+
+        Returns:
+            list: The legal moves (see 'push' for the numbering of the cells).
+
+        Usage:
+            for move in tic_tac_toe_board.legal_moves():
+                tic_tac_toe_board.push(move)
+                ...
+                tic_tac_toe_board.pop()
+        """
+        if self.game_result is not None:
+            return []
+
+        # Look up the empty cells of each allowed inner field instead of extracting the bits one by one.
+        empty_cells = ~(self._cells_x | self._cells_o)
+        index = self._where_to_play_next_index
+        if index is not None:
+            return list(FIELD_MOVES_TABLE[index][(empty_cells >> 9 * index) & FULL_MASK])
+
+        moves = []
+        decided_outer_mask = self._decided_outer_mask()
+        for index in range(9):
+            if not decided_outer_mask >> index & 1:
+                moves.extend(FIELD_MOVES_TABLE[index][(empty_cells >> 9 * index) & FULL_MASK])
+        return moves
+
+    def count_legal_moves(self) -> int:
+        """
+        Count the legal moves of the active player without building a list of them.
+
+        Returns:
+            int: The number of legal moves.
+
+        Usage:
+            number_of_moves = tic_tac_toe_board.count_legal_moves()
+        """
+        return self.legal_moves_mask().bit_count()
+
+    def is_legal_move(self, move) -> bool:
+        """
+        Check if a cell (0-80) is a legal move for the active player.
+
+        Args:
+            move (int): The cell to check.
+
+        Returns:
+            bool: True if the move is legal, False otherwise.
+
+        Usage:
+            is_legal = tic_tac_toe_board.is_legal_move(40)
+        """
+        return 0 <= move < 81 and bool(self.legal_moves_mask() >> move & 1)
+
+    def coordinates_to_move(self, pos_outer_field, row_inner_field, col_inner_field) -> int:
+        """
+        Convert board coordinates into the cell number (0-80) of a move.
+
+        Args:
+            pos_outer_field (str): The position in the outer field.
+            row_inner_field (int): The row index of the inner field.
+            col_inner_field (int): The column index of the inner field.
+
+        Returns:
+            int: The cell number of the move.
+
+        Usage:
+            move = tic_tac_toe_board.coordinates_to_move('mid-mid', 1, 1)  # 40
+        """
+        return 9 * self.OUTER_FIELD_INDICES[pos_outer_field] + row_inner_field * 3 + col_inner_field
+
+    def move_to_coordinates(self, move) -> tuple:
+        """
+        Convert the cell number (0-80) of a move into board coordinates.
+
+        Args:
+            move (int): The cell number of the move.
+
+        Returns:
+            tuple: The outer field position (str), row index of inner field (int) and column index of inner field (int).
+
+        Usage:
+            pos_outer_field, row_inner_field, col_inner_field = tic_tac_toe_board.move_to_coordinates(40)
+        """
+        index, index_inner_field = divmod(move, 9)
+        return (self.OUTER_FIELD_POSITIONS[index], index_inner_field // 3, index_inner_field % 3)
+
+    def move_to_notation(self, move) -> str:
+        """
+        Convert the cell number (0-80) of a move into its text notation.
+
+        The notation addresses the 9x9 grid of all cells like a chess board: the column 'a' to 'i' from left to
+        right, followed by the row 1 to 9 from top to bottom. The center cell of the board is 'e5'.
+
+        Args:
+            move (int): The cell number of the move.
+
+        Returns:
+            str: The notation of the move.
+
+        Usage:
+            notation = tic_tac_toe_board.move_to_notation(40)  # 'e5'
+        """
+        index, index_inner_field = divmod(move, 9)
+        row_outer_field, col_outer_field = divmod(index, 3)
+        row_inner_field, col_inner_field = divmod(index_inner_field, 3)
+        return f"{NOTATION_COLUMNS[3 * col_outer_field + col_inner_field]}{3 * row_outer_field + row_inner_field + 1}"
+
+    def notation_to_move(self, notation) -> int:
+        """
+        Convert the text notation of a move (see 'move_to_notation') into its cell number (0-80).
+
+        Args:
+            notation (str): The notation of the move, e.g., 'e5'.
+
+        Returns:
+            int: The cell number of the move.
+
+        Raises:
+            ValueError: If the notation is not a column 'a' to 'i' followed by a row 1 to 9.
+
+        Usage:
+            move = tic_tac_toe_board.notation_to_move('e5')  # 40
+        """
+        if len(notation) != 2 or notation[0] not in NOTATION_COLUMNS or notation[1] not in '123456789':
+            raise ValueError(f"Invalid move notation '{notation}'. Use a column a-i and a row 1-9, e.g., 'e5'.")
+
+        col_outer_field, col_inner_field = divmod(NOTATION_COLUMNS.index(notation[0]), 3)
+        row_outer_field, row_inner_field = divmod(int(notation[1]) - 1, 3)
+        return 9 * (3 * row_outer_field + col_outer_field) + 3 * row_inner_field + col_inner_field
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the position (not the moves leading to it) into POSITION_SIZE (19) bytes.
+
+        The encoding is a big-endian integer (see 'position_key') with the bits:
+            0:      Active player, 1 for O.
+            1-4:    Index of 'where_to_play_next', 9 for a free choice.
+            5-22:   State of the outer field cells, 2 bits per index (0 open, 1 won by X, 2 won by O, 3 drawn).
+            23-151: The 81 cells as base-3 number, the inner field at index i (base-3 value, see
+                    INNER_OUTCOME_TABLE) being digit i in base 3**9.
+
+        Equal positions have equal encodings, whatever the order of the moves leading to them.
+
+        Returns:
+            bytes: The encoded position.
+
+        Usage:
+            data = tic_tac_toe_board.to_bytes()
+        """
+        return self.position_key().to_bytes(POSITION_SIZE, 'big')
+
+    def position_key(self) -> int:
+        """
+        Return the position as an integer of 152 bits, the value of the encoding of 'to_bytes'.
+
+        Unlike 'zobrist_hash', the key is unique for every position and can be decoded again.
+
+        Returns:
+            int: The position key.
+
+        Usage:
+            key = tic_tac_toe_board.position_key()
+        """
+        return self._transformed_position_key(0)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Create a board in the position encoded by 'to_bytes' (or given as 'position_key').
+
+        The board has no move stack, so the moves leading to the position cannot be taken back.
+
+        Args:
+            data (bytes): The encoded position, or the position key as int.
+
+        Returns:
+            TicTacToe_Board_2_layers: The board in the position.
+
+        Raises:
+            ValueError: If the data is not an encoded position.
+
+        Usage:
+            tic_tac_toe_board = TicTacToe_Board_2_layers.from_bytes(data)
+        """
+        if isinstance(data, int):
+            key = data
+        elif len(data) == POSITION_SIZE:
+            key = int.from_bytes(data, 'big')
+        else:
+            raise ValueError(f"Invalid position. An encoded position has {POSITION_SIZE} bytes.")
+
+        cells, outer_state, where_index = key >> 23, (key >> 5) & (1 << 18) - 1, (key >> 1) & 0xF
+        if where_index > 9 or cells >= 3 ** 81:
+            raise ValueError("Invalid position. The encoding is out of range.")
+
+        cells_x = cells_o = outer_x = outer_o = outer_draw = 0
+        for index in range(9):
+            cells, field_value = divmod(cells, 3 ** 9)
+            mask_x, mask_o = TERNARY_MASKS_TABLE[field_value]
+            cells_x |= mask_x << 9 * index
+            cells_o |= mask_o << 9 * index
+
+            state = outer_state >> 2 * index & 3
+            if state == 1:
+                outer_x |= 1 << index
+            elif state == 2:
+                outer_o |= 1 << index
+            elif state == 3:
+                outer_draw |= 1 << index
+
+        return cls.from_bitboards(cells_x, cells_o, outer_x, outer_o, outer_draw,
+                                  None if where_index == 9 else where_index, cls.PLAYER_O if key & 1 else cls.PLAYER_X)
+
+    @classmethod
+    def from_bitboards(cls, cells_x, cells_o, outer_x, outer_o, outer_draw, where_to_play_next_index=None, active_player='X'):
+        """
+        Create a board from raw bitboards (see 'bitboards'), e.g., to expand a compact position.
+
+        The masks are not checked for consistency. The board has no move stack.
+
+        Args:
+            cells_x (int): The 81-bit mask of the cells of X.
+            cells_o (int): The 81-bit mask of the cells of O.
+            outer_x (int): The 9-bit mask of the inner fields won by X.
+            outer_o (int): The 9-bit mask of the inner fields won by O.
+            outer_draw (int): The 9-bit mask of the drawn inner fields.
+            where_to_play_next_index (int): The index (0-8) of the forced inner field, None for a free choice.
+            active_player (str): The player to move ('X' or 'O').
+
+        Returns:
+            TicTacToe_Board_2_layers: The board in the position.
+
+        Usage:
+            tic_tac_toe_board = TicTacToe_Board_2_layers.from_bitboards(*other_board.bitboards())
+        """
+        board = cls()
+        board._cells_x, board._cells_o = cells_x, cells_o
+        board._outer_x, board._outer_o, board._outer_draw = outer_x, outer_o, outer_draw
+        board._where_to_play_next_index = where_to_play_next_index
+        board.active_player = active_player
+        board._update_game_result()
+        board._zobrist_hash = board._compute_zobrist_hash()
+        return board
+
+    def transform_move(self, move, symmetry) -> int:
+        """
+        Map a move (0-80) by one of the 8 symmetries (see SYMMETRY_PERMUTATIONS).
+
+        Args:
+            move (int): The cell number of the move.
+            symmetry (int): The index (0-7) of the symmetry, SYMMETRY_INVERSES[symmetry] maps the move back.
+
+        Returns:
+            int: The cell number of the transformed move.
+
+        Usage:
+            move = tic_tac_toe_board.transform_move(0, 1)  # 'top-left' (0, 0) rotated to 'top-right' (0, 2): 20
+        """
+        return SYMMETRY_MOVE_PERMUTATIONS[symmetry][move]
+
+    def _transformed_position_key(self, symmetry) -> int:
+        """
+        Compute the position key (see 'position_key') of the position transformed by a symmetry (0 for the identity).
+        """
+        permutation = SYMMETRY_PERMUTATIONS[symmetry]
+        masks_table = SYMMETRY_MASKS_TABLE[symmetry]
+
+        # The inner field at index i moves to index permutation[i] and its cells are permuted in the same way.
+        field_values = [0] * 9
+        for index in range(9):
+            mask_x, mask_o = self._inner_masks(index)
+            field_values[permutation[index]] = TERNARY_INDEX_TABLE[masks_table[mask_x]] + 2 * TERNARY_INDEX_TABLE[masks_table[mask_o]]
+        cells = 0
+        for field_value in reversed(field_values):
+            cells = cells * 3 ** 9 + field_value
+
+        outer_x, outer_o, outer_draw = masks_table[self._outer_x], masks_table[self._outer_o], masks_table[self._outer_draw]
+        outer_state = 0
+        for index in range(9):
+            outer_state |= ((outer_x >> index & 1) | (outer_o >> index & 1) << 1 | (outer_draw >> index & 1) * 3) << 2 * index
+
+        where_index = 9 if self._where_to_play_next_index is None else permutation[self._where_to_play_next_index]
+        return cells << 23 | outer_state << 5 | where_index << 1 | (self.active_player == self.PLAYER_O)
+
+    def transform(self, symmetry):
+        """
+        Create a board with the position transformed by one of the 8 symmetries (see SYMMETRY_PERMUTATIONS).
+
+        The symmetry is applied to the outer field, to every inner field and to 'where_to_play_next', so the
+        transformed position is equivalent under the rules. The new board has no move stack.
+
+        Args:
+            symmetry (int): The index (0-7) of the symmetry.
+
+        Returns:
+            TicTacToe_Board_2_layers: The board in the transformed position.
+
+        Usage:
+            rotated_board = tic_tac_toe_board.transform(1)
+        """
+        return self.from_bytes(self._transformed_position_key(symmetry))
+
+    def canonical(self) -> tuple:
+        """
+        Find the canonical position among the 8 symmetric twins of the position: the one with the smallest position
+        key (i.e., the lexicographically smallest 'to_bytes' encoding).
+
+        All symmetric positions have the same canonical position, so caches and tables keyed by it need up to 8 times
+        fewer entries. A move found for the canonical position is mapped back to this board with
+        'transform_move(move, SYMMETRY_INVERSES[symmetry])'.
+
+        Returns:
+            tuple: The canonical board (without move stack) and the index (0-7) of the symmetry transforming
+                   this board into it.
+
+        Usage:
+            canonical_board, symmetry = tic_tac_toe_board.canonical()
+        """
+        key, symmetry = self.canonical_key()
+        return self.from_bytes(key), symmetry
+
+    def canonical_key(self) -> tuple:
+        """
+        Compute the position key of the canonical position (see 'canonical') without creating a board.
+
+        Returns:
+            tuple: The canonical position key and the index (0-7) of the symmetry leading to it.
+
+        Usage:
+            key, symmetry = tic_tac_toe_board.canonical_key()
+        """
+        return min((self._transformed_position_key(symmetry), symmetry) for symmetry in range(8))
+
+    def probe(self, tablebase) -> tuple:
+        """
+        Look up the exact result and the best move of the position in an endgame tablebase (see `src.tablebase`).
+
+        Args:
+            tablebase (Tablebase): The tablebase, built with 'python -m src.tablebase'.
+
+        Returns:
+            tuple: The result of the game with best play ('X', 'O' or 'D'), the best move (0-80) and the number of
+                   plies to the end of the game, None if the position has more open cells than the tablebase covers
+                   (or is missing in a tablebase that does not solve misses).
+
+        Usage:
+            entry = tic_tac_toe_board.probe(Tablebase('endgame.tttbase'))
+        """
+        return tablebase.probe(self)
+
+    def _compute_zobrist_hash(self) -> int:
+        """
+        Compute the incrementally maintained part of the Zobrist hash (cells and outer field) from scratch.
+        """
+        zobrist_hash = 0
+        for index in range(9):
+            mask_x, mask_o = self._inner_masks(index)
+            for move in FIELD_MOVES_TABLE[index][mask_x]:
+                zobrist_hash ^= ZOBRIST_CELL_X_KEYS[move]
+            for move in FIELD_MOVES_TABLE[index][mask_o]:
+                zobrist_hash ^= ZOBRIST_CELL_O_KEYS[move]
+            zobrist_hash ^= self._outer_zobrist_key(index)
+        return zobrist_hash
+
+    def game_record(self) -> bytes:
+        """
+        Return the moves made so far as a game record of one byte per move (the cell 0-80).
+
+        Returns:
+            bytes: The game record.
+
+        Usage:
+            record = tic_tac_toe_board.game_record()
+        """
+        return bytes(move for move, *_ in self._move_stack)
+
+    @classmethod
+    def from_game_record(cls, record):
+        """
+        Create a board by replaying a game record (see 'game_record') from the start position.
+
+        Args:
+            record (bytes): The moves of the game, one byte per move.
+
+        Returns:
+            TicTacToe_Board_2_layers: The board after the moves, with all moves on the move stack.
+
+        Raises:
+            ValueError: If a move of the record is not legal (see 'push').
+
+        Usage:
+            tic_tac_toe_board = TicTacToe_Board_2_layers.from_game_record(record)
+        """
+        board = cls()
+        for move in record:
+            board.push(move)
+        return board
+
+    def to_notation(self) -> str:
+        """
+        Return the moves made so far in text notation (see 'move_to_notation'), separated by spaces.
+
+        Returns:
+            str: The game in text notation, e.g., 'e5 e4 e2'.
+
+        Usage:
+            text = tic_tac_toe_board.to_notation()
+        """
+        return ' '.join(self.move_to_notation(move) for move, *_ in self._move_stack)
+
+    @classmethod
+    def from_notation(cls, text):
+        """
+        Create a board by replaying a game given in text notation (see 'to_notation') from the start position.
+
+        Args:
+            text (str): The moves of the game, separated by whitespace.
+
+        Returns:
+            TicTacToe_Board_2_layers: The board after the moves, with all moves on the move stack.
+
+        Raises:
+            ValueError: If a move is not valid notation or not legal.
+
+        Usage:
+            tic_tac_toe_board = TicTacToe_Board_2_layers.from_notation('e5 e4 e2')
+        """
+        board = cls()
+        for notation in text.split():
+            board.push(board.notation_to_move(notation))
+        return board
+
+    def pop(self) -> int:
+        """
+        Take back the last move and restore the board exactly as it was before the move.
+
+        Inner fields decided by the move are reopened, and 'where_to_play_next', 'active_player', 'game_result'
+        and the Zobrist hash are restored from the undo record. Outer cells set directly with
+        'mark_outer_cell_as_won' or 'mark_outer_field_as_draw' are not part of the move stack.
+
+        Returns:
+            int: The cell (0-80) of the move that was taken back.
+
+        Raises:
+            ValueError: If there is no move to take back.
+
+        Usage:
+            move = tic_tac_toe_board.pop()
+        """
+        if not self._move_stack:
+            raise ValueError("No move to undo.")
+
+        move, self._where_to_play_next_index, self.active_player, self.game_result, self._zobrist_hash = self._move_stack.pop()
+
+        bit = ~(1 << move)
+        self._cells_x &= bit
+        self._cells_o &= bit
+
+        # The inner field was undecided before the move, otherwise the move would not have been possible.
+        bit = ~(1 << (move // 9))
+        self._outer_x &= bit
+        self._outer_o &= bit
+        self._outer_draw &= bit
+
+        return move
 
-        elif player == self.PLAYER_O:
-            self.board_status[pos_outer_field][row_inner_field][col_inner_field] = "O"
-        
     def check_for_draw_inner_field(self, pos_outer_field) -> bool:
         """
         Check for a draw in the specified inner field.
@@ -244,9 +1195,15 @@ class TicTacToe_Board_2_layers:
         Usage:
             is_draw = tic_tac_toe_board.check_for_draw_inner_field('top-left')
         """
-        # Check if the inner field is full and if there is no winner.
-        return self.is_inner_field_full(pos_outer_field) and not self.check_for_win_inner_field(pos_outer_field)
-    
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
+
+        # An inner field that is already decided keeps its result.
+        if self._decided_outer_mask() >> index & 1:
+            return bool(self._outer_draw >> index & 1)
+
+        # The inner field is a draw if it is full and there is no winner.
+        return self._inner_outcome(index) == self.DRAW_SYMBOL
+
     def check_for_draw_outer_field(self) -> bool:
         """
         Check for a draw in the outer field.
@@ -257,9 +1214,9 @@ class TicTacToe_Board_2_layers:
         Usage:
             is_draw = tic_tac_toe_board.check_for_draw_outer_field()
         """
-        # Check if the outer field is full and if there is no winner.
-        return self.is_outer_field_full() and not self.check_for_win_outer_field()
-    
+        # The outer field is a draw if it is full and there is no winner (cached by make_move).
+        return self.game_result == self.DRAW_SYMBOL
+
     def check_for_win_inner_field(self, pos_outer_field) -> str:
         """
         Check for a winner in the specified inner field.
@@ -273,26 +1230,18 @@ class TicTacToe_Board_2_layers:
         Usage:
             winner = tic_tac_toe_board.check_for_win_inner_field('top-left')
         """
-        # Retrieve the specified inner field.
-        check_this_inner_field = self.board_status[pos_outer_field]
-
-        # Check for a winner in horizontal and vertical lines.
-        for i in range(3):
-            if check_this_inner_field[i][0] == check_this_inner_field[i][1] == check_this_inner_field[i][2] != self.EMPTY_CELL:
-                return check_this_inner_field[i][0]  # Winner in horizontal line.
-
-            if check_this_inner_field[0][i] == check_this_inner_field[1][i] == check_this_inner_field[2][i] != self.EMPTY_CELL:
-                return check_this_inner_field[0][i]  # Winner in vertical line.
+        index = self.OUTER_FIELD_INDICES[pos_outer_field]
 
-        # Check for a winner in diagonal lines.
-        if check_this_inner_field[0][0] == check_this_inner_field[1][1] == check_this_inner_field[2][2] != self.EMPTY_CELL:
-            return check_this_inner_field[0][0]  # Winner in the main diagonal.
+        # An inner field that is already marked as won keeps its winner.
+        if self._outer_x >> index & 1:
+            return self.PLAYER_X
+        if self._outer_o >> index & 1:
+            return self.PLAYER_O
 
-        if check_this_inner_field[0][2] == check_this_inner_field[1][1] == check_this_inner_field[2][0] != self.EMPTY_CELL:
-            return check_this_inner_field[0][2]  # Winner in the secondary diagonal.
+        # Look up the outcome of the specified inner field. A full field without a winner has no winner.
+        outcome = self._inner_outcome(index)
+        return None if outcome == self.DRAW_SYMBOL else outcome
 
-        return None  # No winner.
-    
     def check_for_win_outer_field(self) -> str:
         """
         Check for an overall winner in the outer field.
@@ -303,19 +1252,5 @@ class TicTacToe_Board_2_layers:
         Usage:
             winner = tic_tac_toe_board.check_for_win_outer_field()
         """
-        # Define the lines to check for a winner in the outer field; horizontal, vertical or diagonal winner.
-        lines_to_check = [['top-left', 'top-mid', 'top-right'],
-                          ['mid-left', 'mid-mid', 'mid-right'],
-                          ['bottom-left', 'bottom-mid', 'bottom-right'],
-                          ['top-left', 'mid-left', 'bottom-left'],
-                          ['top-mid', 'mid-mid', 'bottom-mid'],
-                          ['top-right', 'mid-right', 'bottom-right'],
-                          ['top-left', 'mid-mid', 'bottom-right'],
-                          ['top-right', 'mid-mid', 'bottom-left']]
-
-        # Check each line for a winner in the outer field.
-        for line in lines_to_check:
-            if (all([type(self.board_status[outer_cell]) is not list for outer_cell in line])) and (self.board_status[line[0]] == self.board_status[line[1]] == self.board_status[line[2]]) and self.board_status[line[0]] != self.DRAW_SYMBOL:
-                return self.board_status[line[0]]  # Winner
-
-        return None  # No winner.
\ No newline at end of file
+        # The result is cached whenever an outer cell is decided. A draw has no winner.
+        return None if self.game_result == self.DRAW_SYMBOL else self.game_result
@@ -0,0 +1,270 @@
+"""
+Opening book of 2-layered-TicTacToe, built offline by searching the positions of the first plies.
+
+The builder walks all positions reachable within the first K plies, searches each of them with an
+`AlphaBetaEngine` and stores the best move and score. Symmetric positions are stored once, under the key of their
+canonical position (see `TicTacToe_Board_2_layers.canonical_key`), which reduces the 1 + 81 + 720 + 6336 positions
+of the first 4 plies to 1 + 15 + 102 + 822.
+
+Book file layout:
+
+    MAGIC (8 bytes), the number of plies K (1 byte), followed by one entry per position, sorted by key:
+        canonical position key (POSITION_SIZE = 19 bytes, the encoding of `to_bytes`),
+        best move in the canonical position (1 byte, the cell 0-80),
+        search depth (1 byte),
+        score for the player to move (4 bytes, signed big-endian).
+
+An `OpeningBook` maps the file into memory and finds a position by binary search over the fixed-size entries,
+without reading or parsing the file. A `BookEngine` answers from the book and searches only the positions that
+are not in it, with the same 'search(board)' interface as the engines (e.g., for `GameSession` or `main.py`).
+
+Usage:
+    build_book('opening.tttbook', plies=4, engine=AlphaBetaEngine(time_limit=None, max_depth=8))
+
+    with OpeningBook('opening.tttbook') as opening_book:
+        entry = opening_book.lookup(tic_tac_toe_board)  # (move, score, depth) or None
+        engine = BookEngine(opening_book, AlphaBetaEngine(time_limit=0.1))
+
+    python -m src.book opening.tttbook --plies 4 --depth 8
+"""
+
+import argparse
+import mmap
+import struct
+import time
+
+from src.board import POSITION_SIZE, SYMMETRY_INVERSES, SYMMETRY_MOVE_PERMUTATIONS, TicTacToe_Board_2_layers
+from src.engine import AlphaBetaEngine, SearchResult
+
+MAGIC = b'TTT2BOOK'
+HEADER_SIZE = len(MAGIC) + 1
+
+# Move, depth and score following the key of an entry.
+ENTRY_VALUE_FORMAT = struct.Struct('>BBi')
+ENTRY_SIZE = POSITION_SIZE + ENTRY_VALUE_FORMAT.size
+
+
+def _number_of_moves(board) -> int:
+    """
+    Return the number of symbols on the board, i.e., the ply of the position.
+    """
+    cells_x, cells_o = board.bitboards()[:2]
+    return (cells_x | cells_o).bit_count()
+
+
+def build_book(path, plies=4, engine=None, progress=None) -> int:
+    """
+    Search the positions of the first plies and write the opening book.
+
+    The positions are explored ply by ply. Only one position of each set of symmetric positions is searched,
+    in its canonical orientation, and finished games are left out.
+
+    Args:
+        path (str): The path of the book file (overwritten if it exists).
+        plies (int): The number of plies K covered by the book: positions with fewer than K moves (1-81).
+        engine (AlphaBetaEngine): The engine searching the positions, a search to depth 6 if None.
+        progress (callable): Called with the ply and the number of positions of the ply before it is searched.
+
+    Returns:
+        int: The number of positions in the book.
+
+    Raises:
+        ValueError: If the number of plies is not within 1 to 81.
+
+    Usage:
+        number_of_positions = build_book('opening.tttbook', plies=4)
+    """
+    if not 1 <= plies <= 81:
+        raise ValueError("Invalid number of plies. The book covers 1 to 81 plies.")
+    if engine is None:
+        engine = AlphaBetaEngine(time_limit=None, max_depth=6)
+
+    entries = {}
+    keys = {TicTacToe_Board_2_layers().canonical_key()[0]}
+    for ply in range(plies):
+        if progress is not None:
+            progress(ply, len(keys))
+
+        next_keys = set()
+        for key in keys:
+            board = TicTacToe_Board_2_layers.from_bytes(key)
+            if board.is_game_over():
+                continue
+
+            search_result = engine.search(board)
+            entries[key] = (search_result.best_move, search_result.depth, search_result.score)
+
+            # The successors are only needed for the next ply of the book.
+            if ply + 1 < plies:
+                for move in board.legal_moves():
+                    board.push(move)
+                    next_keys.add(board.canonical_key()[0])
+                    board.pop()
+        keys = next_keys
+
+    with open(path, 'wb') as book_file:
+        book_file.write(MAGIC + bytes([plies]))
+        for key in sorted(entries):
+            book_file.write(key.to_bytes(POSITION_SIZE, 'big') + ENTRY_VALUE_FORMAT.pack(*entries[key]))
+    return len(entries)
+
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped opening book.
+
+    Attributes:
+        path (str): The path of the book file.
+        plies (int): The number of plies covered by the book.
+    """
+
+    def __init__(self, path):
+        """
+        Map an opening book into memory.
+
+        Args:
+            path (str): The path of the book file.
+
+        Raises:
+            ValueError: If the file is not an opening book.
+
+        Usage:
+            opening_book = OpeningBook('opening.tttbook')
+        """
+        self.path = path
+        with open(path, 'rb') as book_file:
+            header = book_file.read(HEADER_SIZE)
+            if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Invalid opening book '{path}'. The file does not start with {MAGIC!r}.")
+            self._mapping = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.plies = header[len(MAGIC)]
+        if (len(self._mapping) - HEADER_SIZE) % ENTRY_SIZE:
+            self._mapping.close()
+            raise ValueError(f"Invalid opening book '{path}'. The file ends within an entry.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the file.
+
+        Usage:
+            opening_book.close()
+        """
+        self._mapping.close()
+
+    def __len__(self):
+        return (len(self._mapping) - HEADER_SIZE) // ENTRY_SIZE
+
+    def _find(self, key_bytes) -> int:
+        """
+        Binary search the entries for an encoded position key.
+
+        Returns:
+            int: The offset of the entry in the file, -1 if the position is not in the book.
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER_SIZE + middle * ENTRY_SIZE
+            entry_key = self._mapping[offset:offset + POSITION_SIZE]
+            if entry_key < key_bytes:
+                low = middle + 1
+            elif entry_key > key_bytes:
+                high = middle
+            else:
+                return offset
+        return -1
+
+    def lookup(self, board) -> tuple:
+        """
+        Look up the position of a board, in any of its symmetric orientations.
+
+        Positions with at least 'plies' moves are rejected without searching the file.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board in the position to look up.
+
+        Returns:
+            tuple: The best move (0-80) for the board, its score for the player to move and the search depth,
+                   None if the position is not in the book.
+
+        Usage:
+            entry = opening_book.lookup(tic_tac_toe_board)
+        """
+        if _number_of_moves(board) >= self.plies:
+            return None
+
+        key, symmetry = board.canonical_key()
+        offset = self._find(key.to_bytes(POSITION_SIZE, 'big'))
+        if offset < 0:
+            return None
+
+        move, depth, score = ENTRY_VALUE_FORMAT.unpack_from(self._mapping, offset + POSITION_SIZE)
+        return SYMMETRY_MOVE_PERMUTATIONS[SYMMETRY_INVERSES[symmetry]][move], score, depth
+
+
+class BookEngine:
+    """
+    Plays the moves of an opening book and falls back to a search outside of it.
+
+    Attributes:
+        opening_book (OpeningBook): The opening book.
+        engine: The engine for positions not in the book, with a method 'search(board)'.
+    """
+
+    def __init__(self, opening_book, engine):
+        """
+        Initialize the engine.
+
+        Args:
+            opening_book (OpeningBook): The opening book.
+            engine: The engine for positions not in the book.
+
+        Usage:
+            engine = BookEngine(OpeningBook('opening.tttbook'), AlphaBetaEngine(time_limit=0.1))
+        """
+        self.opening_book = opening_book
+        self.engine = engine
+
+    def search(self, board) -> SearchResult:
+        """
+        Return the book move of the board, or search the position if it is not in the book.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+
+        Returns:
+            SearchResult: The best move, with the score and depth of the book entry and no nodes for a book move.
+
+        Raises:
+            ValueError: If the game is already over.
+
+        Usage:
+            best_move = engine.search(tic_tac_toe_board).best_move
+        """
+        start_time = time.perf_counter()
+        entry = self.opening_book.lookup(board)
+        if entry is None:
+            return self.engine.search(board)
+
+        move, score, depth = entry
+        return SearchResult(move, score, depth, 0, time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Build an opening book by searching the first plies.")
+    argument_parser.add_argument("path", help="The path of the book file.")
+    argument_parser.add_argument("--plies", type=int, default=4, help="Number of plies covered by the book.")
+    argument_parser.add_argument("--depth", type=int, default=8, help="Search depth per position in plies.")
+    arguments = argument_parser.parse_args()
+
+    start_time = time.perf_counter()
+    number_of_positions = build_book(arguments.path, arguments.plies, AlphaBetaEngine(time_limit=None, max_depth=arguments.depth),
+                                     progress=lambda ply, count: print(f"Ply {ply}: {count} positions"))
+    print(f"{number_of_positions} positions written to '{arguments.path}' in {time.perf_counter() - start_time:.1f} s")
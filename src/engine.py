@@ -0,0 +1,374 @@
+"""
+Alpha-beta search engine for the 2-layered-TicTacToe board.
+
+The engine searches the game tree of a `TicTacToe_Board_2_layers` with negamax and alpha-beta pruning.
+The search deepens iteratively (depth 1, 2, 3, ...) until the time or node budget of the move is used up,
+and the best move of the last completed iteration is played. Moves are ordered by the best move of the
+previous iteration, killer moves and the history heuristic, so that cutoffs happen early.
+
+Search results are kept in a transposition table keyed by the Zobrist hash of the board, so that positions
+reached through different move orders are not searched again. The table is kept between moves.
+
+Positions at the search horizon are scored by a static evaluation from the view of the player to move.
+The default evaluation counts won inner fields and the potential of open lines on the inner and outer fields.
+
+Usage:
+    engine = AlphaBetaEngine(time_limit=0.1)
+    result = engine.search(tic_tac_toe_board)
+    tic_tac_toe_board.push(result.best_move)
+"""
+
+import time
+
+from src.board import FULL_MASK, WIN_LINES, TERNARY_INDEX_TABLE
+from src.transposition import TranspositionTable
+
+# Score of a won game. Wins found closer to the root score higher (WIN_SCORE - ply).
+WIN_SCORE = 1000000
+
+# Scores beyond this bound are wins or losses. A game lasts at most 81 plies.
+WIN_SCORE_BOUND = WIN_SCORE - 81
+
+# Scores of a line that is still open for one player, by number of cells of the player on the line.
+INNER_LINE_WEIGHTS = (0, 1, 4, 0)
+OUTER_LINE_WEIGHTS = (0, 30, 120, 0)
+
+# Score of a won inner field, weighted by the number of outer lines through its position.
+WON_INNER_FIELD_SCORE = 20
+OUTER_POSITION_WEIGHTS = (3, 2, 3, 2, 4, 2, 3, 2, 3)
+
+
+def _build_field_score_table() -> tuple:
+    """
+    Build the table of line potentials of every 3x3 field, indexed like INNER_OUTCOME_TABLE in `src.board`.
+
+    Returns:
+        tuple: 3**9 entries, the potential of the lines of X minus the potential of the lines of O.
+    """
+    score_table = [0] * 3 ** 9
+    for mask_x in range(FULL_MASK + 1):
+        free_cells = FULL_MASK ^ mask_x
+        mask_o = free_cells
+        while True:
+            score = 0
+            for line in WIN_LINES:
+                if not line & mask_o:
+                    score += INNER_LINE_WEIGHTS[(line & mask_x).bit_count()]
+                if not line & mask_x:
+                    score -= INNER_LINE_WEIGHTS[(line & mask_o).bit_count()]
+            score_table[TERNARY_INDEX_TABLE[mask_x] + 2 * TERNARY_INDEX_TABLE[mask_o]] = score
+            if mask_o == 0:
+                break
+            mask_o = (mask_o - 1) & free_cells
+    return tuple(score_table)
+
+
+FIELD_SCORE_TABLE = _build_field_score_table()
+
+
+def evaluate(board) -> int:
+    """
+    Statically evaluate a running game from the view of the active player.
+
+    Args:
+        board (TicTacToe_Board_2_layers): The board to evaluate.
+
+    Returns:
+        int: Positive if the active player stands better, negative otherwise.
+
+    Usage:
+        score = evaluate(tic_tac_toe_board)
+    """
+    cells_x, cells_o, outer_x, outer_o, outer_draw = board.bitboards()
+
+    score = 0
+    decided_outer_mask = outer_x | outer_o | outer_draw
+    for index in range(9):
+        bit = 1 << index
+        if outer_x & bit:
+            score += WON_INNER_FIELD_SCORE * OUTER_POSITION_WEIGHTS[index]
+        elif outer_o & bit:
+            score -= WON_INNER_FIELD_SCORE * OUTER_POSITION_WEIGHTS[index]
+        elif not decided_outer_mask & bit:
+            shift = 9 * index
+            score += FIELD_SCORE_TABLE[TERNARY_INDEX_TABLE[(cells_x >> shift) & FULL_MASK]
+                                       + 2 * TERNARY_INDEX_TABLE[(cells_o >> shift) & FULL_MASK]]
+
+    # Lines of the outer field are blocked by the opponent and by drawn inner fields.
+    for line in WIN_LINES:
+        if not line & (outer_o | outer_draw):
+            score += OUTER_LINE_WEIGHTS[(line & outer_x).bit_count()]
+        if not line & (outer_x | outer_draw):
+            score -= OUTER_LINE_WEIGHTS[(line & outer_o).bit_count()]
+
+    return score if board.active_player == board.PLAYER_X else -score
+
+
+class SearchResult:
+    """
+    Result of a search of the AlphaBetaEngine.
+
+    Attributes:
+        best_move (int): The cell (0-80) of the best move found.
+        score (int): The score of the best move from the view of the player to move.
+        depth (int): The depth of the last completed iteration.
+        nodes (int): The number of nodes visited.
+        elapsed (float): The search time in seconds.
+    """
+
+    def __init__(self, best_move, score, depth, nodes, elapsed):
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nodes_per_second(self) -> float:
+        """
+        The search speed in nodes per second.
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(best_move={self.best_move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, nodes_per_second={self.nodes_per_second:.0f})")
+
+
+class _SearchAborted(Exception):
+    """
+    Raised inside the search when the time or node budget is used up.
+    """
+
+
+class AlphaBetaEngine:
+    """
+    Negamax search with alpha-beta pruning and iterative deepening.
+
+    Attributes:
+        time_limit (float): Time budget per move in seconds, None for no time limit.
+        node_limit (int): Node budget per move, None for no node limit.
+        max_depth (int): Maximum search depth in plies.
+        evaluate (callable): Static evaluation, called with the board and returning a score for the player to move.
+        transposition_table (TranspositionTable): The table of search results, kept between searches.
+    """
+
+    # Number of nodes between two checks of the clock.
+    TIME_CHECK_INTERVAL = 256
+
+    def __init__(self, time_limit=0.1, node_limit=None, max_depth=81, evaluate=evaluate, transposition_table=None):
+        """
+        Initialize the engine.
+
+        Args:
+            time_limit (float): Time budget per move in seconds (default 100 ms), None for no time limit.
+            node_limit (int): Node budget per move, None for no node limit.
+            max_depth (int): Maximum search depth in plies.
+            evaluate (callable): Static evaluation used at the search horizon.
+            transposition_table (TranspositionTable): The table of search results, a new 16 MB table if None.
+
+        Raises:
+            ValueError: If neither a time limit, a node limit nor a finite maximum depth bounds the search.
+
+        Usage:
+            engine = AlphaBetaEngine(time_limit=0.1)
+        """
+        if time_limit is None and node_limit is None and max_depth is None:
+            raise ValueError("The search needs a time limit, a node limit or a maximum depth.")
+
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = 81 if max_depth is None else max_depth
+        self.evaluate = evaluate
+        self.transposition_table = TranspositionTable(size_mb=16) if transposition_table is None else transposition_table
+
+    def search(self, board) -> SearchResult:
+        """
+        Search the best move for the active player of the board.
+
+        The board is used for the search and is in its original state again when the method returns.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+
+        Returns:
+            SearchResult: The best move of the deepest completed iteration and search statistics.
+
+        Raises:
+            ValueError: If the game is already over.
+
+        Usage:
+            best_move = engine.search(tic_tac_toe_board).best_move
+        """
+        moves = board.legal_moves()
+        if not moves:
+            raise ValueError("The game is already over.")
+
+        start_time = time.perf_counter()
+        self._deadline = None if self.time_limit is None else start_time + self.time_limit
+        self._nodes = 0
+        self._killer_moves = [[None, None] for _ in range(82)]
+        self._history = [0] * 81
+
+        # The game cannot last longer than the number of empty cells.
+        cells_x, cells_o = board.bitboards()[:2]
+        max_depth = min(self.max_depth, 81 - (cells_x | cells_o).bit_count())
+
+        best_move, best_score, completed_depth = moves[0], 0, 0
+        try:
+            for depth in range(1, max_depth + 1):
+                self._reached_horizon = False
+                best_score, best_move = self._search_root(board, depth, moves, best_move)
+                completed_depth = depth
+
+                # Stop deepening once the result is forced or the whole game tree has been searched.
+                if abs(best_score) >= WIN_SCORE_BOUND or not self._reached_horizon:
+                    break
+        except _SearchAborted:
+            pass
+
+        return SearchResult(best_move, best_score, completed_depth, self._nodes, time.perf_counter() - start_time)
+
+    def _search_root(self, board, depth, moves, previous_best_move) -> tuple:
+        """
+        Search all moves of the root position to the given depth.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+            depth (int): The search depth in plies.
+            moves (list): The legal moves of the root position.
+            previous_best_move (int): The best move of the previous iteration, searched first.
+
+        Returns:
+            tuple: The best score and the best move.
+        """
+        history = self._history
+        ordered_moves = sorted(moves, key=lambda move: (move != previous_best_move, -history[move]))
+
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_score, best_move = -WIN_SCORE - 1, ordered_moves[0]
+        for move in ordered_moves:
+            board.push(move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                board.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+        return best_score, best_move
+
+    def _negamax(self, board, depth, alpha, beta, ply) -> int:
+        """
+        Search a position with alpha-beta pruning.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board in the position to search.
+            depth (int): The remaining search depth in plies.
+            alpha (int): The lower bound of the search window.
+            beta (int): The upper bound of the search window.
+            ply (int): The distance to the root position.
+
+        Returns:
+            int: The score of the position from the view of the player to move.
+
+        Raises:
+            _SearchAborted: If the time or node budget is used up.
+        """
+        self._nodes += 1
+        if self.node_limit is not None and self._nodes >= self.node_limit:
+            raise _SearchAborted()
+        if self._deadline is not None and self._nodes % self.TIME_CHECK_INTERVAL == 0 and time.perf_counter() >= self._deadline:
+            raise _SearchAborted()
+
+        # The previous move ended the game. A won game is always lost for the player to move.
+        result = board.game_result
+        if result is not None:
+            return 0 if result == board.DRAW_SYMBOL else -(WIN_SCORE - ply)
+
+        if depth == 0:
+            self._reached_horizon = True
+            return self.evaluate(board)
+
+        # Reuse the result of an earlier search of the same position if it was searched deep enough.
+        key = board.zobrist_hash
+        entry = self.transposition_table.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, table_move = entry
+            if entry_depth >= depth:
+                entry_score = self._score_from_table(entry_score, ply)
+                if entry_flag == TranspositionTable.EXACT:
+                    lower_bound = upper_bound = entry_score
+                elif entry_flag == TranspositionTable.LOWER_BOUND:
+                    lower_bound, upper_bound = entry_score, beta
+                else:
+                    lower_bound, upper_bound = alpha, entry_score
+                if lower_bound >= beta or upper_bound <= alpha or lower_bound == upper_bound:
+                    # The stored result may stem from a search that was cut off at its horizon.
+                    self._reached_horizon = True
+                    return entry_score
+
+        # Order the moves by the history heuristic and try the killer moves of this ply and the move
+        # of the transposition table first.
+        moves = board.legal_moves()
+        moves.sort(key=self._history.__getitem__, reverse=True)
+        killer_moves = self._killer_moves[ply]
+        for first_move in (killer_moves[1], killer_moves[0], table_move):
+            if first_move is not None and first_move in moves:
+                moves.remove(first_move)
+                moves.insert(0, first_move)
+
+        original_alpha = alpha
+        best_move = None
+
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            board.push(move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        # Remember the move that caused the cutoff.
+                        if killer_moves[0] != move:
+                            killer_moves[1] = killer_moves[0]
+                            killer_moves[0] = move
+                        self._history[move] += depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.transposition_table.store(key, depth, self._score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    @staticmethod
+    def _score_to_table(score, ply) -> int:
+        """
+        Convert a win or loss score from distance to the root into distance to the stored position.
+        """
+        if score >= WIN_SCORE_BOUND:
+            return score + ply
+        if score <= -WIN_SCORE_BOUND:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _score_from_table(score, ply) -> int:
+        """
+        Convert a stored win or loss score back into distance to the root of the current search.
+        """
+        if score >= WIN_SCORE_BOUND:
+            return score - ply
+        if score <= -WIN_SCORE_BOUND:
+            return score + ply
+        return score
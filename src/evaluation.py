@@ -0,0 +1,341 @@
+"""
+Static evaluation of 2-layered-TicTacToe positions as a weighted sum of features, computed for many positions at once.
+
+Every feature is counted for the player to move minus the opponent (or only for the player to move, for the tempo
+features), so a score is from the view of the player to move, as in `src.engine`:
+
+    inner_threats:     Lines of open inner fields with two own cells and no opponent cell.
+    inner_open_lines:  Lines of open inner fields with one own cell and no opponent cell.
+    outer_threats:     Lines of the outer field with two own won inner fields, not blocked by the opponent or a draw.
+    outer_open_lines:  Lines of the outer field with one own won inner field, not blocked by the opponent or a draw.
+    center_field:      Ownership of the center inner field.
+    corner_fields:     Won corner inner fields.
+    edge_fields:       Won edge inner fields.
+    inner_centers:     Center cells of open inner fields.
+    free_choice:       1 if the player to move may choose any open inner field.
+    mobility:          The number of legal moves of the player to move.
+
+The line features are looked up per 3x3 field in LINE_COUNTS_TABLE, indexed by the base-3 value of the field
+(see INNER_OUTCOME_TABLE in `src.board`). All positions of a batch are handled by the same array operations,
+e.g., to score all children of a node in one call or to compute the features of a large game set for tuning.
+
+With DEFAULT_WEIGHTS, the score equals `src.engine.evaluate`; the last three features are not weighted there.
+Weights are stored as JSON, mapping feature names to weights.
+
+Dependencies:
+    - NumPy (`pip install numpy`)
+
+Usage:
+    evaluator = Evaluator.from_file('weights.json')
+    scores = evaluator.evaluate_batch(boards)
+    moves, scores = evaluator.evaluate_moves(tic_tac_toe_board)
+
+    engine = AlphaBetaEngine(evaluate=evaluator)
+"""
+
+import json
+
+import numpy as np
+
+from src.batch import HAS_LINE_TABLE, POPCOUNT_TABLE
+from src.board import FULL_MASK, TERNARY_INDEX_TABLE, TERNARY_MASKS_TABLE, WIN_LINES
+
+FEATURE_NAMES = ('inner_threats', 'inner_open_lines', 'outer_threats', 'outer_open_lines', 'center_field',
+                 'corner_fields', 'edge_fields', 'inner_centers', 'free_choice', 'mobility')
+
+DEFAULT_WEIGHTS = {
+    'inner_threats': 4,
+    'inner_open_lines': 1,
+    'outer_threats': 120,
+    'outer_open_lines': 30,
+    'center_field': 80,
+    'corner_fields': 60,
+    'edge_fields': 40,
+    'inner_centers': 0,
+    'free_choice': 0,
+    'mobility': 0,
+}
+
+CENTER_MASK = 0b000010000
+CORNER_MASK = 0b101000101
+EDGE_MASK = 0b010101010
+
+TERNARY_INDEX_ARRAY = np.array(TERNARY_INDEX_TABLE, dtype=np.int32)
+
+# Bit weights turning a row of 9 booleans (cells or inner fields) into a 9-bit mask.
+BIT_WEIGHTS = 1 << np.arange(9, dtype=np.int16)
+
+
+def _build_line_counts_table() -> np.ndarray:
+    """
+    Build the table of open lines of every 3x3 field, indexed by its base-3 value.
+
+    Returns:
+        numpy.ndarray: (3**9, 4) counts of the lines open for X with one and two X cells and of the lines open
+                       for O with one and two O cells.
+    """
+    line_counts = np.zeros((3 ** 9, 4), dtype=np.int8)
+    for field_value, (mask_x, mask_o) in enumerate(TERNARY_MASKS_TABLE):
+        for line in WIN_LINES:
+            if not line & mask_o and 1 <= (line & mask_x).bit_count() <= 2:
+                line_counts[field_value, (line & mask_x).bit_count() - 1] += 1
+            if not line & mask_x and 1 <= (line & mask_o).bit_count() <= 2:
+                line_counts[field_value, (line & mask_o).bit_count() + 1] += 1
+    return line_counts
+
+
+LINE_COUNTS_TABLE = _build_line_counts_table()
+
+
+def _field_values(masks_x, masks_o) -> np.ndarray:
+    """
+    Return the base-3 values of 3x3 fields given by the masks of both players.
+    """
+    return TERNARY_INDEX_ARRAY[masks_x] + 2 * TERNARY_INDEX_ARRAY[masks_o]
+
+
+def extract_features_from_masks(cell_masks_x, cell_masks_o, outer_x, outer_o, outer_draw, where_indices, o_to_move) -> np.ndarray:
+    """
+    Compute the features of N positions given as 9-bit masks.
+
+    Args:
+        cell_masks_x (numpy.ndarray): (N, 9) cell masks of X per inner field index.
+        cell_masks_o (numpy.ndarray): (N, 9) cell masks of O per inner field index.
+        outer_x (numpy.ndarray): (N,) masks of the inner fields won by X.
+        outer_o (numpy.ndarray): (N,) masks of the inner fields won by O.
+        outer_draw (numpy.ndarray): (N,) masks of the drawn inner fields.
+        where_indices (numpy.ndarray): (N,) index of the forced inner field, -1 or 9 for a free choice.
+        o_to_move (numpy.ndarray): (N,) True where O is the player to move.
+
+    Returns:
+        numpy.ndarray: (N, len(FEATURE_NAMES)) int32 features from the view of the player to move.
+
+    Usage:
+        features = extract_features_from_masks(*masks)
+    """
+    cell_masks_x, cell_masks_o = np.asarray(cell_masks_x), np.asarray(cell_masks_o)
+    outer_x, outer_o, outer_draw = np.asarray(outer_x), np.asarray(outer_o), np.asarray(outer_draw)
+    where_indices, o_to_move = np.asarray(where_indices), np.asarray(o_to_move, dtype=bool)
+    features = np.zeros((len(outer_x), len(FEATURE_NAMES)), dtype=np.int32)
+
+    # Lines of the inner fields that are still open (decided inner fields do not count).
+    decided = outer_x | outer_o | outer_draw
+    open_fields = (decided[:, None] >> np.arange(9)) & 1 == 0
+    inner_counts = (LINE_COUNTS_TABLE[_field_values(cell_masks_x, cell_masks_o)] * open_fields[:, :, None]).sum(axis=1)
+    features[:, 0] = inner_counts[:, 1] - inner_counts[:, 3]
+    features[:, 1] = inner_counts[:, 0] - inner_counts[:, 2]
+
+    # Lines of the outer field, blocked for each player by the opponent and by drawn inner fields.
+    counts_x = LINE_COUNTS_TABLE[_field_values(outer_x, outer_o | outer_draw)]
+    counts_o = LINE_COUNTS_TABLE[_field_values(outer_x | outer_draw, outer_o)]
+    features[:, 2] = counts_x[:, 1].astype(np.int32) - counts_o[:, 3]
+    features[:, 3] = counts_x[:, 0].astype(np.int32) - counts_o[:, 2]
+
+    # Ownership of the center, corner and edge inner fields and of the center cells of open inner fields.
+    for feature, mask in ((4, CENTER_MASK), (5, CORNER_MASK), (6, EDGE_MASK)):
+        features[:, feature] = POPCOUNT_TABLE[outer_x & mask].astype(np.int32) - POPCOUNT_TABLE[outer_o & mask]
+    centers = ((cell_masks_x >> 4) & 1).astype(np.int32) - ((cell_masks_o >> 4) & 1)
+    features[:, 7] = (centers * open_fields).sum(axis=1)
+
+    # Orient the features to the player to move.
+    features[o_to_move, :8] *= -1
+
+    # Tempo features of the player to move, zero once the game is over.
+    running = ~HAS_LINE_TABLE[outer_x] & ~HAS_LINE_TABLE[outer_o] & (decided != FULL_MASK)
+    free_choice = ((where_indices < 0) | (where_indices > 8)) & running
+    empty_masks = FULL_MASK & ~(cell_masks_x | cell_masks_o)
+    allowed_fields = np.where(free_choice[:, None], open_fields, np.arange(9) == where_indices[:, None]) & running[:, None]
+    features[:, 8] = free_choice
+    features[:, 9] = (POPCOUNT_TABLE[empty_masks] * allowed_fields).sum(axis=1)
+    return features
+
+
+def _board_masks(board) -> tuple:
+    """
+    Return the masks of a board in the form of one row of 'extract_features_from_masks'.
+    """
+    cells_x, cells_o, outer_x, outer_o, outer_draw = board.bitboards()
+    where_to_play_next = board.where_to_play_next
+    return ([(cells_x >> 9 * index) & FULL_MASK for index in range(9)],
+            [(cells_o >> 9 * index) & FULL_MASK for index in range(9)],
+            outer_x, outer_o, outer_draw,
+            -1 if where_to_play_next is None else board.OUTER_FIELD_INDICES[where_to_play_next],
+            board.active_player == board.PLAYER_O)
+
+
+def _features_of_rows(rows) -> np.ndarray:
+    """
+    Compute the features of positions given as rows of '_board_masks'.
+    """
+    if not rows:
+        return np.zeros((0, len(FEATURE_NAMES)), dtype=np.int32)
+    return extract_features_from_masks(*(np.array(column) for column in zip(*rows)))
+
+
+def extract_features(boards) -> np.ndarray:
+    """
+    Compute the features of the positions of several boards.
+
+    Args:
+        boards (list): The boards (TicTacToe_Board_2_layers).
+
+    Returns:
+        numpy.ndarray: (N, len(FEATURE_NAMES)) int32 features from the view of the player to move.
+
+    Usage:
+        features = extract_features([tic_tac_toe_board])
+    """
+    return _features_of_rows([_board_masks(board) for board in boards])
+
+
+def extract_batch_features(batch_board) -> np.ndarray:
+    """
+    Compute the features of the games of a `BatchBoard` (see `src.batch`).
+
+    Args:
+        batch_board (BatchBoard): The games.
+
+    Returns:
+        numpy.ndarray: (N, len(FEATURE_NAMES)) int32 features from the view of the player to move.
+
+    Usage:
+        features = extract_batch_features(batch_board)
+    """
+    cell_masks_x = (batch_board.cells == 1) @ BIT_WEIGHTS
+    cell_masks_o = (batch_board.cells == 2) @ BIT_WEIGHTS
+    outer_x, outer_o, outer_draw = ((batch_board.field_status == status) @ BIT_WEIGHTS for status in (1, 2, 3))
+    return extract_features_from_masks(cell_masks_x, cell_masks_o, outer_x, outer_o, outer_draw,
+                                       batch_board.where_to_play_next, batch_board.active_player == 2)
+
+
+def load_weights(path) -> dict:
+    """
+    Load evaluation weights from a JSON file mapping feature names to weights.
+
+    Features missing in the file get the weight 0.
+
+    Args:
+        path (str): The path of the weights file.
+
+    Returns:
+        dict: The weight of every feature in FEATURE_NAMES.
+
+    Raises:
+        ValueError: If the file names a feature that does not exist.
+
+    Usage:
+        weights = load_weights('weights.json')
+    """
+    with open(path) as weights_file:
+        weights = json.load(weights_file)
+
+    unknown_features = sorted(set(weights) - set(FEATURE_NAMES))
+    if unknown_features:
+        raise ValueError(f"Invalid weights file '{path}'. Unknown features: {', '.join(unknown_features)}.")
+    return {name: weights.get(name, 0) for name in FEATURE_NAMES}
+
+
+def save_weights(path, weights):
+    """
+    Save evaluation weights as JSON, e.g., after tuning them.
+
+    Args:
+        path (str): The path of the weights file.
+        weights (dict): The weight of each feature.
+
+    Usage:
+        save_weights('weights.json', DEFAULT_WEIGHTS)
+    """
+    with open(path, 'w') as weights_file:
+        json.dump({name: weights[name] for name in FEATURE_NAMES if name in weights}, weights_file, indent=4)
+
+
+class Evaluator:
+    """
+    Linear evaluation over FEATURE_NAMES, usable as the 'evaluate' function of `AlphaBetaEngine`.
+
+    Attributes:
+        weights (dict): The weight of every feature.
+    """
+
+    def __init__(self, weights=None):
+        """
+        Initialize the evaluator.
+
+        Args:
+            weights (dict): The weight of each feature (missing features weigh 0), DEFAULT_WEIGHTS if None.
+
+        Raises:
+            ValueError: If a weight is given for a feature that does not exist.
+
+        Usage:
+            evaluator = Evaluator({'outer_threats': 150, 'mobility': 1})
+        """
+        weights = DEFAULT_WEIGHTS if weights is None else weights
+        unknown_features = sorted(set(weights) - set(FEATURE_NAMES))
+        if unknown_features:
+            raise ValueError(f"Unknown features: {', '.join(unknown_features)}.")
+
+        self.weights = {name: weights.get(name, 0) for name in FEATURE_NAMES}
+        self._weight_vector = np.array([self.weights[name] for name in FEATURE_NAMES])
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Create an evaluator with the weights of a JSON file (see 'load_weights').
+
+        Usage:
+            evaluator = Evaluator.from_file('weights.json')
+        """
+        return cls(load_weights(path))
+
+    def score_features(self, features) -> np.ndarray:
+        """
+        Return the scores of positions given by their (N, len(FEATURE_NAMES)) features.
+        """
+        return features @ self._weight_vector
+
+    def evaluate_batch(self, boards) -> np.ndarray:
+        """
+        Evaluate several boards in one call.
+
+        Args:
+            boards (list): The boards (TicTacToe_Board_2_layers).
+
+        Returns:
+            numpy.ndarray: (N,) scores from the view of the player to move of each board.
+
+        Usage:
+            scores = evaluator.evaluate_batch(boards)
+        """
+        return self.score_features(extract_features(boards))
+
+    def evaluate_moves(self, board) -> tuple:
+        """
+        Evaluate the positions after every legal move of a board in one call, e.g., to order moves.
+
+        The board is unchanged afterwards.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board.
+
+        Returns:
+            tuple: The legal moves (list) and the (N,) scores of the positions after them, from the view of the
+                   player making the move.
+
+        Usage:
+            moves, scores = evaluator.evaluate_moves(tic_tac_toe_board)
+        """
+        moves = board.legal_moves()
+        rows = []
+        for move in moves:
+            board.push(move)
+            rows.append(_board_masks(board))
+            board.pop()
+        return moves, -self.score_features(_features_of_rows(rows))
+
+    def __call__(self, board) -> int:
+        """
+        Evaluate a single board from the view of the player to move (the interface of 'evaluate' in `src.engine`).
+        """
+        return int(self.evaluate_batch([board])[0])
@@ -0,0 +1,205 @@
+"""
+Headless game session of 2-layered-TicTacToe.
+
+A `GameSession` owns one game: the board, the moves of the human players, the moves of AI players and the
+bookkeeping a user interface needs (which inner fields are decided, the last AI search). It does not import
+Pygame, so the rules can be used and simulated without a display; `main.py` is only a renderer on top of it.
+
+Usage:
+    game_session = GameSession()
+    game_session.play_coordinates('mid-mid', 1, 1)
+    if game_session.is_game_over():
+        print(game_session.board.game_result)
+
+    results = simulate_random_games(1000, seed=1)  # e.g. {'X': 420, 'O': 390, 'D': 190}
+"""
+
+import random
+
+from src.board import TicTacToe_Board_2_layers
+
+
+class GameSession:
+    """
+    A single game of 2-layered-TicTacToe between humans and/or AI players.
+
+    Attributes:
+        board (TicTacToe_Board_2_layers): The board of the game.
+        ai_engines (dict): Maps each player ('X' or 'O') controlled by an AI to its engine. An engine has a
+                           method 'search(board)' returning a result with the attribute 'best_move'.
+        decided_outer_fields (list): The outer field positions of the decided inner fields, in the order they were decided.
+        last_search_result: The search result of the last AI move, None if no AI has moved yet.
+    """
+
+    def __init__(self, ai_engines=None):
+        """
+        Start a new game.
+
+        Args:
+            ai_engines (dict): Maps each player ('X' or 'O') controlled by an AI to its engine.
+
+        Usage:
+            game_session = GameSession({'O': AlphaBetaEngine(time_limit=0.1)})
+        """
+        self.board = TicTacToe_Board_2_layers()
+        self.ai_engines = dict(ai_engines or {})
+        self.decided_outer_fields = []
+        self.last_search_result = None
+
+    def reset(self):
+        """
+        Start a new game with the same players.
+
+        Usage:
+            game_session.reset()
+        """
+        self.board = TicTacToe_Board_2_layers()
+        self.decided_outer_fields = []
+        self.last_search_result = None
+
+    def is_game_over(self) -> bool:
+        """
+        Check if the game is over.
+
+        Returns:
+            bool: True if the game is won by a player or drawn, False otherwise.
+        """
+        return self.board.is_game_over()
+
+    def is_ai_turn(self) -> bool:
+        """
+        Check if the game is running and the active player is controlled by an AI.
+
+        Returns:
+            bool: True if an AI has to make the next move, False otherwise.
+        """
+        return not self.board.is_game_over() and self.board.active_player in self.ai_engines
+
+    def play_move(self, move) -> bool:
+        """
+        Make a move for the active player if it is legal.
+
+        Args:
+            move (int): The cell (0-80) of the move (see `TicTacToe_Board_2_layers.push`).
+
+        Returns:
+            bool: True if the move was made, False if it is not legal (or the game is over).
+
+        Usage:
+            was_made = game_session.play_move(40)
+        """
+        if not self.board.is_legal_move(move):
+            return False
+
+        self.board.push(move)
+
+        # Keep track of inner fields that were won or drawn by the move.
+        pos_outer_field = self.board.OUTER_FIELD_POSITIONS[move // 9]
+        if self.board.is_cell_of_outer_field_won(pos_outer_field):
+            self.decided_outer_fields.append(pos_outer_field)
+        return True
+
+    def play_coordinates(self, pos_outer_field, row_inner_field, col_inner_field) -> bool:
+        """
+        Make a move, given as board coordinates, for the active player if it is legal.
+
+        Args:
+            pos_outer_field (str): The position in the outer field.
+            row_inner_field (int): The row index of the inner field.
+            col_inner_field (int): The column index of the inner field.
+
+        Returns:
+            bool: True if the move was made, False if it is not legal (or the position does not exist).
+
+        Usage:
+            was_made = game_session.play_coordinates('mid-mid', 1, 1)
+        """
+        if pos_outer_field not in self.board.OUTER_FIELD_INDICES or not (0 <= row_inner_field < 3 and 0 <= col_inner_field < 3):
+            return False
+        return self.play_move(self.board.coordinates_to_move(pos_outer_field, row_inner_field, col_inner_field))
+
+    def play_ai_move(self):
+        """
+        Let the AI of the active player search and make its move.
+
+        Returns:
+            The search result of the engine, also stored in 'last_search_result'.
+
+        Raises:
+            ValueError: If it is not the turn of an AI.
+            ValueError: If the engine returned an illegal move (the move is not made and the result not stored).
+
+        Usage:
+            search_result = game_session.play_ai_move()
+        """
+        if not self.is_ai_turn():
+            raise ValueError("It is not the turn of an AI player.")
+
+        search_result = self.ai_engines[self.board.active_player].search(self.board)
+        if not self.play_move(search_result.best_move):
+            raise ValueError(f"Illegal AI move {search_result.best_move!r} of player {self.board.active_player}.")
+        self.last_search_result = search_result
+        return self.last_search_result
+
+    def play_random_move(self, rng=random) -> int:
+        """
+        Make a uniformly random legal move for the active player.
+
+        Args:
+            rng (random.Random): The random number generator to use.
+
+        Returns:
+            int: The cell (0-80) of the move.
+
+        Raises:
+            ValueError: If the game is already over.
+        """
+        moves = self.board.legal_moves()
+        if not moves:
+            raise ValueError("The game is already over.")
+
+        move = rng.choice(moves)
+        self.play_move(move)
+        return move
+
+
+def play_random_games(number_of_games, seed=None):
+    """
+    Play games with uniformly random moves for both players to the end.
+
+    Args:
+        number_of_games (int): The number of games to play.
+        seed (int): The seed of the random number generator, None for a random seed.
+
+    Yields:
+        TicTacToe_Board_2_layers: The board of each finished game (its move stack is the game, see 'game_record').
+
+    Usage:
+        game_records = [board.game_record() for board in play_random_games(100, seed=1)]
+    """
+    rng = random.Random(seed)
+    for _ in range(number_of_games):
+        board = TicTacToe_Board_2_layers()
+        while board.game_result is None:
+            board.push(rng.choice(board.legal_moves()))
+        yield board
+
+
+def simulate_random_games(number_of_games, seed=None) -> dict:
+    """
+    Play games with uniformly random moves for both players and count the results.
+
+    Args:
+        number_of_games (int): The number of games to play.
+        seed (int): The seed of the random number generator, None for a random seed.
+
+    Returns:
+        dict: The number of games won by 'X', won by 'O' and drawn ('D').
+
+    Usage:
+        results = simulate_random_games(1000, seed=1)
+    """
+    results = {TicTacToe_Board_2_layers.PLAYER_X: 0, TicTacToe_Board_2_layers.PLAYER_O: 0, TicTacToe_Board_2_layers.DRAW_SYMBOL: 0}
+    for board in play_random_games(number_of_games, seed):
+        results[board.game_result] += 1
+    return results
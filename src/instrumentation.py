@@ -0,0 +1,243 @@
+"""
+Opt-in instrumentation of 2-layered-TicTacToe: call counts and timings of hot paths, a JSON dump and cProfile.
+
+Nothing is measured until 'enable' is called, e.g., by `main.py` with the flags --profile / --cprofile or the
+environment variables TTT_PROFILE / TTT_CPROFILE (see 'configure'). Only then are the methods of
+INSTRUMENTED_METHODS replaced by timing wrappers, so a program that does not enable the instrumentation runs the
+original methods without any overhead. 'disable' restores them.
+
+Timings are collected per name as calls, total and maximum time. Besides the wrapped methods, a program can
+record its own sections with 'record' (e.g., `main.py` records the time per frame and for handling events).
+At exit the statistics are written as JSON and the cProfile statistics, if requested, to a '.prof' file
+(readable with `python -m pstats`).
+
+Note that the wrappers add about a microsecond per call, which slows down searches calling 'push' and 'pop'
+millions of times; compare timings only between runs with the instrumentation enabled.
+
+Usage:
+    TTT_PROFILE=profile.json python main.py
+    python main.py --profile profile.json --cprofile profile.prof
+
+    instrumentation.enable('profile.json')
+    ...
+    print(instrumentation.statistics()['TicTacToe_Board_2_layers.make_move'])
+"""
+
+import atexit
+import cProfile
+import functools
+import importlib
+import json
+import os
+import time
+
+ENV_PROFILE = 'TTT_PROFILE'
+ENV_CPROFILE = 'TTT_CPROFILE'
+
+# Path of the JSON dump if TTT_PROFILE is set to '1'.
+DEFAULT_JSON_PATH = 'ttt_profile.json'
+
+# Methods wrapped by 'enable' as (module, class, method). Classes of modules that cannot be imported are skipped.
+INSTRUMENTED_METHODS = (
+    ('src.board', 'TicTacToe_Board_2_layers', 'make_move'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'push'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'pop'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'legal_moves'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'check_for_win_inner_field'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'check_for_win_outer_field'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'check_for_draw_inner_field'),
+    ('src.board', 'TicTacToe_Board_2_layers', 'check_for_draw_outer_field'),
+    ('src.engine', 'AlphaBetaEngine', 'search'),
+    ('src.mcts', 'MCTSEngine', 'search'),
+    ('src.book', 'BookEngine', 'search'),
+    ('src.tablebase', 'TablebaseEngine', 'search'),
+)
+
+enabled = False
+
+# Timings by name: [calls, total seconds, maximum seconds].
+_timings = {}
+
+# Wrapped attributes as (owner, attribute, original) for 'disable'.
+_originals = []
+
+_profiler = None
+_json_path = None
+_cprofile_path = None
+_start_time = None
+
+
+def record(name, seconds):
+    """
+    Add one timed call to the statistics of a name.
+
+    Args:
+        name (str): The name of the section, e.g., 'frame'.
+        seconds (float): The duration of the call.
+
+    Usage:
+        instrumentation.record('events', time.perf_counter() - start_time)
+    """
+    timing = _timings.get(name)
+    if timing is None:
+        timing = _timings[name] = [0, 0.0, 0.0]
+    timing[0] += 1
+    timing[1] += seconds
+    if seconds > timing[2]:
+        timing[2] = seconds
+
+
+def instrument(owner, attribute, name=None):
+    """
+    Replace a function of a class or module by a wrapper recording its calls (see 'record').
+
+    Args:
+        owner: The class or module.
+        attribute (str): The name of the function.
+        name (str): The name of the statistics, '<owner>.<attribute>' if None.
+
+    Usage:
+        instrumentation.instrument(sys.modules[__name__], 'draw_game_board', 'render')
+    """
+    original = getattr(owner, attribute)
+    name = name or f"{owner.__name__.rpartition('.')[2]}.{attribute}"
+    timing = _timings.setdefault(name, [0, 0.0, 0.0])
+
+    @functools.wraps(original)
+    def timed(*args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start_time
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    setattr(owner, attribute, timed)
+    _originals.append((owner, attribute, original))
+
+
+def enable(json_path=None, cprofile_path=None):
+    """
+    Start the instrumentation: wrap INSTRUMENTED_METHODS, start cProfile if requested and dump the results at exit.
+
+    Args:
+        json_path (str): The path of the JSON dump at exit, None for no dump.
+        cprofile_path (str): The path of the cProfile statistics at exit, None to not run cProfile.
+
+    Usage:
+        instrumentation.enable('profile.json')
+    """
+    global enabled, _profiler, _json_path, _cprofile_path, _start_time
+    if enabled:
+        return
+
+    for module_name, class_name, method_name in INSTRUMENTED_METHODS:
+        try:
+            owner = getattr(importlib.import_module(module_name), class_name)
+        except ImportError:
+            continue
+        instrument(owner, method_name, f"{class_name}.{method_name}")
+
+    _json_path, _cprofile_path = json_path, cprofile_path
+    if cprofile_path is not None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    _start_time = time.perf_counter()
+    atexit.register(dump)
+    enabled = True
+
+
+def disable():
+    """
+    Stop the instrumentation: restore the original functions and stop cProfile (without dumping the results).
+
+    Usage:
+        instrumentation.disable()
+    """
+    global enabled, _profiler
+    for owner, attribute, original in reversed(_originals):
+        setattr(owner, attribute, original)
+    _originals.clear()
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler = None
+    atexit.unregister(dump)
+    enabled = False
+
+
+def reset():
+    """
+    Clear the statistics (the wrappers keep recording).
+    """
+    for timing in _timings.values():
+        timing[:] = [0, 0.0, 0.0]
+
+
+def configure(json_path=None, cprofile_path=None) -> bool:
+    """
+    Enable the instrumentation if requested by the arguments (e.g., command line flags) or the environment.
+
+    The arguments take precedence over TTT_PROFILE and TTT_CPROFILE. TTT_PROFILE=1 dumps to DEFAULT_JSON_PATH.
+
+    Args:
+        json_path (str): The path of the JSON dump, None to use TTT_PROFILE.
+        cprofile_path (str): The path of the cProfile statistics, None to use TTT_CPROFILE.
+
+    Returns:
+        bool: True if the instrumentation is enabled.
+
+    Usage:
+        profiling = instrumentation.configure(arguments.profile, arguments.cprofile)
+    """
+    json_path = json_path or os.environ.get(ENV_PROFILE) or None
+    cprofile_path = cprofile_path or os.environ.get(ENV_CPROFILE) or None
+    if json_path == '1':
+        json_path = DEFAULT_JSON_PATH
+    if json_path is not None or cprofile_path is not None:
+        enable(json_path, cprofile_path)
+    return enabled
+
+
+def statistics() -> dict:
+    """
+    Return the statistics of every name with at least one call.
+
+    Returns:
+        dict: Maps each name to its 'calls', 'total_ms', 'mean_ms' and 'max_ms'.
+
+    Usage:
+        make_move_calls = instrumentation.statistics()['TicTacToe_Board_2_layers.make_move']['calls']
+    """
+    return {name: {'calls': calls, 'total_ms': 1000 * total, 'mean_ms': 1000 * total / calls, 'max_ms': 1000 * maximum}
+            for name, (calls, total, maximum) in _timings.items() if calls}
+
+
+def summary_lines(names=None) -> list:
+    """
+    Format the statistics as short text lines, e.g., for an on-screen overlay.
+
+    Args:
+        names (list): The names to include in this order, all names with calls if None.
+
+    Returns:
+        list: One line per name: '<name>: <calls> calls, <mean> ms mean, <max> ms max'.
+    """
+    current_statistics = statistics()
+    names = current_statistics if names is None else [name for name in names if name in current_statistics]
+    return [f"{name}: {current_statistics[name]['calls']} calls, {current_statistics[name]['mean_ms']:.3f} ms mean, "
+            f"{current_statistics[name]['max_ms']:.2f} ms max" for name in names]
+
+
+def dump():
+    """
+    Write the statistics as JSON and the cProfile statistics to the paths given to 'enable' (called at exit).
+    """
+    if _json_path is not None:
+        with open(_json_path, 'w') as json_file:
+            json.dump({'elapsed_s': time.perf_counter() - _start_time, 'statistics': statistics()}, json_file, indent=4)
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_cprofile_path)
@@ -0,0 +1,332 @@
+"""
+Monte Carlo Tree Search engine for the 2-layered-TicTacToe board.
+
+The engine builds a search tree with UCT (Upper Confidence bounds applied to Trees): Every playout selects a
+path through the tree by the UCT formula, expands one new node, finishes the game with random moves and
+propagates the result back to the root. The move played most often from the root is the best move.
+
+The budget of a search is a number of playouts, a wall-clock time or both. The tree is kept between
+consecutive searches: If the new position is the root position or follows from it within two moves
+(own move and reply), the matching subtree becomes the new root and its statistics are reused.
+
+With 'workers' > 1 the search runs root-parallel: Worker processes of a `ProcessPoolExecutor` build
+independent trees for the same position while the main process grows its own tree, and the visit counts of
+the root moves are summed up before the best move is chosen.
+
+Usage:
+    with MCTSEngine(time_limit=1.0, workers=8) as engine:
+        result = engine.search(tic_tac_toe_board)
+        tic_tac_toe_board.push(result.best_move)
+"""
+
+import copy
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class MCTSNode:
+    """
+    Node of the search tree, i.e., a position reached by a move.
+
+    Attributes:
+        move (int): The move (0-80) leading to the node, None for the root.
+        parent (MCTSNode): The parent node, None for the root.
+        player_just_moved (str): The player who made the move leading to the node.
+        position_hash (int): The Zobrist hash of the position of the node.
+        children (list): The expanded child nodes.
+        untried_moves (list): The legal moves without a child node yet.
+        visits (int): The number of playouts through the node.
+        wins (float): The playout results from the view of 'player_just_moved' (win 1, draw 0.5).
+    """
+
+    __slots__ = ('move', 'parent', 'player_just_moved', 'position_hash', 'children', 'untried_moves', 'visits', 'wins')
+
+    def __init__(self, board, move=None, parent=None):
+        """
+        Create the node for the current position of the board.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board in the position of the node.
+            move (int): The move leading to the node.
+            parent (MCTSNode): The parent node.
+        """
+        self.move = move
+        self.parent = parent
+        self.player_just_moved = board.PLAYER_O if board.active_player == board.PLAYER_X else board.PLAYER_X
+        self.position_hash = board.zobrist_hash
+        self.children = []
+        self.untried_moves = board.legal_moves()
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration):
+        """
+        Select the child with the highest UCT value.
+
+        Args:
+            exploration (float): The exploration constant of the UCT formula.
+
+        Returns:
+            MCTSNode: The selected child.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MCTSResult:
+    """
+    Result of a search of the MCTSEngine.
+
+    Attributes:
+        best_move (int): The cell (0-80) of the most visited root move.
+        win_rate (float): The average playout result of the best move from the view of the player to move.
+        playouts (int): The number of playouts of this search, summed over all processes.
+        reused_playouts (int): The number of playouts in the reused subtree at the start of the search.
+        elapsed (float): The search time in seconds.
+    """
+
+    def __init__(self, best_move, win_rate, playouts, reused_playouts, elapsed):
+        self.best_move = best_move
+        self.win_rate = win_rate
+        self.playouts = playouts
+        self.reused_playouts = reused_playouts
+        self.elapsed = elapsed
+
+    @property
+    def playouts_per_second(self) -> float:
+        """
+        The search speed in playouts per second.
+        """
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"MCTSResult(best_move={self.best_move}, win_rate={self.win_rate:.3f}, playouts={self.playouts}, "
+                f"playouts_per_second={self.playouts_per_second:.0f})")
+
+
+def _run_playouts(root, board, rng, exploration, playout_limit, deadline) -> int:
+    """
+    Grow a search tree by playouts until the playout limit or the deadline is reached.
+
+    Args:
+        root (MCTSNode): The root node, matching the position of the board.
+        board (TicTacToe_Board_2_layers): The board, in its original position again when the function returns.
+        rng (random.Random): The random number generator for expansions and random playouts.
+        exploration (float): The exploration constant of the UCT formula.
+        playout_limit (int): The maximum number of playouts, None for no limit.
+        deadline (float): The `time.perf_counter` value to stop at, None for no deadline.
+
+    Returns:
+        int: The number of playouts.
+    """
+    playouts = 0
+    draw_symbol = board.DRAW_SYMBOL
+    while (playout_limit is None or playouts < playout_limit) and (deadline is None or time.perf_counter() < deadline):
+        node = root
+        number_of_moves = 0
+
+        # Selection: Follow the UCT values through fully expanded nodes.
+        while not node.untried_moves and node.children:
+            node = node.select_child(exploration)
+            board.push(node.move)
+            number_of_moves += 1
+
+        # Expansion: Add one child for an untried move.
+        if node.untried_moves:
+            untried_moves = node.untried_moves
+            move = untried_moves.pop(rng.randrange(len(untried_moves)))
+            board.push(move)
+            number_of_moves += 1
+            child = MCTSNode(board, move, node)
+            node.children.append(child)
+            node = child
+
+        # Simulation: Finish the game with random moves.
+        while board.game_result is None:
+            board.push(rng.choice(board.legal_moves()))
+            number_of_moves += 1
+        result = board.game_result
+        for _ in range(number_of_moves):
+            board.pop()
+
+        # Backpropagation: Count the result for every node on the path.
+        while node is not None:
+            node.visits += 1
+            if result == draw_symbol:
+                node.wins += 0.5
+            elif result == node.player_just_moved:
+                node.wins += 1.0
+            node = node.parent
+        playouts += 1
+
+    return playouts
+
+
+def _search_in_worker(board, exploration, playout_limit, wall_clock_deadline, seed) -> tuple:
+    """
+    Build an independent search tree in a worker process (root parallelization).
+
+    Args:
+        board (TicTacToe_Board_2_layers): The board to search, a copy sent to the worker.
+        exploration (float): The exploration constant of the UCT formula.
+        playout_limit (int): The maximum number of playouts of the worker, None for no limit.
+        wall_clock_deadline (float): The `time.time` value to stop at, shared with the main process, None for no limit.
+        seed (int): The seed of the random number generator of the worker.
+
+    Returns:
+        tuple: The number of playouts and a dict mapping each root move to its (visits, wins).
+    """
+    # The deadline of the search is set before the worker started and the board was sent, so the time left is
+    # shorter than the time limit. It is converted to the clock of the playouts of this process.
+    deadline = None if wall_clock_deadline is None else time.perf_counter() + (wall_clock_deadline - time.time())
+    root = MCTSNode(board)
+    playouts = _run_playouts(root, board, random.Random(seed), exploration, playout_limit, deadline)
+    return playouts, {child.move: (child.visits, child.wins) for child in root.children}
+
+
+class MCTSEngine:
+    """
+    UCT search with random playouts, tree reuse and optional root parallelization across processes.
+
+    Attributes:
+        playout_limit (int): Playout budget per move (per process), None for no playout limit.
+        time_limit (float): Time budget per move in seconds, None for no time limit.
+        exploration (float): The exploration constant of the UCT formula.
+        workers (int): The number of processes searching in parallel, including the main process.
+    """
+
+    def __init__(self, playout_limit=None, time_limit=1.0, exploration=math.sqrt(2), workers=1, seed=None):
+        """
+        Initialize the engine.
+
+        Args:
+            playout_limit (int): Playout budget per move (per process), None for no playout limit.
+            time_limit (float): Time budget per move in seconds, None for no time limit. At least one playout is played.
+            exploration (float): The exploration constant of the UCT formula.
+            workers (int): The number of processes searching in parallel, e.g., `os.cpu_count()`.
+            seed (int): The seed of the random number generators, None for a random seed.
+
+        Raises:
+            ValueError: If neither a playout limit nor a time limit is given.
+            ValueError: If the number of workers is smaller than 1.
+
+        Usage:
+            engine = MCTSEngine(playout_limit=10000)
+        """
+        if playout_limit is None and time_limit is None:
+            raise ValueError("The search needs a playout limit or a time limit.")
+        if workers < 1:
+            raise ValueError("Invalid number of workers. At least one process is needed.")
+
+        self.playout_limit = playout_limit
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.workers = workers
+        self._rng = random.Random(seed)
+        self._root = None
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shut down the worker processes, if any were started.
+
+        Usage:
+            engine.close()
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _find_reusable_root(self, board) -> MCTSNode:
+        """
+        Find the node of the kept tree matching the board, searching the root, its children and grandchildren.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+
+        Returns:
+            MCTSNode: The matching node, detached from its parent, or None.
+        """
+        if self._root is None:
+            return None
+
+        position_hash = board.zobrist_hash
+        candidates = [self._root]
+        for child in self._root.children:
+            candidates.append(child)
+            candidates.extend(child.children)
+
+        for node in candidates:
+            if node.position_hash == position_hash:
+                node.parent = None
+                return node
+        return None
+
+    def search(self, board) -> MCTSResult:
+        """
+        Search the best move for the active player of the board.
+
+        The board is used for the search and is in its original state again when the method returns.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+
+        Returns:
+            MCTSResult: The most visited move and search statistics.
+
+        Raises:
+            ValueError: If the game is already over.
+
+        Usage:
+            best_move = engine.search(tic_tac_toe_board).best_move
+        """
+        if board.game_result is not None:
+            raise ValueError("The game is already over.")
+
+        start_time = time.perf_counter()
+        wall_clock_deadline = None if self.time_limit is None else time.time() + self.time_limit
+
+        root = self._find_reusable_root(board)
+        if root is None:
+            root = MCTSNode(board)
+        self._root = root
+        reused_playouts = root.visits
+
+        # Start the worker processes before searching in the main process, so that all search at the same time.
+        # The workers get a copy of the board, since the arguments are pickled while the main process searches.
+        # All processes stop at the same deadline, whenever a worker starts.
+        futures = []
+        if self.workers > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+            board_copy = copy.deepcopy(board)
+            futures = [self._executor.submit(_search_in_worker, board_copy, self.exploration, self.playout_limit,
+                                             wall_clock_deadline, self._rng.getrandbits(32))
+                       for _ in range(self.workers - 1)]
+
+        deadline = None if self.time_limit is None else start_time + self.time_limit
+        playouts = _run_playouts(root, board, self._rng, self.exploration, self.playout_limit, deadline)
+        if not root.children:
+            # The deadline passed before the first playout, e.g., with a time limit of 0: Play one to find a move.
+            playouts += _run_playouts(root, board, self._rng, self.exploration, 1, None)
+
+        # Sum up the statistics of the root moves over all trees.
+        move_statistics = {child.move: [child.visits, child.wins] for child in root.children}
+        for future in futures:
+            worker_playouts, worker_statistics = future.result()
+            playouts += worker_playouts
+            for move, (visits, wins) in worker_statistics.items():
+                statistics = move_statistics.setdefault(move, [0, 0.0])
+                statistics[0] += visits
+                statistics[1] += wins
+
+        best_move, (visits, wins) = max(move_statistics.items(), key=lambda item: item[1][0])
+        return MCTSResult(best_move, wins / visits, playouts, reused_playouts, time.perf_counter() - start_time)
@@ -0,0 +1,360 @@
+"""
+Generalized nested TicTacToe board of any depth D and grid size K (KxK fields).
+
+Depth 1 is plain TicTacToe, depth 2 the game of `TicTacToe_Board_2_layers` and depth 3 "ultimate-ultimate"
+TicTacToe with 729 cells. A field is won by the player who wins K of its children in a row, column or diagonal,
+and it is drawn once all of its children are decided without a winner. The whole board is won with its top field.
+
+The fields form a tree that is stored level by level in flat arrays (node 0 is the top field, the cells are the
+K**(2*D) nodes of the last level). The tables of a `NestedGeometry` hold for every node its parent, its slot in the
+parent (row * K + col) and its first child, and for every slot the lines through it. Each field keeps K*K-bit masks
+of the children won by X, won by O and drawn, so making a move only checks the lines through the changed slot
+and walks up the parents while fields get decided. Memory is linear in the number of cells.
+
+Cells are numbered like the moves of `TicTacToe_Board_2_layers.push`: the slots of the path from the top field
+down to the cell are the digits of the cell number in base K*K, the slot in the top field first. For depth 2
+and K = 3 the cell (row, col) of the inner field at index i is '9 * i + row * 3 + col'.
+
+The move rule generalizes the one of the 2-layered game: A move at the path (s1, s2, ..., sD) sends the
+opponent to the field at the path (s2, ..., sD), the smallest field at slot s2 of the top field and so on.
+If that field is decided, the opponent may play anywhere in the nearest undecided field above it (up to a
+free choice in the top field).
+
+Usage:
+    board = NestedBoard(depth=3)
+    board.push(board.legal_moves()[0])
+    board.pop()
+"""
+
+from array import array
+from functools import lru_cache
+
+PLAYER_X = 'X'
+PLAYER_O = 'O'
+DRAW_SYMBOL = 'D'
+
+# Node states, the index into STATE_SYMBOLS.
+OPEN = 0
+WON_BY_X = 1
+WON_BY_O = 2
+DRAWN = 3
+STATE_SYMBOLS = (None, PLAYER_X, PLAYER_O, DRAW_SYMBOL)
+
+
+class NestedGeometry:
+    """
+    Precomputed index tables of the field tree of a depth and grid size.
+
+    Attributes:
+        depth (int): The number of levels of fields D.
+        size (int): The grid size K of every field.
+        slots (int): The number of children of a field, K * K.
+        number_of_cells (int): The number of cells, slots ** depth.
+        number_of_nodes (int): The number of fields and cells.
+        level_offsets (tuple): The index of the first node of each level 0 to D.
+        parents (array): The parent of every node (0 for the top field itself).
+        child_slots (array): The slot of every node in its parent.
+        first_children (array): The first child of every field (the children are consecutive).
+        slot_lines (tuple): For every slot the K*K-bit masks of the lines through it.
+        full_mask (int): The mask with every slot set.
+    """
+
+    def __init__(self, depth, size):
+        """
+        Build the tables.
+
+        Args:
+            depth (int): The number of levels of fields (at least 1).
+            size (int): The grid size K (at least 2, at most 8).
+
+        Raises:
+            ValueError: If the depth or size is out of range.
+        """
+        if depth < 1:
+            raise ValueError("Invalid depth. A board has at least one level.")
+        if not 2 <= size <= 8:
+            raise ValueError("Invalid size. The fields have 2x2 to 8x8 cells.")
+
+        self.depth = depth
+        self.size = size
+        self.slots = size * size
+        self.number_of_cells = self.slots ** depth
+        self.level_offsets = tuple(sum(self.slots ** level for level in range(levels)) for levels in range(depth + 1))
+        self.number_of_nodes = self.level_offsets[depth] + self.number_of_cells
+        self.full_mask = (1 << self.slots) - 1
+
+        # The children of the node with the local index p on level l are the nodes p * slots + c on level l + 1.
+        self.parents = array('I', [0]) * self.number_of_nodes
+        self.child_slots = array('B', [0]) * self.number_of_nodes
+        self.first_children = array('I', [0]) * self.level_offsets[depth]
+        for level in range(depth):
+            for local_index in range(self.slots ** level):
+                node = self.level_offsets[level] + local_index
+                first_child = self.level_offsets[level + 1] + local_index * self.slots
+                self.first_children[node] = first_child
+                for slot in range(self.slots):
+                    self.parents[first_child + slot] = node
+                    self.child_slots[first_child + slot] = slot
+
+        lines = ([sum(1 << (row * size + col) for col in range(size)) for row in range(size)]
+                 + [sum(1 << (row * size + col) for row in range(size)) for col in range(size)]
+                 + [sum(1 << (index * size + index) for index in range(size)),
+                    sum(1 << (index * size + size - 1 - index) for index in range(size))])
+        self.slot_lines = tuple(tuple(line for line in lines if line >> slot & 1) for slot in range(self.slots))
+
+    def cell_node(self, cell) -> int:
+        """
+        Return the node of a cell (0 to number_of_cells - 1).
+        """
+        return self.level_offsets[self.depth] + cell
+
+    def next_field(self, cell) -> int:
+        """
+        Return the field a move at the cell sends the opponent to, before skipping decided fields.
+
+        The path of the field is the path of the cell without its first slot, i.e., the cell number modulo
+        slots ** (depth - 1), on the level above the cells.
+        """
+        return self.level_offsets[self.depth - 1] + cell % self.slots ** (self.depth - 1)
+
+
+@lru_cache(maxsize=None)
+def nested_geometry(depth, size) -> NestedGeometry:
+    """
+    Return the (shared) geometry of a depth and grid size.
+    """
+    return NestedGeometry(depth, size)
+
+
+class NestedBoard:
+    """
+    Nested TicTacToe board of depth D with KxK fields, stored in flat arrays.
+
+    Attributes:
+        geometry (NestedGeometry): The index tables of the board.
+        active_player (str): The player to move ('X' or 'O').
+        game_result (str): 'X' or 'O' for a winner, 'D' for a draw and None while the game is running.
+    """
+
+    PLAYER_X = PLAYER_X
+    PLAYER_O = PLAYER_O
+    DRAW_SYMBOL = DRAW_SYMBOL
+
+    def __init__(self, depth=2, size=3):
+        """
+        Create an empty board.
+
+        Args:
+            depth (int): The number of levels of fields, 2 for the game of `TicTacToe_Board_2_layers`.
+            size (int): The grid size K of every field.
+
+        Raises:
+            ValueError: If the depth or size is out of range.
+
+        Usage:
+            board = NestedBoard(depth=3, size=3)
+        """
+        self.geometry = nested_geometry(depth, size)
+        number_of_fields = self.geometry.level_offsets[depth]
+
+        # State of every node (OPEN, WON_BY_X, WON_BY_O, DRAWN; cells are OPEN while empty) and the masks of
+        # the decided children of every field.
+        self._states = bytearray(self.geometry.number_of_nodes)
+        self._masks_x = array('Q', [0]) * number_of_fields
+        self._masks_o = array('Q', [0]) * number_of_fields
+        self._masks_draw = array('Q', [0]) * number_of_fields
+
+        self._forced_field = 0
+        self._move_stack = []
+        self.active_player = PLAYER_X
+        self.game_result = None
+
+    @property
+    def number_of_cells(self) -> int:
+        """
+        The number of cells of the board.
+        """
+        return self.geometry.number_of_cells
+
+    def is_game_over(self) -> bool:
+        """
+        Check if the game is won by a player or drawn.
+        """
+        return self.game_result is not None
+
+    @property
+    def where_to_play_next(self) -> tuple:
+        """
+        The field the next move has to be made in, as level (0 for the top field) and index within the level.
+
+        Returns:
+            tuple: (level, index), None for a free choice (the top field).
+        """
+        if self._forced_field == 0:
+            return None
+        level = max(level for level, offset in enumerate(self.geometry.level_offsets) if offset <= self._forced_field)
+        return level, self._forced_field - self.geometry.level_offsets[level]
+
+    def field_result(self, level, index) -> str:
+        """
+        Return the result of a field or the symbol in a cell (level D).
+
+        Args:
+            level (int): The level (0 for the top field, D for the cells).
+            index (int): The index of the field within its level.
+
+        Returns:
+            str: 'X' or 'O' for a won field or occupied cell, 'D' for a drawn field and None otherwise.
+        """
+        return STATE_SYMBOLS[self._states[self.geometry.level_offsets[level] + index]]
+
+    def _decided_mask(self, field) -> int:
+        """
+        Return the mask of the decided children (or occupied cells) of a field.
+        """
+        return self._masks_x[field] | self._masks_o[field] | self._masks_draw[field]
+
+    def is_legal_move(self, move) -> bool:
+        """
+        Check if a cell is a legal move for the active player.
+
+        The cell has to be empty, all fields containing it have to be undecided and it has to lie within the
+        field 'where_to_play_next'.
+        """
+        geometry = self.geometry
+        if self.game_result is not None or not 0 <= move < geometry.number_of_cells:
+            return False
+
+        node = geometry.cell_node(move)
+        if self._states[node] != OPEN:
+            return False
+        while node != 0:
+            node = geometry.parents[node]
+            if self._states[node] != OPEN:
+                return False
+            if node == self._forced_field:
+                return True
+        return self._forced_field == 0
+
+    def legal_moves(self) -> list:
+        """
+        Return the legal moves of the active player as cells in ascending order.
+        """
+        if self.game_result is not None:
+            return []
+        moves = []
+        self._collect_moves(self._forced_field, moves)
+        return moves
+
+    def _collect_moves(self, field, moves):
+        """
+        Append the empty cells of the undecided fields below a field to the list of moves.
+        """
+        geometry = self.geometry
+        first_child = geometry.first_children[field]
+        open_slots = geometry.full_mask ^ self._decided_mask(field)
+        if first_child >= geometry.level_offsets[geometry.depth]:
+            first_cell = first_child - geometry.level_offsets[geometry.depth]
+            moves.extend(first_cell + slot for slot in range(geometry.slots) if open_slots >> slot & 1)
+            return
+        for slot in range(geometry.slots):
+            if open_slots >> slot & 1:
+                self._collect_moves(first_child + slot, moves)
+
+    def count_legal_moves(self) -> int:
+        """
+        Count the legal moves of the active player.
+        """
+        return len(self.legal_moves())
+
+    def push(self, move):
+        """
+        Make a move for the active player and put it on the move stack.
+
+        The fields decided by the move are resolved from the cell upwards: a field is won if the player completes
+        a line of won children through the changed slot, and drawn if all of its children are decided.
+
+        Args:
+            move (int): The cell of the move.
+
+        Raises:
+            ValueError: If the game is already over.
+            ValueError: If the move is not legal.
+
+        Usage:
+            board.push(40)
+        """
+        if self.game_result is not None:
+            raise ValueError("The game is already over.")
+        if not self.is_legal_move(move):
+            raise ValueError("Illegal move. Choose an empty cell in an allowed field.")
+
+        geometry = self.geometry
+        player_state = WON_BY_X if self.active_player == PLAYER_X else WON_BY_O
+        player_masks = self._masks_x if player_state == WON_BY_X else self._masks_o
+        node = geometry.cell_node(move)
+        state = self._states[node] = player_state
+
+        # Walk up while the field of the node gets decided. 'decided_fields' counts the fields decided by the move.
+        decided_fields = 0
+        while True:
+            field, slot = geometry.parents[node], geometry.child_slots[node]
+            if state == DRAWN:
+                self._masks_draw[field] |= 1 << slot
+            else:
+                player_masks[field] |= 1 << slot
+
+            # Only the player who just moved can have completed a line.
+            if state != DRAWN and any(player_masks[field] & line == line for line in geometry.slot_lines[slot]):
+                state = player_state
+            elif self._decided_mask(field) == geometry.full_mask:
+                state = DRAWN
+            else:
+                break
+
+            self._states[field] = state
+            decided_fields += 1
+            if field == 0:
+                self.game_result = STATE_SYMBOLS[state]
+                break
+            node = field
+
+        self._move_stack.append((move, self._forced_field, decided_fields))
+
+        # Send the opponent to the next field, or to the nearest undecided field above it.
+        field = geometry.next_field(move)
+        while self._states[field] != OPEN and field != 0:
+            field = geometry.parents[field]
+        self._forced_field = field
+        self.active_player = PLAYER_O if self.active_player == PLAYER_X else PLAYER_X
+
+    def pop(self) -> int:
+        """
+        Take back the last move, reopening the fields it decided.
+
+        Returns:
+            int: The cell of the move.
+
+        Raises:
+            ValueError: If there is no move to take back.
+        """
+        if not self._move_stack:
+            raise ValueError("No move to undo.")
+
+        move, self._forced_field, decided_fields = self._move_stack.pop()
+        self.active_player = PLAYER_O if self.active_player == PLAYER_X else PLAYER_X
+        self.game_result = None
+
+        # The cell and the decided fields above it are consecutive ancestors. Clear them in the masks of their parents.
+        geometry = self.geometry
+        node = geometry.cell_node(move)
+        for _ in range(decided_fields + 1):
+            self._states[node] = OPEN
+            if node == 0:
+                break
+            field, bit = geometry.parents[node], ~(1 << geometry.child_slots[node]) & geometry.full_mask
+            self._masks_x[field] &= bit
+            self._masks_o[field] &= bit
+            self._masks_draw[field] &= bit
+            node = field
+        return move
@@ -0,0 +1,102 @@
+"""
+Perft (performance test) of the move generation of the 2-layered-TicTacToe board.
+
+Perft counts the leaf nodes of the game tree to a fixed depth, i.e., the number of distinct move sequences
+of that length (games that end earlier are leaves of their own length). The counts of the start position and
+of the positions in PERFT_POSITIONS are checked into the test suite, so any change of `src/board.py` has to
+reproduce them exactly.
+
+Usage:
+    number_of_leaves = perft(TicTacToe_Board_2_layers(), 4)
+
+    python -m src.perft 5
+    python -m src.perft 4 --moves "e5 e4 e2" --divide
+"""
+
+import argparse
+import time
+
+from src.board import TicTacToe_Board_2_layers
+
+# Test positions in move notation (see `TicTacToe_Board_2_layers.to_notation`), covering forced inner fields,
+# the free choice after a move into a decided inner field and a position shortly before the end of a game.
+PERFT_POSITIONS = {
+    'start': '',
+    'forced-center': 'e5 e4 e2',
+    'free-choice': 'f5 i4 g3 a7 b1 f3 h7 f2 g4 b2 d4 a1 a3 b9 e7 e1 d1 c3 h9 d7',
+    'endgame': ('h5 d6 a7 b2 f6 g9 c8 i6 i8 i5 h4 f3 h7 e2 e4 e3 e7 f2 g5 c6 i9 h9 d8 b5 d4 b1 f1 h3 d9 b7 '
+                'd2 a5 c4 g2 b6 f8 h6 f9 g8 a4 c3 h8 f4 g1 b3 e9 e8 f7 i3 g7 a3 a9 b8 h1 d3 b9 e1 d1 g3'),
+}
+
+
+def perft(board, depth) -> int:
+    """
+    Count the leaf nodes of the game tree below the position of the board to the given depth.
+
+    The moves are made with 'push' and taken back with 'pop', so the board is unchanged afterwards. At the
+    last ply the legal moves are only counted, not made (bulk counting).
+
+    Args:
+        board (TicTacToe_Board_2_layers): The board in the position to count from.
+        depth (int): The number of plies.
+
+    Returns:
+        int: The number of leaf nodes, 1 for depth 0 or a finished game.
+
+    Usage:
+        number_of_leaves = perft(tic_tac_toe_board, 3)
+    """
+    if depth == 0 or board.game_result is not None:
+        return 1
+    if depth == 1:
+        return board.count_legal_moves()
+
+    number_of_leaves = 0
+    for move in board.legal_moves():
+        board.push(move)
+        number_of_leaves += perft(board, depth - 1)
+        board.pop()
+    return number_of_leaves
+
+
+def divide(board, depth) -> dict:
+    """
+    Count the leaf nodes below each legal move, e.g., to find the move where two implementations differ.
+
+    Args:
+        board (TicTacToe_Board_2_layers): The board in the position to count from.
+        depth (int): The number of plies, including the first move (at least 1).
+
+    Returns:
+        dict: The number of leaf nodes below each move (0-80).
+
+    Usage:
+        leaves_per_move = divide(tic_tac_toe_board, 3)
+    """
+    leaves_per_move = {}
+    for move in board.legal_moves():
+        board.push(move)
+        leaves_per_move[move] = perft(board, depth - 1)
+        board.pop()
+    return leaves_per_move
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Count the leaf nodes of the game tree to a fixed depth.")
+    argument_parser.add_argument("depth", type=int, help="The number of plies.")
+    argument_parser.add_argument("--moves", default="", help="Moves in notation leading to the position, e.g. \"e5 e4\".")
+    argument_parser.add_argument("--divide", action="store_true", help="Print the count below each move.")
+    arguments = argument_parser.parse_args()
+
+    game_board = TicTacToe_Board_2_layers.from_notation(arguments.moves)
+    start_time = time.perf_counter()
+    if arguments.divide:
+        leaves_per_move = divide(game_board, arguments.depth)
+        for move, number_of_leaves in leaves_per_move.items():
+            print(f"{game_board.move_to_notation(move)}: {number_of_leaves}")
+        number_of_leaves = sum(leaves_per_move.values())
+    else:
+        number_of_leaves = perft(game_board, arguments.depth)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"perft({arguments.depth}) = {number_of_leaves} in {elapsed:.2f} s ({number_of_leaves / max(elapsed, 1e-9):,.0f} leaves/s)")
@@ -0,0 +1,171 @@
+"""
+Compact, immutable positions of 2-layered-TicTacToe for large in-memory game trees and caches.
+
+A `TicTacToe_Board_2_layers` is built for making and taking back moves; with its move stack and attributes it
+takes several hundred bytes. A `Position` stores only the position, packed into a single integer of 194 bits,
+in an object with one slot, about 100 bytes in total:
+
+    bits 0-80:     Cells of X (the 81-bit mask of 'bitboards').
+    bits 81-161:   Cells of O.
+    bits 162-188:  Inner fields won by X, won by O and drawn (9 bits each).
+    bits 189-192:  Index of the forced inner field, 9 for a free choice.
+    bit 193:       1 if O is to move.
+
+Positions are hashable and ordered, so they can be used as dict keys and set members and be sorted. Equal
+positions are equal whatever the moves leading to them. Converting to a board and back only shifts masks.
+
+Usage:
+    position = Position.from_board(tic_tac_toe_board)
+    child_positions = [position.play(move) for move in position.legal_moves()]
+    tic_tac_toe_board = position.to_board()
+"""
+
+from src.board import FULL_MASK, WINNING_LINES_TABLE, TicTacToe_Board_2_layers
+
+CELLS_MASK = (1 << 81) - 1
+
+# Packed start position: empty board, free choice, X to move.
+START_PACKED = 9 << 189
+
+
+class Position:
+    """
+    Immutable position of 2-layered-TicTacToe packed into one integer.
+
+    Attributes:
+        packed (int): The packed position (see the module documentation).
+    """
+
+    __slots__ = ('packed',)
+
+    def __init__(self, packed=START_PACKED):
+        """
+        Create a position from its packed integer, by default the start position.
+
+        Args:
+            packed (int): The packed position.
+
+        Usage:
+            position = Position()
+        """
+        object.__setattr__(self, 'packed', packed)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable.")
+
+    def __reduce__(self):
+        return (Position, (self.packed,))
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.packed == other.packed
+
+    def __lt__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.packed < other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __repr__(self):
+        return f"Position({self.packed:#x})"
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Pack the position of a board (not its move stack).
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board.
+
+        Returns:
+            Position: The position of the board.
+
+        Usage:
+            position = Position.from_board(tic_tac_toe_board)
+        """
+        cells_x, cells_o, outer_x, outer_o, outer_draw = board.bitboards()
+        where_to_play_next = board.where_to_play_next
+        where_index = 9 if where_to_play_next is None else board.OUTER_FIELD_INDICES[where_to_play_next]
+        return cls(cells_x | cells_o << 81 | outer_x << 162 | outer_o << 171 | outer_draw << 180 | where_index << 189
+                   | (board.active_player == board.PLAYER_O) << 193)
+
+    def bitboards(self) -> tuple:
+        """
+        Return the masks (cells_x, cells_o, outer_x, outer_o, outer_draw), as `TicTacToe_Board_2_layers.bitboards`.
+        """
+        packed = self.packed
+        return (packed & CELLS_MASK, packed >> 81 & CELLS_MASK,
+                packed >> 162 & FULL_MASK, packed >> 171 & FULL_MASK, packed >> 180 & FULL_MASK)
+
+    def to_board(self) -> TicTacToe_Board_2_layers:
+        """
+        Create a board in the position (without move stack).
+
+        Returns:
+            TicTacToe_Board_2_layers: The board.
+
+        Usage:
+            tic_tac_toe_board = position.to_board()
+        """
+        where_index = self.packed >> 189 & 0xF
+        return TicTacToe_Board_2_layers.from_bitboards(*self.bitboards(), None if where_index == 9 else where_index,
+                                                       self.active_player)
+
+    @property
+    def active_player(self) -> str:
+        """
+        The player to move ('X' or 'O').
+        """
+        return TicTacToe_Board_2_layers.PLAYER_O if self.packed >> 193 & 1 else TicTacToe_Board_2_layers.PLAYER_X
+
+    @property
+    def where_to_play_next(self) -> str:
+        """
+        The outer field position of the forced inner field, None for a free choice.
+        """
+        where_index = self.packed >> 189 & 0xF
+        return None if where_index == 9 else TicTacToe_Board_2_layers.OUTER_FIELD_POSITIONS[where_index]
+
+    @property
+    def game_result(self) -> str:
+        """
+        The result of the game: 'X' or 'O' for a winner, 'D' for a draw and None while it is running.
+        """
+        _, _, outer_x, outer_o, outer_draw = self.bitboards()
+        if WINNING_LINES_TABLE[outer_x]:
+            return TicTacToe_Board_2_layers.PLAYER_X
+        if WINNING_LINES_TABLE[outer_o]:
+            return TicTacToe_Board_2_layers.PLAYER_O
+        if outer_x | outer_o | outer_draw == FULL_MASK:
+            return TicTacToe_Board_2_layers.DRAW_SYMBOL
+        return None
+
+    def legal_moves(self) -> list:
+        """
+        Return the legal moves (cells 0-80) of the player to move.
+        """
+        return self.to_board().legal_moves()
+
+    def play(self, move):
+        """
+        Return the position after a move of the player to move.
+
+        Args:
+            move (int): The cell (0-80) of the move.
+
+        Returns:
+            Position: The new position (this one is unchanged).
+
+        Raises:
+            ValueError: If the move is not legal (see `TicTacToe_Board_2_layers.push`).
+
+        Usage:
+            child_position = position.play(40)
+        """
+        board = self.to_board()
+        board.push(move)
+        return Position.from_board(board)
@@ -0,0 +1,307 @@
+"""
+Binary game log of 2-layered-TicTacToe games for large game corpora (e.g., from self-play).
+
+A game log is an append-only file of game records next to an index file of their offsets:
+
+    <path>:      MAGIC (8 bytes), followed by one record per game:
+                     number of moves (1 byte), result code (1 byte), moves (1 byte each, the cell 0-80).
+    <path>.idx:  The offset of each record in <path>, as 8-byte unsigned integers (little-endian).
+
+The moves of a record are the game record of `TicTacToe_Board_2_layers.game_record`. The result codes are
+0 for a running game, 1 and 2 for a win of X and O and 3 for a draw.
+
+Games are written with a `GameLogWriter`. `read_games` walks a log sequentially in constant memory, and a
+`GameLog` maps the files into memory for random access to game i without reading the file. Its records are
+memoryview slices of the mapping (no copies), and `replay` plays a game back into a board move by move.
+
+Usage:
+    with GameLogWriter('games.tttlog') as writer:
+        writer.write_board(tic_tac_toe_board)
+
+    for moves, result in read_games('games.tttlog'):
+        ...
+
+    with GameLog('games.tttlog') as game_log:
+        for board in replay(game_log[12345]):
+            ...
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from src.board import TicTacToe_Board_2_layers
+
+MAGIC = b'TTT2LOG1'
+
+# Offset of a record in the index file, little-endian on every architecture.
+OFFSET_FORMAT = struct.Struct('<Q')
+
+# Results of `TicTacToe_Board_2_layers.game_result` in the order of their codes.
+RESULT_SYMBOLS = (None, TicTacToe_Board_2_layers.PLAYER_X, TicTacToe_Board_2_layers.PLAYER_O, TicTacToe_Board_2_layers.DRAW_SYMBOL)
+
+
+def index_path(path) -> str:
+    """
+    Return the path of the index file of a game log.
+    """
+    return f"{path}.idx"
+
+
+def _check_magic(header, path):
+    """
+    Check the header of a game log.
+
+    Raises:
+        ValueError: If the header is not MAGIC.
+    """
+    if header != MAGIC:
+        raise ValueError(f"Invalid game log '{path}'. The file does not start with {MAGIC!r}.")
+
+
+class GameLogWriter:
+    """
+    Appends games to a game log and its index, creating both files if needed.
+
+    Attributes:
+        path (str): The path of the game log.
+        number_of_games (int): The number of games in the log, including the ones written before.
+    """
+
+    def __init__(self, path):
+        """
+        Open a game log for appending.
+
+        Args:
+            path (str): The path of the game log.
+
+        Raises:
+            ValueError: If the file exists but is not a game log.
+
+        Usage:
+            writer = GameLogWriter('games.tttlog')
+        """
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as data_file:
+                _check_magic(data_file.read(len(MAGIC)), path)
+
+        self._data_file = open(path, 'ab')
+        self._index_file = open(index_path(path), 'ab')
+        if self._data_file.tell() == 0:
+            self._data_file.write(MAGIC)
+
+        self._offset = self._data_file.tell()
+        self.number_of_games = self._index_file.tell() // 8
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Flush and close the files.
+
+        Usage:
+            writer.close()
+        """
+        self._data_file.close()
+        self._index_file.close()
+
+    def write(self, moves, result=None) -> int:
+        """
+        Append a game.
+
+        Args:
+            moves (bytes): The moves of the game, one byte per move (see `TicTacToe_Board_2_layers.game_record`).
+            result (str): The result of the game ('X', 'O', 'D'), None for a running game.
+
+        Returns:
+            int: The index of the game in the log.
+
+        Raises:
+            ValueError: If the game has more than 81 moves.
+
+        Usage:
+            game_index = writer.write(bytes([40, 36, 0]))
+        """
+        if len(moves) > 81:
+            raise ValueError("Invalid game record. A game has at most 81 moves.")
+
+        self._index_file.write(OFFSET_FORMAT.pack(self._offset))
+        self._data_file.write(bytes((len(moves), RESULT_SYMBOLS.index(result))))
+        self._data_file.write(moves)
+        self._offset += 2 + len(moves)
+        self.number_of_games += 1
+        return self.number_of_games - 1
+
+    def write_board(self, board) -> int:
+        """
+        Append the game played on a board (its move stack and result).
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board of the game.
+
+        Returns:
+            int: The index of the game in the log.
+
+        Usage:
+            game_index = writer.write_board(tic_tac_toe_board)
+        """
+        return self.write(board.game_record(), board.game_result)
+
+
+def read_games(path, buffer_size=1 << 16):
+    """
+    Read the games of a game log one after the other, in constant memory (the index is not needed).
+
+    Args:
+        path (str): The path of the game log.
+        buffer_size (int): The size of the read buffer in bytes.
+
+    Yields:
+        tuple: The moves (bytes, one byte per move) and the result ('X', 'O', 'D' or None) of each game.
+
+    Raises:
+        ValueError: If the file is not a game log or ends within a game.
+
+    Usage:
+        for moves, result in read_games('games.tttlog'):
+            ...
+    """
+    with open(path, 'rb', buffering=buffer_size) as data_file:
+        _check_magic(data_file.read(len(MAGIC)), path)
+        while header := data_file.read(2):
+            moves = data_file.read(header[0]) if len(header) == 2 else b''
+            if len(header) != 2 or len(moves) != header[0]:
+                raise ValueError(f"Invalid game log '{path}'. The file ends within a game.")
+            result_code = header[1]
+            yield moves, RESULT_SYMBOLS[result_code]
+
+
+def replay(moves):
+    """
+    Play the moves of a game on a new board, one move at a time.
+
+    The same board is yielded after every move, so it has to be copied (e.g., with `to_bytes`) to keep a position.
+
+    Args:
+        moves: The moves of the game (bytes, memoryview or any iterable of cells 0-80).
+
+    Yields:
+        TicTacToe_Board_2_layers: The board after each move.
+
+    Raises:
+        ValueError: If a move is not legal (see `TicTacToe_Board_2_layers.push`).
+
+    Usage:
+        for board in replay(game_log[0]):
+            print(board.zobrist_hash)
+    """
+    board = TicTacToe_Board_2_layers()
+    for move in moves:
+        board.push(move)
+        yield board
+
+
+class GameLog:
+    """
+    Read-only, memory-mapped view of a game log and its index for random access.
+
+    The records returned are memoryviews into the mapping, so the log has to stay open while they are used.
+
+    Attributes:
+        path (str): The path of the game log.
+    """
+
+    def __init__(self, path):
+        """
+        Map a game log and its index into memory.
+
+        Args:
+            path (str): The path of the game log.
+
+        Raises:
+            ValueError: If the file is not a game log.
+
+        Usage:
+            game_log = GameLog('games.tttlog')
+        """
+        self.path = path
+        self._mappings = []
+        self._data = self._map(path)
+        _check_magic(bytes(self._data[:len(MAGIC)]), path)
+        self._offsets = self._map(index_path(path)).cast('Q')
+        if sys.byteorder == 'big':
+            # The mapped offsets are little-endian, so a big-endian host reads a byte-swapped copy.
+            offsets = array('Q', self._offsets)
+            offsets.byteswap()
+            self._offsets.release()
+            self._offsets = memoryview(offsets)
+
+    def _map(self, path) -> memoryview:
+        """
+        Map a file into memory read-only (an empty file gives an empty view).
+        """
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b'')
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mappings.append(mapping)
+        return memoryview(mapping)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the files. Memoryviews of records still in use raise a BufferError here.
+
+        Usage:
+            game_log.close()
+        """
+        self._offsets.release()
+        self._data.release()
+        for mapping in self._mappings:
+            mapping.close()
+        self._mappings = []
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _record(self, game_index) -> tuple:
+        """
+        Return the offset of the moves, the number of moves and the result code of a game.
+        """
+        offset = self._offsets[game_index]
+        return offset + 2, self._data[offset], self._data[offset + 1]
+
+    def __getitem__(self, game_index) -> memoryview:
+        """
+        Return the moves of game i as a memoryview of the mapped file (one byte per move, no copy).
+        """
+        offset, number_of_moves, _ = self._record(game_index)
+        return self._data[offset:offset + number_of_moves]
+
+    def game_result(self, game_index) -> str:
+        """
+        Return the result ('X', 'O', 'D' or None) of game i.
+        """
+        return RESULT_SYMBOLS[self._record(game_index)[2]]
+
+    def replay(self, game_index):
+        """
+        Play game i on a new board, one move at a time (see `replay`).
+
+        Usage:
+            for board in game_log.replay(12345):
+                ...
+        """
+        return replay(self[game_index])
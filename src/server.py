@@ -0,0 +1,516 @@
+"""
+Asyncio game server hosting many independent 2-layered-TicTacToe games over a line protocol.
+
+Clients connect over TCP and send one command per line (UTF-8). Every command gets exactly one reply line,
+'OK ...' or 'ERR <message>'. A connection can play any number of games, and any connection knowing the id of
+a game can make its moves:
+
+    NEW [X|O] [agent]          Start a game, optionally with an AI seat for X or O playing one of the agents of
+                               the server by name (SERVER_AGENTS by default, default agent DEFAULT_AGENT or the
+                               first agent of the server).
+                               Reply: OK <game id> <AI move or -> <result or ->
+    MOVE <game id> <move>      Make a move in notation (e.g. 'e5') for the player to move, followed by the AI reply.
+                               Reply: OK <game id> <AI move or -> <result or ->
+    STATE <game id>            Reply: OK <game id> <player to move> <forced inner field or -> <result or -> <moves...>
+    QUIT <game id>             End a game. Reply: OK <game id>
+    STATS                      Reply: OK games=<n> moves=<n> p50_ms=<x> p99_ms=<x> ai_p50_ms=<x> ai_p99_ms=<x>
+
+Clients only choose agents by name. The agent specs (see `src.tournament.create_agent`) are set by the operator,
+so a client cannot make the server open files, allocate large tables or search without a time limit.
+
+Moves are validated by `GameSession`. AI moves are searched in a process pool (`run_in_executor`), so the
+event loop keeps serving the other games while an engine is thinking. Games without a command for
+'session_timeout' seconds are removed, and connections without a command for 'idle_timeout' seconds are closed.
+
+The server measures the latency of every MOVE command (from receiving the line to sending the reply, including
+the AI reply) and of every AI search, and reports the 50th and 99th percentiles with STATS.
+
+Usage:
+    python -m src.server --port 8765
+    python -m src.server --load-test 2000 --agent random
+
+    server = await GameServer(port=0).start()
+    reply = await server.handle_command('NEW O random')
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.board import TicTacToe_Board_2_layers
+from src.game import GameSession
+from src.tournament import validate_agent_spec
+
+# Agents the clients can choose with NEW, by name: agent specs with a time or size limit and no files.
+SERVER_AGENTS = {'random': 'random', 'greedy': 'greedy', 'alphabeta': 'alphabeta:time=0.05', 'mcts': 'mcts:time=0.05'}
+DEFAULT_AGENT = 'alphabeta'
+
+# Bounds of the interval in seconds between two checks for expired games (a fraction of the session timeout).
+MIN_EXPIRY_INTERVAL, MAX_EXPIRY_INTERVAL = 1.0, 60.0
+
+# Number of latencies kept for the percentiles.
+LATENCY_WINDOW = 100000
+
+# Agents of a worker process of the AI executor, by spec, the most recently used last. Kept between moves so that
+# engines reuse their tables, up to WORKER_AGENT_CACHE_SIZE agents.
+_worker_agents = {}
+WORKER_AGENT_CACHE_SIZE = 8
+
+
+def _search_ai_move(game_record, agent_spec) -> int:
+    """
+    Search the move of an AI seat (in a worker process of the AI executor).
+
+    Args:
+        game_record (bytes): The moves of the game so far (see `TicTacToe_Board_2_layers.game_record`).
+        agent_spec (str): The spec of the agent.
+
+    Returns:
+        int: The move (0-80) of the agent.
+    """
+    from src.tournament import create_agent
+
+    agent = _worker_agents.pop(agent_spec, None)
+    if agent is None:
+        agent = create_agent(agent_spec)
+        if len(_worker_agents) >= WORKER_AGENT_CACHE_SIZE:
+            least_recently_used_agent = _worker_agents.pop(next(iter(_worker_agents)))
+            if hasattr(least_recently_used_agent, 'close'):
+                least_recently_used_agent.close()
+    _worker_agents[agent_spec] = agent
+    return agent.search(TicTacToe_Board_2_layers.from_game_record(game_record)).best_move
+
+
+def percentile(values, fraction) -> float:
+    """
+    Return the nearest-rank percentile of some values, 0.0 if there are none.
+
+    Usage:
+        p99 = percentile(latencies, 0.99)
+    """
+    if not values:
+        return 0.0
+    ordered_values = sorted(values)
+    return ordered_values[min(len(ordered_values) - 1, max(0, round(fraction * len(ordered_values)) - 1))]
+
+
+class HostedGame:
+    """
+    A game hosted by the server.
+
+    Attributes:
+        game_id (int): The id of the game.
+        session (GameSession): The game.
+        ai_player (str): The player ('X' or 'O') of the AI seat, None without an AI.
+        agent_spec (str): The agent spec of the AI seat.
+        last_activity (float): The time of the last command of the game (`time.monotonic`).
+        ai_is_moving (bool): True while the AI move is searched.
+    """
+
+    def __init__(self, game_id, ai_player=None, agent_spec=SERVER_AGENTS[DEFAULT_AGENT]):
+        self.game_id = game_id
+        self.session = GameSession()
+        self.ai_player = ai_player
+        self.agent_spec = agent_spec
+        self.last_activity = time.monotonic()
+        self.ai_is_moving = False
+
+    def is_ai_turn(self) -> bool:
+        """
+        Check if the game is running and the AI seat has to move.
+        """
+        return not self.session.is_game_over() and self.session.board.active_player == self.ai_player
+
+
+class GameServer:
+    """
+    Asyncio TCP server of the line protocol in the module documentation.
+
+    Attributes:
+        host (str): The address to listen on.
+        port (int): The port to listen on, the actual port once started (e.g., when started with port 0).
+        session_timeout (float): Seconds without a command after which a game is removed.
+        idle_timeout (float): Seconds without a command after which a connection is closed.
+        agents (dict): The agent specs the clients can choose, by name.
+        games (dict): The hosted games by id.
+        number_of_moves (int): The number of moves made in all games, including the AI moves.
+        move_latencies (collections.deque): Latencies of the last MOVE commands in seconds.
+        ai_latencies (collections.deque): Latencies of the last AI searches in seconds.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, session_timeout=300.0, idle_timeout=600.0, ai_workers=None, executor=None,
+                 agents=None):
+        """
+        Initialize the server (see 'start').
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on, 0 for any free port.
+            session_timeout (float): Seconds without a command after which a game is removed.
+            idle_timeout (float): Seconds without a command after which a connection is closed.
+            ai_workers (int): The number of processes searching AI moves, `os.cpu_count()` if None.
+            executor (concurrent.futures.Executor): The executor of the AI searches, a process pool if None.
+            agents (dict): The agent specs the clients can choose, by name, SERVER_AGENTS if None.
+
+        Raises:
+            ValueError: If an agent spec is invalid (see `src.tournament.validate_agent_spec`).
+
+        Usage:
+            server = GameServer(port=8765)
+        """
+        self.host = host
+        self.port = port
+        self.session_timeout = session_timeout
+        self.idle_timeout = idle_timeout
+        self.agents = dict(SERVER_AGENTS if agents is None else agents)
+        for agent_spec in self.agents.values():
+            validate_agent_spec(agent_spec)
+        self.games = {}
+        self.move_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.ai_latencies = deque(maxlen=LATENCY_WINDOW)
+        self.number_of_moves = 0
+
+        self._owns_executor = executor is None
+        self._executor = ProcessPoolExecutor(max_workers=ai_workers or os.cpu_count()) if executor is None else executor
+        self._game_ids = itertools.count(1)
+        self._server = None
+        self._expiry_task = None
+        self._connections = {}
+
+    async def start(self):
+        """
+        Start listening and removing expired games.
+
+        Returns:
+            GameServer: The server.
+
+        Usage:
+            server = await GameServer(port=0).start()
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._expiry_task = asyncio.create_task(self._expire_games())
+        return self
+
+    async def serve_forever(self):
+        """
+        Serve until the task is cancelled.
+        """
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening, stop removing expired games and shut the AI executor down (if the server created it).
+
+        Usage:
+            await server.close()
+        """
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+        if self._server is not None:
+            self._server.close()
+
+        # Closing the connections ends their handlers (end of input) instead of cancelling them mid-command.
+        for writer in self._connections.values():
+            writer.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._owns_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def _expire_games(self):
+        """
+        Remove the games without a command for 'session_timeout' seconds, checking a few times per timeout.
+
+        The interval is at least MIN_EXPIRY_INTERVAL, so that a tiny timeout does not keep the event loop busy.
+        """
+        while True:
+            await asyncio.sleep(min(max(self.session_timeout / 4, MIN_EXPIRY_INTERVAL), MAX_EXPIRY_INTERVAL))
+            self.expire_games()
+
+    def expire_games(self) -> int:
+        """
+        Remove the games without a command for 'session_timeout' seconds (games waiting for the AI are kept).
+
+        Returns:
+            int: The number of removed games.
+        """
+        expiry_time = time.monotonic() - self.session_timeout
+        expired_ids = [game_id for game_id, game in self.games.items() if game.last_activity < expiry_time and not game.ai_is_moving]
+        for game_id in expired_ids:
+            del self.games[game_id]
+        return len(expired_ids)
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve the commands of one connection until it is closed or idle for 'idle_timeout' seconds.
+        """
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not line:
+                    break
+
+                writer.write((await self.handle_command(line.decode('utf-8', 'replace')) + '\n').encode('utf-8'))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def handle_command(self, line) -> str:
+        """
+        Execute one command of the protocol.
+
+        Args:
+            line (str): The command line.
+
+        Returns:
+            str: The reply line (without line break).
+
+        Usage:
+            reply = await server.handle_command('MOVE 1 e5')
+        """
+        words = line.split()
+        if not words:
+            return "ERR Empty command."
+
+        command, arguments = words[0].upper(), words[1:]
+        try:
+            if command == 'NEW':
+                return await self._new_game(arguments)
+            if command == 'MOVE':
+                start_time = time.perf_counter()
+                reply = await self._move(arguments)
+                self.move_latencies.append(time.perf_counter() - start_time)
+                return reply
+            if command == 'STATE':
+                return self._state(arguments)
+            if command == 'QUIT':
+                game = self._game(arguments, 1)
+                del self.games[game.game_id]
+                return f"OK {game.game_id}"
+            if command == 'STATS':
+                return self._statistics()
+        except (ValueError, RuntimeError, OSError, MemoryError) as error:
+            # Every command gets a reply, also if the AI search or the executor failed.
+            return f"ERR {error}"
+        return f"ERR Unknown command '{words[0]}'. Use NEW, MOVE, STATE, QUIT or STATS."
+
+    def _game(self, arguments, number_of_arguments) -> HostedGame:
+        """
+        Look up the game of a command given as '<game id> ...'.
+
+        Raises:
+            ValueError: If the number of arguments is wrong or the game does not exist.
+        """
+        if len(arguments) != number_of_arguments:
+            raise ValueError(f"Expected {number_of_arguments} argument(s).")
+        game = self.games.get(int(arguments[0])) if arguments[0].isdigit() else None
+        if game is None:
+            raise ValueError(f"Unknown game '{arguments[0]}'.")
+        game.last_activity = time.monotonic()
+        return game
+
+    async def _new_game(self, arguments) -> str:
+        """
+        Start a game (command NEW) and let the AI open it if it plays X.
+        """
+        if len(arguments) > 2:
+            raise ValueError("Expected at most 2 arguments: NEW [X|O] [agent].")
+        ai_player = arguments[0].upper() if arguments else None
+        if ai_player not in (None, TicTacToe_Board_2_layers.PLAYER_X, TicTacToe_Board_2_layers.PLAYER_O):
+            raise ValueError(f"Invalid AI player '{arguments[0]}'. Use X or O.")
+        default_agent_name = DEFAULT_AGENT if DEFAULT_AGENT in self.agents else next(iter(self.agents))
+        agent_name = arguments[1] if len(arguments) > 1 else default_agent_name
+        if agent_name not in self.agents:
+            raise ValueError(f"Unknown agent '{agent_name}'. Choose one of: {', '.join(self.agents)}.")
+
+        game = HostedGame(next(self._game_ids), ai_player, self.agents[agent_name])
+        self.games[game.game_id] = game
+        return await self._reply_after_ai_move(game)
+
+    async def _move(self, arguments) -> str:
+        """
+        Make a move (command MOVE) and the reply of the AI.
+        """
+        game = self._game(arguments, 2)
+        if game.ai_is_moving or game.is_ai_turn():
+            raise ValueError(f"Game {game.game_id} is waiting for the AI move.")
+        if game.session.is_game_over():
+            raise ValueError(f"Game {game.game_id} is over.")
+
+        move = game.session.board.notation_to_move(arguments[1])
+        if not game.session.play_move(move):
+            raise ValueError(f"Illegal move '{arguments[1]}'. Choose an empty cell in an allowed inner field.")
+        self.number_of_moves += 1
+        return await self._reply_after_ai_move(game)
+
+    async def _reply_after_ai_move(self, game) -> str:
+        """
+        Let the AI seat move if it is its turn (in the executor) and build the reply 'OK <id> <AI move> <result>'.
+
+        Raises:
+            RuntimeError: If the AI search failed (e.g., an agent file is missing or the executor is broken) or
+                          returned an illegal move.
+        """
+        ai_move = '-'
+        if game.is_ai_turn():
+            game.ai_is_moving = True
+            start_time = time.perf_counter()
+            try:
+                move = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, _search_ai_move, game.session.board.game_record(), game.agent_spec)
+            except Exception as error:
+                # The game cannot go on without the AI move.
+                self.games.pop(game.game_id, None)
+                raise RuntimeError(f"AI search of game {game.game_id} failed ({type(error).__name__}: {error}). "
+                                   f"The game is removed.") from error
+            finally:
+                game.ai_is_moving = False
+            self.ai_latencies.append(time.perf_counter() - start_time)
+            if not game.session.play_move(move):
+                self.games.pop(game.game_id, None)
+                raise RuntimeError(f"AI of game {game.game_id} returned the illegal move {move!r}. The game is removed.")
+            self.number_of_moves += 1
+            ai_move = game.session.board.move_to_notation(move)
+
+        return f"OK {game.game_id} {ai_move} {game.session.board.game_result or '-'}"
+
+    def _state(self, arguments) -> str:
+        """
+        Describe a game (command STATE).
+        """
+        game = self._game(arguments, 1)
+        board = game.session.board
+        where_to_play_next = board.where_to_play_next or '-'
+        return f"OK {game.game_id} {board.active_player} {where_to_play_next} {board.game_result or '-'} {board.to_notation()}".rstrip()
+
+    def statistics(self) -> dict:
+        """
+        Return the number of games and moves and the latency percentiles in milliseconds.
+
+        Usage:
+            move_p99_ms = server.statistics()['p99_ms']
+        """
+        return {'games': len(self.games), 'moves': self.number_of_moves,
+                'p50_ms': 1000 * percentile(self.move_latencies, 0.5), 'p99_ms': 1000 * percentile(self.move_latencies, 0.99),
+                'ai_p50_ms': 1000 * percentile(self.ai_latencies, 0.5), 'ai_p99_ms': 1000 * percentile(self.ai_latencies, 0.99)}
+
+    def _statistics(self) -> str:
+        """
+        Report the statistics (command STATS).
+        """
+        return "OK " + " ".join(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+                                for name, value in self.statistics().items())
+
+
+async def run_load_test(host, port, number_of_games, connections=100, agent_name='random', seed=1) -> dict:
+    """
+    Play many concurrent games against AI seats of a server, with random moves for the clients.
+
+    The games are spread over the connections, and each connection plays its games interleaved, so all games
+    are open at the same time.
+
+    Args:
+        host (str): The address of the server.
+        port (int): The port of the server.
+        number_of_games (int): The number of games.
+        connections (int): The number of client connections.
+        agent_name (str): The name of the agent of the AI seats (O), one of the agents of the server.
+        seed (int): The seed of the random moves.
+
+    Returns:
+        dict: The number of games, moves and the client-side 'p50_ms' and 'p99_ms' latency of the MOVE commands.
+
+    Usage:
+        results = await run_load_test('127.0.0.1', 8765, 1000)
+    """
+    latencies = []
+
+    async def play_games(connection_index, number_of_connection_games):
+        rng = random.Random(f"{seed}/{connection_index}")
+        reader, writer = await asyncio.open_connection(host, port)
+
+        async def request(command):
+            writer.write(command.encode('utf-8') + b'\n')
+            await writer.drain()
+            reply = (await reader.readline()).decode('utf-8').split()
+            if reply[0] != 'OK':
+                raise RuntimeError(f"Command '{command}' failed: {' '.join(reply)}")
+            return reply
+
+        # Start all games of the connection, then make one move in each running game per round.
+        boards = {}
+        for _ in range(number_of_connection_games):
+            game_id = (await request(f"NEW O {agent_name}"))[1]
+            boards[game_id] = TicTacToe_Board_2_layers()
+        while boards:
+            for game_id, board in list(boards.items()):
+                move = board.move_to_notation(rng.choice(board.legal_moves()))
+                start_time = time.perf_counter()
+                _, _, ai_move, result = await request(f"MOVE {game_id} {move}")
+                latencies.append(time.perf_counter() - start_time)
+                board.push(board.notation_to_move(move))
+                if ai_move != '-':
+                    board.push(board.notation_to_move(ai_move))
+                if result != '-':
+                    await request(f"QUIT {game_id}")
+                    del boards[game_id]
+        writer.close()
+
+    connections = min(connections, number_of_games)
+    await asyncio.gather(*(play_games(index, number_of_games // connections + (index < number_of_games % connections))
+                           for index in range(connections)))
+    return {'games': number_of_games, 'moves': len(latencies),
+            'p50_ms': 1000 * percentile(latencies, 0.5), 'p99_ms': 1000 * percentile(latencies, 0.99)}
+
+
+async def _main(arguments):
+    """
+    Serve, or serve and run a load test against the server.
+    """
+    server = await GameServer(arguments.host, arguments.port, arguments.session_timeout, ai_workers=arguments.ai_workers).start()
+    print(f"Serving on {server.host}:{server.port}")
+    try:
+        if arguments.load_test:
+            start_time = time.perf_counter()
+            results = await run_load_test(server.host, server.port, arguments.load_test, arguments.connections, arguments.agent)
+            elapsed = time.perf_counter() - start_time
+            print(f"{results['games']} games, {results['moves']} moves in {elapsed:.1f} s, "
+                  f"client p50 {results['p50_ms']:.2f} ms, p99 {results['p99_ms']:.2f} ms")
+            print("Server: " + ", ".join(f"{name} {value:.2f}" if isinstance(value, float) else f"{name} {value}"
+                                          for name, value in server.statistics().items()))
+        else:
+            await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Host 2-layered-TicTacToe games over a line protocol.")
+    argument_parser.add_argument("--host", default='127.0.0.1', help="The address to listen on.")
+    argument_parser.add_argument("--port", type=int, default=8765, help="The port to listen on, 0 for any free port.")
+    argument_parser.add_argument("--session-timeout", type=float, default=300.0, help="Seconds until an inactive game is removed.")
+    argument_parser.add_argument("--ai-workers", type=int, help="Processes searching AI moves (default: number of CPUs).")
+    argument_parser.add_argument("--load-test", type=int, metavar="GAMES", help="Play this many concurrent games against the server and exit.")
+    argument_parser.add_argument("--connections", type=int, default=100, help="Client connections of the load test.")
+    argument_parser.add_argument("--agent", default='random', help=f"Agent of the AI seats in the load test, one of: {', '.join(SERVER_AGENTS)}.")
+    arguments = argument_parser.parse_args()
+
+    try:
+        asyncio.run(_main(arguments))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,472 @@
+"""
+Endgame tablebase of 2-layered-TicTacToe, solved offline by retrograde analysis.
+
+Late in a game only the empty cells of the undecided inner fields matter, the open cells. The cells of a won or
+drawn inner field can never change the result, so positions are stored without them: two positions that differ
+only within decided inner fields share one entry, and so do symmetric positions (see 'endgame_key').
+
+The positions with at most M open cells are far too many to enumerate: the decided inner fields and the
+contents of the undecided ones combine freely, so a file can only hold a tiny share of them. The solver starts
+from seed positions and enumerates every position reachable from them, layer by layer by the number of open
+cells, since each move fills a cell. Then it solves the layers backwards from the end of the game: a position is
+won if a move leads to a position lost for the opponent, drawn if the best move leads to a draw and lost otherwise.
+
+The file is a precomputed part of the tablebase, built from the endgames of random games. A `Tablebase` solves
+the positions missing in the file when they are probed, which is fast since the endgame below M open cells is
+small (at most a few hundred milliseconds with 8 open cells), and keeps them in memory. Every later position of
+the game is then looked up. 'save' adds the solved positions to the file.
+
+Tablebase file layout:
+
+    MAGIC (8 bytes), the maximum number of open cells M (1 byte), followed by one entry per position, sorted by key:
+        endgame key (POSITION_SIZE = 19 bytes, the encoding of `to_bytes`),
+        result for the player to move (1 byte, signed: 1 win, 0 draw, -1 loss),
+        best move in the keyed position (1 byte, the cell 0-80),
+        number of plies to the end of the game with best play (1 byte).
+
+A `Tablebase` maps the file into memory and finds a position by binary search, like `src.book.OpeningBook`.
+`TicTacToe_Board_2_layers.probe` looks up a board, and a `TablebaseEngine` plays the moves of the tablebase and
+searches the positions that are not in it.
+
+Usage:
+    build_tablebase('endgame.tttbase', max_open_cells=8, seed_boards=sample_endgames(1000, 8))
+
+    with Tablebase('endgame.tttbase') as tablebase:
+        entry = tic_tac_toe_board.probe(tablebase)  # (result, move, distance), None above M open cells
+        engine = TablebaseEngine(tablebase, AlphaBetaEngine(time_limit=0.1))
+        tablebase.save()
+
+    python -m src.tablebase endgame.tttbase --open-cells 8 --games 1000
+"""
+
+import argparse
+import itertools
+import mmap
+import os
+import random
+import struct
+import time
+
+from src.board import (FULL_MASK, OPEN_CELLS_TABLE, POSITION_SIZE, SYMMETRY_INVERSES, SYMMETRY_MOVE_PERMUTATIONS,
+                       TicTacToe_Board_2_layers)
+from src.engine import WIN_SCORE, SearchResult
+
+MAGIC = b'TTT2BASE'
+HEADER_SIZE = len(MAGIC) + 1
+
+# Result, best move and distance following the key of an entry.
+ENTRY_VALUE_FORMAT = struct.Struct('>bBB')
+ENTRY_SIZE = POSITION_SIZE + ENTRY_VALUE_FORMAT.size
+
+WIN, DRAW, LOSS = 1, 0, -1
+
+# Maximum number of positions solved on probe and kept in memory (about 200 bytes each, i.e., 200 MB in total).
+SOLVED_CACHE_SIZE = 1000000
+
+
+def open_cells_mask(board) -> int:
+    """
+    Return the 81-bit mask of the empty cells in the undecided inner fields of a board.
+    """
+    cells_x, cells_o, outer_x, outer_o, outer_draw = board.bitboards()
+    return ~(cells_x | cells_o) & OPEN_CELLS_TABLE[FULL_MASK ^ (outer_x | outer_o | outer_draw)]
+
+
+def endgame_key(board) -> tuple:
+    """
+    Compute the key of a board in the tablebase: the canonical key of the position without the decided inner fields.
+
+    Args:
+        board (TicTacToe_Board_2_layers): The board.
+
+    Returns:
+        tuple: The endgame key and the index (0-7) of the symmetry leading to it (see `canonical_key`).
+
+    Usage:
+        key, symmetry = endgame_key(tic_tac_toe_board)
+    """
+    cells_x, cells_o, outer_x, outer_o, outer_draw = board.bitboards()
+    undecided_cells = OPEN_CELLS_TABLE[FULL_MASK ^ (outer_x | outer_o | outer_draw)]
+    where_to_play_next = board.where_to_play_next
+    endgame_board = TicTacToe_Board_2_layers.from_bitboards(
+        cells_x & undecided_cells, cells_o & undecided_cells, outer_x, outer_o, outer_draw,
+        None if where_to_play_next is None else board.OUTER_FIELD_INDICES[where_to_play_next], board.active_player)
+    return endgame_board.canonical_key()
+
+
+def sample_endgames(number_of_games, max_open_cells, seed=1):
+    """
+    Play random games and yield the first position of each with at most 'max_open_cells' open cells.
+
+    Args:
+        number_of_games (int): The number of games.
+        max_open_cells (int): The maximum number of open cells M.
+        seed (int): The seed of the random moves.
+
+    Yields:
+        TicTacToe_Board_2_layers: The positions (games ending before reaching M open cells yield nothing).
+
+    Usage:
+        seed_boards = list(sample_endgames(1000, 8))
+    """
+    rng = random.Random(seed)
+    for _ in range(number_of_games):
+        board = TicTacToe_Board_2_layers()
+        while not board.is_game_over() and open_cells_mask(board).bit_count() > max_open_cells:
+            board.push(rng.choice(board.legal_moves()))
+        if not board.is_game_over():
+            yield board
+
+
+def solve_endgames(seed_boards, max_open_cells, progress=None, known_entry=None) -> dict:
+    """
+    Solve every position reachable from the seed positions by retrograde analysis.
+
+    Args:
+        seed_boards (iterable): The seed positions. Finished games and positions with more than
+                                'max_open_cells' open cells are ignored.
+        max_open_cells (int): The maximum number of open cells M.
+        progress (callable): Called with the number of open cells and the number of positions of a layer before
+                             it is solved.
+        known_entry (callable): Returns the entry of an endgame key if it is already solved, else None. Known
+                                positions are neither expanded nor returned.
+
+    Returns:
+        dict: Maps the endgame key of each position to its result, best move (in the keyed position) and distance.
+
+    Usage:
+        entries = solve_endgames(sample_endgames(100, 6), 6)
+    """
+    # Enumerate the positions by layers of open cells. The successors of a layer lie in the layers below it.
+    # Each successor is kept as its endgame key, or as (result, distance) if the move ends the game.
+    layers = [set() for _ in range(max_open_cells + 1)]
+    for board in seed_boards:
+        open_cells = open_cells_mask(board).bit_count()
+        if not board.is_game_over() and open_cells <= max_open_cells:
+            key = endgame_key(board)[0]
+            if known_entry is None or known_entry(key) is None:
+                layers[open_cells].add(key)
+
+    successors = {}
+    known_entries = {}
+    for open_cells in range(max_open_cells, 0, -1):
+        for key in layers[open_cells]:
+            board = TicTacToe_Board_2_layers.from_bytes(key)
+            player = board.active_player
+            moves = []
+            for move in board.legal_moves():
+                board.push(move)
+                if board.game_result == player:
+                    moves.append((move, (WIN, 1)))
+                elif board.game_result == board.DRAW_SYMBOL:
+                    moves.append((move, (DRAW, 1)))
+                else:
+                    child_key = endgame_key(board)[0]
+                    moves.append((move, child_key))
+                    entry = None if known_entry is None else known_entry(child_key)
+                    if entry is None:
+                        layers[open_cells_mask(board).bit_count()].add(child_key)
+                    else:
+                        known_entries[child_key] = entry
+                board.pop()
+            successors[key] = moves
+
+    # Solve the layers from the end of the game, so that the successors of a position are solved before it.
+    entries = {}
+    for open_cells in range(1, max_open_cells + 1):
+        if progress is not None:
+            progress(open_cells, len(layers[open_cells]))
+
+        for key in layers[open_cells]:
+            best = None
+            for move, successor in successors.pop(key):
+                if isinstance(successor, tuple):
+                    result, distance = successor
+                else:
+                    child_result, _, child_distance = entries.get(successor) or known_entries[successor]
+                    result, distance = -child_result, child_distance + 1
+
+                # Win as fast and lose as slowly as possible.
+                rank = (result, -distance if result == WIN else distance)
+                if best is None or rank > best[0]:
+                    best = (rank, result, move, distance)
+            entries[key] = best[1:]
+        layers[open_cells] = None
+    return entries
+
+
+def build_tablebase(path, max_open_cells=8, seed_boards=None, progress=None) -> int:
+    """
+    Solve the endgames reachable from the seed positions and write the tablebase.
+
+    Args:
+        path (str): The path of the tablebase file (overwritten if it exists).
+        max_open_cells (int): The maximum number of open cells M (1-81).
+        seed_boards (iterable): The seed positions, the endgames of 1000 random games if None (see 'sample_endgames').
+        progress (callable): Called with the number of open cells and the number of positions of each layer.
+
+    Returns:
+        int: The number of positions in the tablebase.
+
+    Raises:
+        ValueError: If the maximum number of open cells is not within 1 to 81.
+
+    Usage:
+        number_of_positions = build_tablebase('endgame.tttbase', max_open_cells=8)
+    """
+    if not 1 <= max_open_cells <= 81:
+        raise ValueError("Invalid number of open cells. The tablebase covers 1 to 81 open cells.")
+    if seed_boards is None:
+        seed_boards = sample_endgames(1000, max_open_cells)
+
+    entries = solve_endgames(seed_boards, max_open_cells, progress)
+    _write_tablebase(path, max_open_cells, entries)
+    return len(entries)
+
+
+def _write_tablebase(path, max_open_cells, entries):
+    """
+    Write a tablebase file, replacing the file at the end, so that a mapping of the old file stays valid.
+    """
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as tablebase_file:
+        tablebase_file.write(MAGIC + bytes([max_open_cells]))
+        for key in sorted(entries):
+            tablebase_file.write(key.to_bytes(POSITION_SIZE, 'big') + ENTRY_VALUE_FORMAT.pack(*entries[key]))
+    os.replace(temporary_path, path)
+
+
+class Tablebase:
+    """
+    Memory-mapped endgame tablebase, solving the positions missing in the file when they are probed.
+
+    Attributes:
+        path (str): The path of the tablebase file.
+        max_open_cells (int): The maximum number of open cells of the positions in the tablebase.
+        solve_misses (bool): True to solve positions missing in the file on probe (see 'probe').
+    """
+
+    def __init__(self, path, solve_misses=True):
+        """
+        Map a tablebase into memory.
+
+        Args:
+            path (str): The path of the tablebase file.
+            solve_misses (bool): True to solve positions missing in the file on probe, False to return None for them.
+
+        Raises:
+            ValueError: If the file is not a tablebase.
+
+        Usage:
+            tablebase = Tablebase('endgame.tttbase')
+        """
+        self.path = path
+        self.solve_misses = solve_misses
+        self._solved_entries = {}
+        self._map(path)
+
+    def _map(self, path):
+        """
+        Map the tablebase file into memory and read its header.
+        """
+        with open(path, 'rb') as tablebase_file:
+            header = tablebase_file.read(HEADER_SIZE)
+            if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Invalid tablebase '{path}'. The file does not start with {MAGIC!r}.")
+            self._mapping = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.max_open_cells = header[len(MAGIC)]
+        if (len(self._mapping) - HEADER_SIZE) % ENTRY_SIZE:
+            self._mapping.close()
+            raise ValueError(f"Invalid tablebase '{path}'. The file ends within an entry.")
+        self._number_of_file_entries = (len(self._mapping) - HEADER_SIZE) // ENTRY_SIZE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the file (the positions solved on probe are not saved, see 'save').
+
+        Usage:
+            tablebase.close()
+        """
+        self._mapping.close()
+
+    def __len__(self):
+        return self._number_of_file_entries + len(self._solved_entries)
+
+    def _find(self, key_bytes) -> int:
+        """
+        Binary search the entries for an encoded endgame key.
+
+        Returns:
+            int: The offset of the entry in the file, -1 if the position is not in the file.
+        """
+        low, high = 0, self._number_of_file_entries
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER_SIZE + middle * ENTRY_SIZE
+            entry_key = self._mapping[offset:offset + POSITION_SIZE]
+            if entry_key < key_bytes:
+                low = middle + 1
+            elif entry_key > key_bytes:
+                high = middle
+            else:
+                return offset
+        return -1
+
+    def _entry(self, key) -> tuple:
+        """
+        Return the entry (result, move, distance) of an endgame key, from the file or solved on probe, else None.
+        """
+        offset = self._find(key.to_bytes(POSITION_SIZE, 'big'))
+        if offset >= 0:
+            return ENTRY_VALUE_FORMAT.unpack_from(self._mapping, offset + POSITION_SIZE)
+        return self._solved_entries.get(key)
+
+    def probe(self, board) -> tuple:
+        """
+        Look up the exact result and the best move of a board.
+
+        Finished games and positions with more than 'max_open_cells' open cells are rejected without searching
+        the file. A position missing in the file is solved with everything reachable from it (see 'solve_endgames'),
+        which takes up to a few hundred milliseconds with 8 open cells, so it suits offline use (e.g., tournaments)
+        rather than an interactive game. The solved positions are kept in memory, so the rest of the game is looked
+        up. Above SOLVED_CACHE_SIZE positions, the positions solved first are evicted.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board in the position to look up.
+
+        Returns:
+            tuple: The result of the game with best play ('X', 'O' or 'D'), the best move (0-80) for the board and
+                   the number of plies to the end of the game. None if the position is not in the tablebase
+                   (only without 'solve_misses').
+
+        Usage:
+            entry = tablebase.probe(tic_tac_toe_board)
+        """
+        if board.is_game_over() or open_cells_mask(board).bit_count() > self.max_open_cells:
+            return None
+
+        key, symmetry = endgame_key(board)
+        entry = self._entry(key)
+        if entry is None:
+            if not self.solve_misses:
+                return None
+            solved_entries = solve_endgames([board], self.max_open_cells, known_entry=self._entry)
+            # Evict the positions solved first (dicts keep the insertion order) to make room for the new ones.
+            excess = len(self._solved_entries) + len(solved_entries) - SOLVED_CACHE_SIZE
+            if excess > 0:
+                for solved_key in list(itertools.islice(self._solved_entries, excess)):
+                    del self._solved_entries[solved_key]
+            self._solved_entries.update(solved_entries)
+            entry = solved_entries[key]
+
+        result, move, distance = entry
+        if result == DRAW:
+            winner = board.DRAW_SYMBOL
+        elif result == WIN:
+            winner = board.active_player
+        else:
+            winner = board.PLAYER_O if board.active_player == board.PLAYER_X else board.PLAYER_X
+        return winner, SYMMETRY_MOVE_PERMUTATIONS[SYMMETRY_INVERSES[symmetry]][move], distance
+
+    def save(self, path=None) -> int:
+        """
+        Write the positions of the file and the positions solved on probe to a tablebase file.
+
+        Args:
+            path (str): The path of the new file, the path of this tablebase if None (which is then mapped again).
+
+        Returns:
+            int: The number of positions written.
+
+        Usage:
+            tablebase.save()
+        """
+        entries = {}
+        for offset in range(HEADER_SIZE, len(self._mapping), ENTRY_SIZE):
+            entries[int.from_bytes(self._mapping[offset:offset + POSITION_SIZE], 'big')] = \
+                ENTRY_VALUE_FORMAT.unpack_from(self._mapping, offset + POSITION_SIZE)
+        entries.update(self._solved_entries)
+        _write_tablebase(path or self.path, self.max_open_cells, entries)
+
+        if path is None or os.path.abspath(path) == os.path.abspath(self.path):
+            self._mapping.close()
+            self._map(self.path)
+            self._solved_entries.clear()
+        return len(entries)
+
+
+class TablebaseEngine:
+    """
+    Plays the moves of an endgame tablebase and falls back to a search outside of it.
+
+    Attributes:
+        tablebase (Tablebase): The tablebase.
+        engine: The engine for positions not in the tablebase, with a method 'search(board)'.
+    """
+
+    def __init__(self, tablebase, engine):
+        """
+        Initialize the engine.
+
+        Args:
+            tablebase (Tablebase): The tablebase.
+            engine: The engine for positions not in the tablebase.
+
+        Usage:
+            engine = TablebaseEngine(Tablebase('endgame.tttbase'), AlphaBetaEngine(time_limit=0.1))
+        """
+        self.tablebase = tablebase
+        self.engine = engine
+
+    def search(self, board) -> SearchResult:
+        """
+        Return the tablebase move of the board, or search the position if it is not in the tablebase.
+
+        Args:
+            board (TicTacToe_Board_2_layers): The board to search.
+
+        Returns:
+            SearchResult: The best move with its exact score (as scored by `AlphaBetaEngine`), the distance to the
+                          end of the game as depth and no nodes for a tablebase move.
+
+        Raises:
+            ValueError: If the game is already over.
+
+        Usage:
+            best_move = engine.search(tic_tac_toe_board).best_move
+        """
+        start_time = time.perf_counter()
+        entry = self.tablebase.probe(board)
+        if entry is None:
+            return self.engine.search(board)
+
+        winner, move, distance = entry
+        if winner == board.DRAW_SYMBOL:
+            score = 0
+        elif winner == board.active_player:
+            score = WIN_SCORE - distance
+        else:
+            score = -(WIN_SCORE - distance)
+        return SearchResult(move, score, distance, 0, time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Build an endgame tablebase by retrograde analysis.")
+    argument_parser.add_argument("path", help="The path of the tablebase file.")
+    argument_parser.add_argument("--open-cells", type=int, default=8, help="Maximum number of open cells M.")
+    argument_parser.add_argument("--games", type=int, default=1000, help="Number of random games seeding the endgames.")
+    argument_parser.add_argument("--seed", type=int, default=1, help="Seed of the random games.")
+    arguments = argument_parser.parse_args()
+
+    start_time = time.perf_counter()
+    number_of_positions = build_tablebase(arguments.path, arguments.open_cells,
+                                          sample_endgames(arguments.games, arguments.open_cells, arguments.seed),
+                                          progress=lambda open_cells, count: print(f"{open_cells} open cells: {count} positions"))
+    print(f"{number_of_positions} positions written to '{arguments.path}' in {time.perf_counter() - start_time:.1f} s")
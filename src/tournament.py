@@ -0,0 +1,517 @@
+"""
+Tournament runner for agents playing 2-layered-TicTacToe against each other, spread across a process pool.
+
+Agents are given as specs 'name' or 'name:key=value,...':
+
+    random                         Uniformly random legal moves.
+    greedy                         The move with the best static evaluation one ply ahead (see `src.engine.evaluate`).
+    alphabeta:depth=3              `AlphaBetaEngine`, with the options time (seconds per move), nodes, depth,
+                                   tt (transposition table size in MB, default 1), book (opening book path)
+                                   and tb (endgame tablebase path).
+    mcts:playouts=500              `MCTSEngine`, with the options playouts and time (seconds per move).
+
+Every pair of agents plays the given number of games, with alternating colors. To get different games from
+deterministic agents, each game starts with a few random opening moves, and both games of a color-swapped pair
+share the same opening. A game depends only on the agents, its seed and the opening plies, so the results do not
+depend on the number of processes (except for agents with a time limit).
+
+Each finished game is appended to a CSV or JSONL file (chosen by the file extension) as soon as it is played.
+The standings report wins, draws and losses, the average move latency and the search speed per agent (MCTS
+playouts count as nodes), and the Elo difference with a 95 % confidence interval per pair of agents.
+
+Usage:
+    standings = summarize(play_tournament(['greedy', 'alphabeta:depth=2'], games_per_pairing=100, workers=8))
+
+    python -m src.tournament random greedy alphabeta:depth=2 --games 1000 --workers 8 --output results.jsonl
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.board import TicTacToe_Board_2_layers
+from src.engine import WIN_SCORE, AlphaBetaEngine, SearchResult, evaluate
+
+# Options of each agent and the type of their values.
+AGENT_OPTIONS = {'random': {}, 'greedy': {},
+                 'alphabeta': {'time': float, 'nodes': int, 'depth': int, 'tt': float, 'book': str, 'tb': str},
+                 'mcts': {'playouts': int, 'time': float}}
+
+# Fields of a game record, in the column order of CSV files.
+RECORD_FIELDS = ('game', 'pairing', 'x', 'o', 'seed', 'result', 'plies', 'x_moves', 'o_moves', 'x_time', 'o_time',
+                 'x_nodes', 'o_nodes', 'moves')
+
+# Score of one game for the agent with X, by result.
+GAME_SCORES = {TicTacToe_Board_2_layers.PLAYER_X: 1.0, TicTacToe_Board_2_layers.PLAYER_O: 0.0, TicTacToe_Board_2_layers.DRAW_SYMBOL: 0.5}
+
+
+class RandomAgent:
+    """
+    Plays uniformly random legal moves.
+    """
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+
+    def search(self, board) -> SearchResult:
+        """
+        Choose a random legal move of the board.
+        """
+        start_time = time.perf_counter()
+        return SearchResult(self._rng.choice(board.legal_moves()), 0, 0, 0, time.perf_counter() - start_time)
+
+
+class GreedyAgent:
+    """
+    Plays the move with the best static evaluation of the position after it, winning moves first.
+
+    Ties are broken randomly, so that the agent does not play the same game every time.
+    """
+
+    def __init__(self, seed=None, evaluate=evaluate):
+        self._rng = random.Random(seed)
+        self.evaluate = evaluate
+
+    def search(self, board) -> SearchResult:
+        """
+        Evaluate every legal move of the board one ply ahead and choose the best one.
+        """
+        start_time = time.perf_counter()
+        player = board.active_player
+        best_moves, best_score = [], None
+        for move in board.legal_moves():
+            board.push(move)
+            if board.game_result is None:
+                score = -self.evaluate(board)
+            else:
+                score = WIN_SCORE if board.game_result == player else 0 if board.game_result == board.DRAW_SYMBOL else -WIN_SCORE
+            board.pop()
+
+            if best_score is None or score > best_score:
+                best_moves, best_score = [move], score
+            elif score == best_score:
+                best_moves.append(move)
+
+        number_of_moves = board.count_legal_moves()
+        return SearchResult(self._rng.choice(best_moves), best_score, 1, number_of_moves, time.perf_counter() - start_time)
+
+
+def parse_agent_spec(spec) -> tuple:
+    """
+    Split an agent spec 'name:key=value,...' into the name and the options.
+
+    Args:
+        spec (str): The agent spec.
+
+    Returns:
+        tuple: The name (str) and the options (dict of str).
+
+    Raises:
+        ValueError: If an option is not given as 'key=value'.
+
+    Usage:
+        name, options = parse_agent_spec('alphabeta:depth=3,tt=4')  # ('alphabeta', {'depth': '3', 'tt': '4'})
+    """
+    name, _, option_text = spec.partition(':')
+    options = {}
+    for option in filter(None, option_text.split(',')):
+        key, separator, value = option.partition('=')
+        if not separator:
+            raise ValueError(f"Invalid agent option '{option}' in '{spec}'. Use 'key=value'.")
+        options[key.strip()] = value.strip()
+    return name.strip(), options
+
+
+def validate_agent_spec(spec) -> tuple:
+    """
+    Check an agent spec without creating the agent (no tables are allocated and no files are opened).
+
+    Args:
+        spec (str): The agent spec.
+
+    Returns:
+        tuple: The name (str) and the options (dict), with the values converted to their types (see AGENT_OPTIONS).
+
+    Raises:
+        ValueError: If the agent or one of its options is unknown, or an option value is not a number where one is expected.
+
+    Usage:
+        name, options = validate_agent_spec('alphabeta:depth=3')  # ('alphabeta', {'depth': 3})
+    """
+    name, options = parse_agent_spec(spec)
+    if name not in AGENT_OPTIONS:
+        raise ValueError(f"Unknown agent '{name}'. Choose one of: {', '.join(AGENT_OPTIONS)}.")
+    unknown_options = sorted(set(options) - set(AGENT_OPTIONS[name]))
+    if unknown_options:
+        raise ValueError(f"Unknown options of agent '{name}': {', '.join(unknown_options)}.")
+
+    converted_options = {}
+    for key, value in options.items():
+        try:
+            converted_options[key] = AGENT_OPTIONS[name][key](value)
+        except ValueError:
+            raise ValueError(f"Invalid value '{value}' of option '{key}' in '{spec}'.") from None
+    return name, converted_options
+
+
+def create_agent(spec, seed=None):
+    """
+    Create an agent from its spec (see the module documentation).
+
+    Args:
+        spec (str): The agent spec.
+        seed (int): The seed of the agent's random number generator, if it has one.
+
+    Returns:
+        The agent, with a method 'search(board)' returning a result with the attribute 'best_move'.
+
+    Raises:
+        ValueError: If the spec is invalid (see 'validate_agent_spec').
+
+    Usage:
+        agent = create_agent('alphabeta:depth=3')
+    """
+    name, options = validate_agent_spec(spec)
+
+    if name == 'random':
+        return RandomAgent(seed)
+    if name == 'greedy':
+        return GreedyAgent(seed)
+
+    if name == 'alphabeta':
+        from src.transposition import TranspositionTable
+
+        # Without a depth or node budget, the search is limited by time (100 ms by default).
+        default_time = None if 'depth' in options or 'nodes' in options else 0.1
+        agent = AlphaBetaEngine(time_limit=options.get('time', default_time), node_limit=options.get('nodes'),
+                                max_depth=options.get('depth', 81),
+                                transposition_table=TranspositionTable(size_mb=options.get('tt', 1)))
+        if 'book' in options:
+            from src.book import BookEngine, OpeningBook
+            agent = BookEngine(OpeningBook(options['book']), agent)
+        if 'tb' in options:
+            from src.tablebase import Tablebase, TablebaseEngine
+            agent = TablebaseEngine(Tablebase(options['tb']), agent)
+        return agent
+
+    from src.mcts import MCTSEngine
+    default_time = None if 'playouts' in options else 0.1
+    return MCTSEngine(playout_limit=options.get('playouts'), time_limit=options.get('time', default_time), seed=seed)
+
+
+def play_game(spec_x, spec_o, seed, opening_plies=2) -> dict:
+    """
+    Play one game between two agents.
+
+    Args:
+        spec_x (str): The spec of the agent playing X.
+        spec_o (str): The spec of the agent playing O.
+        seed (int): The seed of the random opening moves and of the agents.
+        opening_plies (int): The number of random moves played before the agents take over.
+
+    Returns:
+        dict: The game record with the fields RECORD_FIELDS ('game' and 'pairing' are None), times in seconds.
+
+    Usage:
+        record = play_game('greedy', 'alphabeta:depth=2', seed=1)
+    """
+    rng = random.Random(seed)
+    agents = {TicTacToe_Board_2_layers.PLAYER_X: create_agent(spec_x, rng.getrandbits(32)),
+              TicTacToe_Board_2_layers.PLAYER_O: create_agent(spec_o, rng.getrandbits(32))}
+    move_counts = dict.fromkeys(agents, 0)
+    search_times = dict.fromkeys(agents, 0.0)
+    nodes = dict.fromkeys(agents, 0)
+
+    board = TicTacToe_Board_2_layers()
+    while board.game_result is None and len(board.game_record()) < opening_plies:
+        board.push(rng.choice(board.legal_moves()))
+
+    while board.game_result is None:
+        player = board.active_player
+        start_time = time.perf_counter()
+        search_result = agents[player].search(board)
+        search_times[player] += time.perf_counter() - start_time
+        move_counts[player] += 1
+        nodes[player] += getattr(search_result, 'nodes', getattr(search_result, 'playouts', 0))
+        board.push(search_result.best_move)
+
+    for agent in agents.values():
+        if hasattr(agent, 'close'):
+            agent.close()
+
+    player_x, player_o = TicTacToe_Board_2_layers.PLAYER_X, TicTacToe_Board_2_layers.PLAYER_O
+    return {'game': None, 'pairing': None, 'x': spec_x, 'o': spec_o, 'seed': seed, 'result': board.game_result,
+            'plies': len(board.game_record()), 'x_moves': move_counts[player_x], 'o_moves': move_counts[player_o],
+            'x_time': search_times[player_x], 'o_time': search_times[player_o],
+            'x_nodes': nodes[player_x], 'o_nodes': nodes[player_o], 'moves': board.to_notation()}
+
+
+def _play_scheduled_game(task) -> dict:
+    """
+    Play a game of the schedule (in a worker process) and number its record with the game and pairing index.
+    """
+    game_index, spec_x, spec_o, seed, opening_plies, pairing_index = task
+    record = play_game(spec_x, spec_o, seed, opening_plies)
+    record['game'], record['pairing'] = game_index, pairing_index
+    return record
+
+
+def schedule_games(agent_specs, games_per_pairing, seed=1, opening_plies=2) -> list:
+    """
+    Schedule the games of a round robin: every pair of agents plays the given number of games, alternating colors.
+
+    Both games of a color-swapped pair get the same seed, so they start with the same random opening.
+
+    Args:
+        agent_specs (list): The specs of the agents.
+        games_per_pairing (int): The number of games of each pair of agents.
+        seed (int): The seed of the tournament.
+        opening_plies (int): The number of random opening moves per game.
+
+    Returns:
+        list: The games as tuples (game index, spec of X, spec of O, seed, opening plies, pairing index).
+    """
+    tasks = []
+    for pairing_index, (spec_a, spec_b) in enumerate(itertools.combinations(agent_specs, 2)):
+        for game in range(games_per_pairing):
+            spec_x, spec_o = (spec_a, spec_b) if game % 2 == 0 else (spec_b, spec_a)
+            game_seed = random.Random(f"{seed}/{pairing_index}/{game // 2}").getrandbits(32)
+            tasks.append((len(tasks), spec_x, spec_o, game_seed, opening_plies, pairing_index))
+    return tasks
+
+
+def play_tournament(agent_specs, games_per_pairing, workers=1, seed=1, opening_plies=2):
+    """
+    Play a round robin tournament (see 'schedule_games'), yielding the game records as the games finish.
+
+    Args:
+        agent_specs (list): The specs of the agents, at least two and all different.
+        games_per_pairing (int): The number of games of each pair of agents.
+        workers (int): The number of processes playing games, 1 to play in this process.
+        seed (int): The seed of the tournament.
+        opening_plies (int): The number of random opening moves per game.
+
+    Returns:
+        generator: The record of each game (see 'play_game'), as soon as it is finished. With several workers,
+                   the records come in the order the games finish; 'game' and 'pairing' give their place in the schedule.
+
+    Raises:
+        ValueError: If there are fewer than two agents, duplicate agents or an invalid agent spec.
+
+    Usage:
+        for record in play_tournament(['random', 'greedy'], 100, workers=8):
+            ...
+    """
+    if len(agent_specs) < 2 or len(set(agent_specs)) != len(agent_specs):
+        raise ValueError("A tournament needs at least two different agents.")
+    for spec in agent_specs:
+        validate_agent_spec(spec)
+
+    return _play_games(schedule_games(agent_specs, games_per_pairing, seed, opening_plies), workers)
+
+
+def _play_games(tasks, workers):
+    """
+    Play the scheduled games in this process or in a process pool and yield each record as soon as its game ends.
+    """
+    if workers <= 1:
+        yield from map(_play_scheduled_game, tasks)
+        return
+
+    # A slow game does not hold back the games finished after it (unlike 'executor.map').
+    # If the caller stops early (e.g., Ctrl-C or closing the generator), the queued games are cancelled
+    # instead of being played by the shutdown of the pool.
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_play_scheduled_game, task) for task in tasks]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def elo_difference(wins, draws, losses) -> tuple:
+    """
+    Estimate the Elo difference of an agent to its opponent from its game results.
+
+    The confidence interval is the 95 % interval of the average score (normal approximation), converted to Elo.
+
+    Args:
+        wins (int): The number of games won.
+        draws (int): The number of draws.
+        losses (int): The number of games lost.
+
+    Returns:
+        tuple: The Elo difference and the lower and upper bound of its 95 % confidence interval. Infinite if
+               every game was won or lost.
+
+    Usage:
+        elo, elo_low, elo_high = elo_difference(60, 20, 20)
+    """
+    def score_to_elo(score):
+        if score <= 0:
+            return -math.inf
+        if score >= 1:
+            return math.inf
+        return 400 * math.log10(score / (1 - score))
+
+    number_of_games = wins + draws + losses
+    if number_of_games == 0:
+        return 0.0, -math.inf, math.inf
+
+    score = (wins + 0.5 * draws) / number_of_games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / number_of_games
+    margin = 1.96 * math.sqrt(variance / number_of_games)
+    return score_to_elo(score), score_to_elo(score - margin), score_to_elo(score + margin)
+
+
+def summarize(records) -> dict:
+    """
+    Compute the standings of a tournament from its game records.
+
+    Args:
+        records: The game records (see 'play_game').
+
+    Returns:
+        dict: 'agents' maps each agent spec to its 'games', 'wins', 'draws', 'losses', 'latency' (average seconds
+              per move) and 'nodes_per_second'. 'pairings' maps each pair of agent specs (a, b) to the 'wins',
+              'draws' and 'losses' of a and the 'elo' difference of a to b with its 'elo_low' and 'elo_high' bounds.
+
+    Usage:
+        standings = summarize(play_tournament(['random', 'greedy'], 100))
+    """
+    agents = {}
+    color_results = {}
+    first_games = {}
+    for record in records:
+        score_x = GAME_SCORES[record['result']]
+        for side, spec, score in (('x', record['x'], score_x), ('o', record['o'], 1 - score_x)):
+            agent = agents.setdefault(spec, {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'moves': 0, 'time': 0.0, 'nodes': 0})
+            agent['games'] += 1
+            agent['wins' if score == 1 else 'draws' if score == 0.5 else 'losses'] += 1
+            agent['moves'] += record[f'{side}_moves']
+            agent['time'] += record[f'{side}_time']
+            agent['nodes'] += record[f'{side}_nodes']
+
+        # Wins, draws and losses of X by colors, and the first game of the schedule of each pair of agents.
+        results = color_results.setdefault((record['x'], record['o']), [0, 0, 0])
+        results[0 if score_x == 1 else 1 if score_x == 0.5 else 2] += 1
+        game_index = math.inf if record['game'] is None else record['game']
+        pair = frozenset((record['x'], record['o']))
+        if pair not in first_games or game_index < first_games[pair][0]:
+            first_games[pair] = (game_index, (record['x'], record['o']))
+
+    for agent in agents.values():
+        agent['latency'] = agent['time'] / agent['moves'] if agent['moves'] else 0.0
+        agent['nodes_per_second'] = agent['nodes'] / agent['time'] if agent['time'] > 0 else 0.0
+        for key in ('moves', 'time', 'nodes'):
+            del agent[key]
+
+    # Results of a pairing are counted for the agent playing X in its first game of the schedule, so they do not
+    # depend on the order in which the games finished.
+    pairings = {}
+    for _, (spec_a, spec_b) in sorted(first_games.values()):
+        wins_a, draws_a, losses_a = color_results.get((spec_a, spec_b), (0, 0, 0))
+        wins_b, draws_b, losses_b = color_results.get((spec_b, spec_a), (0, 0, 0))
+        results = pairings[(spec_a, spec_b)] = {'wins': wins_a + losses_b, 'draws': draws_a + draws_b, 'losses': losses_a + wins_b}
+        results['elo'], results['elo_low'], results['elo_high'] = elo_difference(results['wins'], results['draws'], results['losses'])
+    return {'agents': agents, 'pairings': pairings}
+
+
+class ResultWriter:
+    """
+    Appends game records to a CSV or JSONL file, one line per game, flushed as soon as the game is written.
+
+    Attributes:
+        path (str): The path of the file, ending in '.csv' or '.jsonl'.
+    """
+
+    def __init__(self, path):
+        """
+        Create the result file.
+
+        Args:
+            path (str): The path of the file (overwritten if it exists).
+
+        Raises:
+            ValueError: If the file extension is neither '.csv' nor '.jsonl'.
+
+        Usage:
+            writer = ResultWriter('results.csv')
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in ('.csv', '.jsonl'):
+            raise ValueError(f"Invalid result file '{path}'. Use the extension '.csv' or '.jsonl'.")
+
+        self.path = path
+        self._file = open(path, 'w', newline='')
+        self._csv_writer = None
+        if extension == '.csv':
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS)
+            self._csv_writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
+
+    def write(self, record):
+        """
+        Append a game record.
+
+        Args:
+            record (dict): The game record (see 'play_game').
+        """
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(record)
+        else:
+            self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Play a round robin tournament between agents.")
+    argument_parser.add_argument("agents", nargs='+', help="Agent specs, e.g. random, greedy, alphabeta:depth=3, mcts:playouts=500.")
+    argument_parser.add_argument("--games", type=int, default=100, help="Number of games per pair of agents.")
+    argument_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of processes playing games.")
+    argument_parser.add_argument("--seed", type=int, default=1, help="Seed of the openings and agents.")
+    argument_parser.add_argument("--opening-plies", type=int, default=2, help="Random moves at the start of each game.")
+    argument_parser.add_argument("--output", help="Stream the game records to this .csv or .jsonl file.")
+    arguments = argument_parser.parse_args()
+
+    start_time = time.perf_counter()
+    game_records = []
+    result_writer = ResultWriter(arguments.output) if arguments.output else None
+    try:
+        for game_record in play_tournament(arguments.agents, arguments.games, arguments.workers, arguments.seed, arguments.opening_plies):
+            game_records.append(game_record)
+            if result_writer is not None:
+                result_writer.write(game_record)
+    finally:
+        if result_writer is not None:
+            result_writer.close()
+    elapsed = time.perf_counter() - start_time
+
+    standings = summarize(game_records)
+    print(f"{len(game_records)} games in {elapsed:.1f} s ({len(game_records) / max(elapsed, 1e-9):.1f} games/s)\n")
+    print(f"{'Agent':<32} {'Games':>6} {'Wins':>6} {'Draws':>6} {'Losses':>6} {'ms/move':>9} {'nodes/s':>12}")
+    for agent_spec, agent_standing in standings['agents'].items():
+        print(f"{agent_spec:<32} {agent_standing['games']:>6} {agent_standing['wins']:>6} {agent_standing['draws']:>6} "
+              f"{agent_standing['losses']:>6} {1000 * agent_standing['latency']:>9.2f} {agent_standing['nodes_per_second']:>12,.0f}")
+    print()
+    for (spec_a, spec_b), pairing_results in standings['pairings'].items():
+        print(f"{spec_a} vs. {spec_b}: +{pairing_results['wins']} ={pairing_results['draws']} -{pairing_results['losses']}, "
+              f"Elo {pairing_results['elo']:+.0f} [{pairing_results['elo_low']:+.0f}, {pairing_results['elo_high']:+.0f}]")
@@ -0,0 +1,152 @@
+"""
+Bounded transposition table for searches on the 2-layered-TicTacToe board.
+
+The table stores search results keyed by the Zobrist hash of a position (see
+`TicTacToe_Board_2_layers.zobrist_hash`), so that a search reaching the same position through a
+different move order reuses the result instead of searching the position again.
+
+Its size is fixed when it is created and given as a memory cap in MB. Entries live in two preallocated
+arrays of 64-bit integers (key and packed data), 16 bytes per entry. The entries are grouped in buckets of two:
+
+    - The depth-preferred slot keeps the entry searched to the greatest depth.
+    - The always-replace slot takes every entry that does not replace the depth-preferred one.
+
+Usage:
+    transposition_table = TranspositionTable(size_mb=16)
+    transposition_table.store(board.zobrist_hash, depth, score, TranspositionTable.EXACT, best_move)
+    entry = transposition_table.probe(board.zobrist_hash)
+"""
+
+from array import array
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results with depth-preferred / always-replace buckets.
+
+    Attributes:
+        EXACT (int): Flag of an exact score.
+        LOWER_BOUND (int): Flag of a score that is a lower bound (the search failed high).
+        UPPER_BOUND (int): Flag of a score that is an upper bound (the search failed low).
+        ENTRY_SIZE (int): Memory of one entry in bytes.
+        number_of_buckets (int): Number of buckets of two entries, a power of two.
+        probes (int): Number of calls of 'probe'.
+        hits (int): Number of calls of 'probe' that found the position.
+    """
+
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    ENTRY_SIZE = 16
+
+    # Layout of the packed data: score (offset to be positive) | depth (8 bits) | flag (2 bits) | move (7 bits).
+    _SCORE_OFFSET = 1 << 32
+    _NO_MOVE = 127
+
+    def __init__(self, size_mb=16):
+        """
+        Initialize an empty table.
+
+        Args:
+            size_mb (float): Memory cap of the table in MB. The number of buckets is rounded down to a power of two.
+
+        Raises:
+            ValueError: If the memory cap is too small for a single bucket.
+
+        Usage:
+            transposition_table = TranspositionTable(size_mb=16)
+        """
+        number_of_buckets = int(size_mb * 1024 * 1024) // (2 * self.ENTRY_SIZE)
+        if number_of_buckets < 1:
+            raise ValueError("Invalid size. The table needs room for at least one bucket.")
+
+        # Round down to a power of two, so that a bucket is selected with a bit mask.
+        self.number_of_buckets = 1 << (number_of_buckets.bit_length() - 1)
+        self._bucket_mask = self.number_of_buckets - 1
+
+        self._keys = array('Q', bytes(16 * self.number_of_buckets))
+        self._data = array('Q', bytes(16 * self.number_of_buckets))
+
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        The memory used by the entries in bytes.
+        """
+        return 2 * self.number_of_buckets * self.ENTRY_SIZE
+
+    def clear(self):
+        """
+        Remove every entry and reset the statistics.
+
+        Usage:
+            transposition_table.clear()
+        """
+        self._keys = array('Q', bytes(16 * self.number_of_buckets))
+        self._data = array('Q', bytes(16 * self.number_of_buckets))
+        self.probes = 0
+        self.hits = 0
+
+    def store(self, key, depth, score, flag, best_move=None):
+        """
+        Store the search result of a position.
+
+        The result replaces the depth-preferred entry of its bucket if that entry belongs to the same position
+        or was searched less deep. Otherwise it goes into the always-replace entry.
+
+        Args:
+            key (int): The 64-bit Zobrist hash of the position.
+            depth (int): The depth (0-255) the position was searched to.
+            score (int): The score of the position.
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+            best_move (int): The best move (0-80) found, None if there is none.
+
+        Usage:
+            transposition_table.store(key, 4, 12, TranspositionTable.LOWER_BOUND, 40)
+        """
+        data = (((score + self._SCORE_OFFSET) << 17) | (depth << 9) | (flag << 7)
+                | (self._NO_MOVE if best_move is None else best_move))
+
+        slot = 2 * (key & self._bucket_mask)
+        keys = self._keys
+        stored_data = self._data[slot]
+        if keys[slot] == key or not stored_data or depth >= (stored_data >> 9) & 0xFF:
+            keys[slot] = key
+            self._data[slot] = data
+        else:
+            keys[slot + 1] = key
+            self._data[slot + 1] = data
+
+    def probe(self, key) -> tuple:
+        """
+        Look up the search result of a position.
+
+        Args:
+            key (int): The 64-bit Zobrist hash of the position.
+
+        Returns:
+            tuple: (depth, score, flag, best_move) of the stored result, or None if the position is not stored.
+
+        Usage:
+            entry = transposition_table.probe(key)
+        """
+        self.probes += 1
+        slot = 2 * (key & self._bucket_mask)
+        keys = self._keys
+        if keys[slot] != key:
+            slot += 1
+            if keys[slot] != key:
+                return None
+
+        # An empty entry has no data, which matters only for the key 0.
+        data = self._data[slot]
+        if not data:
+            return None
+
+        self.hits += 1
+        move = data & 0x7F
+        return ((data >> 9) & 0xFF, (data >> 17) - self._SCORE_OFFSET, (data >> 7) & 0x3,
+                None if move == self._NO_MOVE else move)
@@ -0,0 +1,40 @@
+import pytest
+from src.board import TicTacToe_Board_2_layers
+
+np = pytest.importorskip("numpy")
+from src.batch import BatchBoard, NO_MOVE, RESULT_SYMBOLS
+
+def test_batch_board_agrees_with_board():
+    number_of_games = 200
+    batch_board = BatchBoard(number_of_games)
+    boards = [TicTacToe_Board_2_layers() for _ in range(number_of_games)]
+    rng = np.random.default_rng(7)
+    while not batch_board.is_game_over().all():
+        legal_mask = batch_board.legal_mask()
+        for game, board in enumerate(boards):
+            expected_mask = board.legal_moves_mask() if board.game_result is None else 0
+            assert legal_mask[game].tolist() == [bool(expected_mask >> move & 1) for move in range(81)]
+        moves = batch_board.random_legal_moves(rng)
+        batch_board.apply(moves)
+        for board, move in zip(boards, moves.tolist()):
+            if move != NO_MOVE:
+                board.push(move)
+    assert [RESULT_SYMBOLS[result] for result in batch_board.result] == [board.game_result for board in boards]
+    assert batch_board.move_count.tolist() == [len(board._move_stack) for board in boards]
+
+def test_apply_rejects_illegal_moves():
+    batch_board = BatchBoard(2)
+    batch_board.apply(np.array([40, 0]))
+    with pytest.raises(ValueError, match="Illegal move."):
+        batch_board.apply(np.array([0, 1]))  # Game 0 is forced to the inner field 'mid-mid'.
+    with pytest.raises(ValueError, match="Illegal move."):
+        batch_board.apply(np.array([36, 0]))  # Cell 0 of game 1 is taken.
+
+def test_reset_starts_finished_games_again():
+    batch_board = BatchBoard(20)
+    rng = np.random.default_rng(1)
+    while not batch_board.is_game_over().all():
+        batch_board.apply(batch_board.random_legal_moves(rng))
+    assert batch_board.reset().tolist() == list(range(20))
+    assert not batch_board.is_game_over().any()
+    assert batch_board.count_legal_moves().tolist() == [81] * 20
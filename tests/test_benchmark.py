@@ -0,0 +1,11 @@
+from src.benchmark import compare_benchmarks, run_benchmarks
+
+def test_benchmarks_report_operations_per_second():
+    results = run_benchmarks(number_of_games=2, repeat=1)
+    assert list(results) == ['make_move', 'push', 'pop', 'legal_moves', 'win_checks']
+    assert all(rate > 0 for rate in results.values())
+
+def test_compare_benchmarks_flags_slowdowns_beyond_tolerance():
+    baseline = {'push': 1000.0, 'pop': 1000.0, 'legal_moves': 1000.0}
+    results = {'push': 950.0, 'pop': 850.0, 'legal_moves': 2000.0}
+    assert compare_benchmarks(results, baseline, tolerance=0.1) == ['pop']
@@ -1,4 +1,5 @@
 import pytest
+import src.board as board
 
 def test_initial_state(new_board):
     assert new_board.active_player == 'X'
@@ -26,10 +27,10 @@ def test_non_empty_cell_raises_error(new_board):
     with pytest.raises(ValueError, match="Selected cell is not empty. Choose an empty cell for the move."):
         new_board.make_move('O', 'top-left', 1, 1)
 
-@pytest.mark.parametrize("outer_field, moves, expected_winner", [('top-left', [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (2, 2)], 'X'), ('bottom-right', [(2, 2), (1, 2), (2, 1), (1, 1), (2, 0)], 'O'),])
+@pytest.mark.parametrize("outer_field, moves, expected_winner", [('top-left', [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)], 'X'), ('bottom-right', [(2, 2), (1, 2), (2, 1), (1, 1), (2, 0)], 'O'),])
 def test_check_for_win_inner_field(new_board, outer_field, moves, expected_winner):
     for move in moves:
-        new_board.make_move('X' if len(moves) % 2 == 0 else 'O', outer_field, move[0], move[1])
+        new_board.make_move(expected_winner, outer_field, move[0], move[1])
     assert new_board.check_for_win_inner_field(outer_field) == expected_winner
 
 def test_check_for_win_outer_field(new_board):
@@ -61,3 +62,176 @@ def test_check_for_draw_outer_field(new_board):
     new_board.mark_outer_cell_as_won('X', 'bottom-mid')
     new_board.mark_outer_cell_as_won('O', 'bottom-right')
     assert new_board.check_for_draw_outer_field()
+
+def test_board_status_view_reflects_moves_and_results(new_board):
+    new_board.make_move('X', 'mid-mid', 0, 2)
+    new_board.make_move('O', 'mid-mid', 2, 0)
+    new_board.mark_outer_cell_as_won('O', 'top-left')
+    new_board.mark_outer_field_as_draw('bottom-right')
+    status = new_board.board_status
+    assert status['mid-mid'] == [['', '', 'X'], ['', '', ''], ['O', '', '']]
+    assert status['top-left'] == 'O'
+    assert status['bottom-right'] == 'D'
+    assert status['top-mid'] == [['', '', ''], ['', '', ''], ['', '', '']]
+
+def test_moves_in_decided_inner_field_are_rejected(new_board):
+    new_board.mark_outer_cell_as_won('X', 'top-left')
+    assert not new_board.is_cell_of_inner_field_empty('top-left', 0, 0)
+    with pytest.raises(ValueError, match="Selected cell is not empty."):
+        new_board.make_move('O', 'top-left', 0, 0)
+
+def test_inner_outcome_table_covers_win_draw_and_open():
+    assert board.WINNING_LINES_TABLE[0b000000111] == 0b00000001
+    assert board.WINNING_LINES_TABLE[0b111111111] == 0b11111111
+    assert board.WINNING_LINES_TABLE[0b000010011] == 0
+    index = lambda mask_x, mask_o: board.TERNARY_INDEX_TABLE[mask_x] + 2 * board.TERNARY_INDEX_TABLE[mask_o]
+    assert board.INNER_OUTCOME_TABLE[index(0b100010001, 0b000001010)] == 'X'
+    assert board.INNER_OUTCOME_TABLE[index(0b000001011, 0b001010100)] == 'O'
+    assert board.INNER_OUTCOME_TABLE[index(0b011100101, 0b100011010)] == 'D'
+    assert board.INNER_OUTCOME_TABLE[index(0b000000001, 0b000000010)] is None
+
+def test_make_move_resolves_inner_field_and_hands_over(new_board):
+    for col in range(2):
+        new_board.make_move('X', 'mid-mid', 0, col)
+        new_board.make_move('O', 'top-mid', 1, col)
+    new_board.make_move('X', 'mid-mid', 0, 2)
+    assert new_board.board_status['mid-mid'] == 'X'
+    assert new_board.active_player == 'O'
+    assert new_board.where_to_play_next == 'top-right'
+    assert not new_board.is_game_over()
+    with pytest.raises(ValueError, match="Selected cell is not empty."):
+        new_board.make_move('O', 'mid-mid', 2, 2)
+
+def test_move_into_decided_inner_field_allows_free_choice(new_board):
+    new_board.mark_outer_field_as_draw('mid-mid')
+    new_board.make_move('X', 'top-left', 1, 1)
+    assert new_board.where_to_play_next is None
+
+def test_make_move_ends_game_on_outer_win(new_board):
+    new_board.mark_outer_cell_as_won('O', 'top-left')
+    new_board.mark_outer_cell_as_won('O', 'top-mid')
+    for row, col in [(0, 0), (1, 1)]:
+        new_board.make_move('O', 'top-right', row, col)
+    new_board.make_move('O', 'top-right', 2, 2)
+    assert new_board.game_result == 'O' and new_board.is_game_over()
+    assert new_board.check_for_win_outer_field() == 'O'
+    with pytest.raises(ValueError, match="The game is already over."):
+        new_board.make_move('X', 'bottom-left', 0, 0)
+
+def _snapshot(game_board):
+    return (game_board.board_status, game_board.where_to_play_next, game_board.active_player, game_board.game_result)
+
+def test_push_and_pop_restore_the_board_exactly(new_board):
+    import random
+    rng = random.Random(7)
+    snapshots = []
+    while not new_board.is_game_over():
+        moves = [move for move in range(81) if new_board.where_to_play_next in (None, new_board.OUTER_FIELD_POSITIONS[move // 9])
+                 and new_board.is_cell_of_inner_field_empty(new_board.OUTER_FIELD_POSITIONS[move // 9], move % 9 // 3, move % 3)]
+        snapshots.append(_snapshot(new_board))
+        new_board.push(rng.choice(moves))
+    while snapshots:
+        new_board.pop()
+        assert _snapshot(new_board) == snapshots.pop()
+    with pytest.raises(ValueError, match="No move to undo."):
+        new_board.pop()
+
+def test_push_rejects_moves_outside_the_forced_inner_field(new_board):
+    new_board.push(4)
+    with pytest.raises(ValueError, match="Illegal move."):
+        new_board.push(0)
+    new_board.push(36)
+    assert new_board.board_status['mid-mid'][0][0] == 'O'
+
+def test_legal_moves_at_start_and_in_forced_inner_field(new_board):
+    assert new_board.legal_moves() == list(range(81))
+    new_board.make_move('X', 'mid-mid', 0, 2)
+    assert new_board.legal_moves() == list(range(18, 27))
+    assert new_board.count_legal_moves() == 9
+
+def test_legal_moves_after_sending_to_decided_inner_field(new_board):
+    new_board.mark_outer_cell_as_won('O', 'top-left')
+    new_board.make_move('X', 'mid-mid', 0, 0)
+    assert new_board.where_to_play_next is None
+    assert new_board.legal_moves() == [move for move in range(9, 81) if move != 36]
+    assert new_board.count_legal_moves() == 71
+    assert not new_board.is_legal_move(3) and not new_board.is_legal_move(81)
+
+def test_zobrist_hash_is_equal_for_transpositions(new_board):
+    other_board = board.TicTacToe_Board_2_layers()
+    for player, outer_field in [('X', 'top-left'), ('O', 'mid-left'), ('X', 'top-mid')]:
+        new_board.make_move(player, outer_field, 1, 1)
+    for player, outer_field in [('X', 'top-mid'), ('O', 'mid-left'), ('X', 'top-left')]:
+        other_board.make_move(player, outer_field, 1, 1)
+    assert new_board.zobrist_hash == other_board.zobrist_hash
+    other_board.where_to_play_next = None
+    assert new_board.zobrist_hash != other_board.zobrist_hash
+    assert new_board.zobrist_hash != board.TicTacToe_Board_2_layers().zobrist_hash
+
+def test_zobrist_hash_is_restored_by_pop_and_covers_results(new_board):
+    start_hash = new_board.zobrist_hash
+    new_board.push(40)
+    assert new_board.zobrist_hash != start_hash
+    new_board.pop()
+    assert new_board.zobrist_hash == start_hash
+    new_board.mark_outer_cell_as_won('X', 'top-left')
+    won_hash = new_board.zobrist_hash
+    new_board.mark_outer_field_as_draw('top-left')
+    assert new_board.zobrist_hash not in (start_hash, won_hash)
+    new_board.active_player = 'O'
+    assert new_board.zobrist_hash != won_hash
+
+def test_position_bytes_round_trip_through_a_game(new_board):
+    import random
+    rng = random.Random(11)
+    while not new_board.is_game_over():
+        data = new_board.to_bytes()
+        assert len(data) == board.POSITION_SIZE
+        decoded_board = board.TicTacToe_Board_2_layers.from_bytes(data)
+        assert decoded_board.bitboards() == new_board.bitboards()
+        assert _snapshot(decoded_board) == _snapshot(new_board)
+        assert decoded_board.zobrist_hash == new_board.zobrist_hash
+        assert decoded_board.to_bytes() == data
+        new_board.push(rng.choice(new_board.legal_moves()))
+    assert board.TicTacToe_Board_2_layers.from_bytes(new_board.position_key()).game_result == new_board.game_result
+
+def test_from_bytes_rejects_invalid_data():
+    with pytest.raises(ValueError, match="Invalid position."):
+        board.TicTacToe_Board_2_layers.from_bytes(b'\x00' * 5)
+    with pytest.raises(ValueError, match="Invalid position."):
+        board.TicTacToe_Board_2_layers.from_bytes(b'\xff' * board.POSITION_SIZE)
+
+def test_game_record_and_notation_replay_the_game(new_board):
+    for move in [40, 36, 0, 4]:
+        new_board.push(move)
+    assert new_board.game_record() == bytes([40, 36, 0, 4])
+    assert new_board.to_notation() == 'e5 d4 a1 b2'
+    for replayed_board in [board.TicTacToe_Board_2_layers.from_game_record(new_board.game_record()),
+                           board.TicTacToe_Board_2_layers.from_notation(new_board.to_notation())]:
+        assert replayed_board.to_bytes() == new_board.to_bytes()
+        assert replayed_board.pop() == 4
+    assert [new_board.notation_to_move(new_board.move_to_notation(move)) for move in range(81)] == list(range(81))
+    with pytest.raises(ValueError, match="Invalid move notation 'j1'."):
+        new_board.notation_to_move('j1')
+
+def test_symmetric_positions_share_the_canonical_position():
+    from src.perft import PERFT_POSITIONS, perft
+    game_board = board.TicTacToe_Board_2_layers.from_notation(PERFT_POSITIONS['free-choice'])
+    canonical_key, symmetry = game_board.canonical_key()
+    assert canonical_key <= game_board.position_key()
+    for other_symmetry in range(8):
+        transformed_board = game_board.transform(other_symmetry)
+        assert transformed_board.canonical_key()[0] == canonical_key
+        assert sorted(game_board.transform_move(move, other_symmetry) for move in game_board.legal_moves()) == transformed_board.legal_moves()
+        assert perft(transformed_board, 2) == perft(game_board, 2)
+        assert transformed_board.transform(board.SYMMETRY_INVERSES[other_symmetry]).to_bytes() == game_board.to_bytes()
+    canonical_board, symmetry = game_board.canonical()
+    assert canonical_board.position_key() == canonical_key
+    assert canonical_board.to_bytes() == game_board.transform(symmetry).to_bytes()
+
+def test_canonical_move_maps_back_to_the_board(new_board):
+    new_board.push(80)  # 'bottom-right' (2, 2), sending O to 'bottom-right'.
+    canonical_board, symmetry = new_board.canonical()
+    assert symmetry == 2 and canonical_board.to_notation() == '' and canonical_board.where_to_play_next == 'top-left'
+    canonical_move = canonical_board.legal_moves()[0]
+    assert new_board.is_legal_move(new_board.transform_move(canonical_move, board.SYMMETRY_INVERSES[symmetry]))
@@ -0,0 +1,38 @@
+import pytest
+from src.board import TicTacToe_Board_2_layers
+from src.book import BookEngine, OpeningBook, build_book
+from src.engine import AlphaBetaEngine
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = tmp_path / 'opening.tttbook'
+    assert build_book(path, plies=3, engine=AlphaBetaEngine(time_limit=None, max_depth=2)) == 1 + 15 + 102
+    return path
+
+def test_lookup_finds_symmetric_positions(book_path):
+    with OpeningBook(book_path) as opening_book:
+        assert len(opening_book) == 118 and opening_book.plies == 3
+        board = TicTacToe_Board_2_layers.from_notation('a1 b2')
+        move, score, depth = opening_book.lookup(board)
+        assert board.is_legal_move(move) and depth == 2
+
+        # The same entry, mapped to each orientation of the position.
+        for symmetry in range(8):
+            twin = board.transform(symmetry)
+            twin_move, twin_score, _ = opening_book.lookup(twin)
+            assert twin_move == twin.transform_move(move, symmetry) and twin_score == score
+
+def test_positions_outside_the_book_are_searched(book_path):
+    with OpeningBook(book_path) as opening_book:
+        board = TicTacToe_Board_2_layers.from_notation('e5 e4 e2')
+        assert opening_book.lookup(board) is None
+
+        engine = BookEngine(opening_book, AlphaBetaEngine(time_limit=None, max_depth=2))
+        assert engine.search(TicTacToe_Board_2_layers()).nodes == 0
+        assert engine.search(board).nodes > 0
+
+def test_invalid_book_is_rejected(tmp_path):
+    path = tmp_path / 'games.tttlog'
+    path.write_bytes(b'TTT2LOG1')
+    with pytest.raises(ValueError):
+        OpeningBook(path)
@@ -0,0 +1,37 @@
+import pytest
+from src.engine import AlphaBetaEngine, WIN_SCORE, evaluate
+
+def test_search_returns_legal_move_and_leaves_board_unchanged(new_board):
+    new_board.push(40)
+    status_before = new_board.board_status
+    result = AlphaBetaEngine(time_limit=None, max_depth=3).search(new_board)
+    assert new_board.is_legal_move(result.best_move)
+    assert result.depth == 3 and result.nodes > 0 and result.nodes_per_second > 0
+    assert new_board.board_status == status_before and new_board.active_player == 'O'
+
+def test_search_finds_winning_move(new_board):
+    new_board.mark_outer_cell_as_won('O', 'top-left')
+    new_board.mark_outer_cell_as_won('O', 'top-mid')
+    new_board.make_move('O', 'top-right', 0, 0)
+    new_board.make_move('O', 'top-right', 1, 1)
+    new_board.make_move('X', 'mid-mid', 0, 2)
+    result = AlphaBetaEngine(time_limit=1.0).search(new_board)
+    assert result.best_move == 26
+    assert result.score >= WIN_SCORE - 81
+
+def test_search_respects_node_limit(new_board):
+    result = AlphaBetaEngine(time_limit=None, node_limit=500).search(new_board)
+    assert result.nodes <= 500
+    assert new_board.is_legal_move(result.best_move)
+
+def test_search_raises_when_game_is_over(new_board):
+    for pos_outer_field in ['top-left', 'mid-mid', 'bottom-right']:
+        new_board.mark_outer_cell_as_won('X', pos_outer_field)
+    with pytest.raises(ValueError, match="The game is already over."):
+        AlphaBetaEngine().search(new_board)
+
+def test_evaluate_is_symmetric_for_the_player_to_move(new_board):
+    new_board.mark_outer_cell_as_won('X', 'mid-mid')
+    assert evaluate(new_board) > 0
+    new_board.active_player = 'O'
+    assert evaluate(new_board) < 0
@@ -0,0 +1,56 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.batch import BatchBoard
+from src.board import TicTacToe_Board_2_layers
+from src.engine import evaluate
+from src.evaluation import FEATURE_NAMES, Evaluator, extract_batch_features, extract_features, load_weights, save_weights
+from src.game import play_random_games
+
+def _random_positions(number_of_games, seed):
+    # Every position of random games before the final move.
+    return [TicTacToe_Board_2_layers.from_game_record(board.game_record()[:number_of_moves])
+            for board in play_random_games(number_of_games, seed) for number_of_moves in range(len(board.game_record()))]
+
+def test_default_weights_match_the_engine_evaluation():
+    positions = _random_positions(20, seed=5)
+    assert Evaluator().evaluate_batch(positions).tolist() == [evaluate(board) for board in positions]
+    assert Evaluator()(positions[-1]) == evaluate(positions[-1])
+
+def test_tempo_features():
+    positions = _random_positions(10, seed=6)
+    features = extract_features(positions)
+    assert features[:, FEATURE_NAMES.index('mobility')].tolist() == [board.count_legal_moves() for board in positions]
+    assert features[:, FEATURE_NAMES.index('free_choice')].tolist() == [int(board.where_to_play_next is None) for board in positions]
+
+def test_batch_board_features_match_board_features():
+    rng = random.Random(7)
+    boards = [TicTacToe_Board_2_layers() for _ in range(50)]
+    batch_board = BatchBoard(50)
+    for _ in range(25):
+        moves = [rng.choice(board.legal_moves()) if not board.is_game_over() else -1 for board in boards]
+        for board, move in zip(boards, moves):
+            if move >= 0:
+                board.push(move)
+        batch_board.apply(np.array(moves))
+    assert (extract_batch_features(batch_board) == extract_features(boards)).all()
+
+def test_evaluate_moves_scores_every_child(new_board):
+    new_board.push(40)
+    evaluator = Evaluator({'mobility': 1, 'inner_threats': 5})
+    moves, scores = evaluator.evaluate_moves(new_board)
+    assert moves == new_board.legal_moves() and new_board.to_notation() == 'e5'
+    for move, score in zip(moves, scores):
+        new_board.push(move)
+        assert score == -evaluator(new_board)
+        new_board.pop()
+
+def test_weights_are_loaded_from_file(tmp_path):
+    path = tmp_path / 'weights.json'
+    save_weights(path, {'outer_threats': 150, 'mobility': 2})
+    assert Evaluator.from_file(path).weights == {name: {'outer_threats': 150, 'mobility': 2}.get(name, 0) for name in FEATURE_NAMES}
+    path.write_text('{"center_cell": 3}')
+    with pytest.raises(ValueError, match="Unknown features: center_cell."):
+        load_weights(path)
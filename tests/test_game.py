@@ -0,0 +1,60 @@
+import subprocess
+import sys
+import pytest
+from src.game import GameSession, simulate_random_games
+
+class _FirstMoveEngine:
+    def search(self, board):
+        class _Result:
+            best_move = board.legal_moves()[0]
+        return _Result()
+
+def test_play_coordinates_ignores_illegal_moves():
+    game_session = GameSession()
+    assert game_session.play_coordinates('mid-mid', 0, 0)
+    assert not game_session.play_coordinates('mid-mid', 1, 1)  # Not the forced inner field.
+    assert not game_session.play_coordinates('', 1, 1)
+    assert game_session.play_coordinates('top-left', 1, 1)
+    assert game_session.board.board_status['top-left'][1][1] == 'O'
+
+def test_decided_outer_fields_are_tracked():
+    game_session = GameSession()
+    for move in [69, 56, 19, 13, 40, 43, 63, 7, 66]:
+        assert game_session.play_move(move)
+    assert game_session.decided_outer_fields == ['bottom-mid']
+    assert game_session.board.board_status['bottom-mid'] == 'X'
+
+def test_ai_moves_only_on_its_turn():
+    game_session = GameSession({'O': _FirstMoveEngine()})
+    with pytest.raises(ValueError, match="It is not the turn of an AI player."):
+        game_session.play_ai_move()
+    game_session.play_move(40)
+    assert game_session.is_ai_turn()
+    assert game_session.play_ai_move().best_move == 36
+    assert game_session.board.active_player == 'X' and not game_session.is_ai_turn()
+
+def test_illegal_ai_moves_raise_error():
+    class _OccupiedCellEngine:
+        def search(self, board):
+            class _Result:
+                best_move = 40
+            return _Result()
+
+    game_session = GameSession({'O': _OccupiedCellEngine()})
+    game_session.play_move(40)
+    with pytest.raises(ValueError, match="Illegal AI move 40 of player O."):
+        game_session.play_ai_move()
+    assert game_session.last_search_result is None and game_session.is_ai_turn()
+
+def test_random_games_end_with_a_result():
+    results = simulate_random_games(50, seed=3)
+    assert sum(results.values()) == 50
+    game_session = GameSession()
+    while not game_session.is_game_over():
+        game_session.play_random_move()
+    game_session.reset()
+    assert game_session.board.legal_moves() == list(range(81)) and game_session.decided_outer_fields == []
+
+def test_game_session_does_not_import_pygame():
+    code = "import sys, src.game; assert 'pygame' not in sys.modules"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,49 @@
+import json
+
+from src import instrumentation
+from src.board import TicTacToe_Board_2_layers
+from src.engine import AlphaBetaEngine
+
+
+def test_enable_counts_moves_and_searches(tmp_path):
+    original_push = TicTacToe_Board_2_layers.push
+    instrumentation.enable(str(tmp_path / 'profile.json'))
+    try:
+        board = TicTacToe_Board_2_layers()
+        board.make_move('X', 'mid-mid', 1, 1)
+        AlphaBetaEngine(time_limit=None, max_depth=2).search(board)
+        timings = instrumentation.statistics()
+        assert timings['TicTacToe_Board_2_layers.make_move']['calls'] == 1
+        assert timings['AlphaBetaEngine.search']['calls'] == 1
+        assert timings['TicTacToe_Board_2_layers.push']['calls'] > 1
+
+        instrumentation.record('frame', 0.004)
+        assert instrumentation.summary_lines(['frame', 'unknown']) == ['frame: 1 calls, 4.000 ms mean, 4.00 ms max']
+
+        instrumentation.dump()
+        dumped = json.loads((tmp_path / 'profile.json').read_text())
+        assert dumped['statistics']['AlphaBetaEngine.search']['calls'] == 1
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+    # Disabled, the original methods run again and nothing is recorded.
+    assert TicTacToe_Board_2_layers.push is original_push
+    TicTacToe_Board_2_layers().push(40)
+    assert instrumentation.statistics() == {}
+
+
+def test_configure_reads_the_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv(instrumentation.ENV_PROFILE, raising=False)
+    monkeypatch.delenv(instrumentation.ENV_CPROFILE, raising=False)
+    assert not instrumentation.configure()
+
+    monkeypatch.setenv(instrumentation.ENV_CPROFILE, str(tmp_path / 'profile.prof'))
+    try:
+        assert instrumentation.configure()
+        TicTacToe_Board_2_layers().push(40)
+        instrumentation.dump()
+        assert (tmp_path / 'profile.prof').stat().st_size > 0
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
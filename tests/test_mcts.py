@@ -0,0 +1,55 @@
+import time
+import pytest
+from src.mcts import MCTSEngine, _search_in_worker
+
+def test_search_returns_legal_move_and_leaves_board_unchanged(new_board):
+    new_board.push(40)
+    status_before = new_board.board_status
+    result = MCTSEngine(playout_limit=200, time_limit=None, seed=1).search(new_board)
+    assert new_board.is_legal_move(result.best_move)
+    assert result.playouts == 200 and result.playouts_per_second > 0
+    assert new_board.board_status == status_before and new_board.active_player == 'O'
+
+def test_search_finds_winning_move(new_board):
+    new_board.mark_outer_cell_as_won('O', 'top-left')
+    new_board.mark_outer_cell_as_won('O', 'top-mid')
+    new_board.make_move('O', 'top-right', 0, 0)
+    new_board.make_move('O', 'top-right', 1, 1)
+    new_board.make_move('X', 'mid-mid', 0, 2)
+    result = MCTSEngine(playout_limit=500, time_limit=None, seed=1).search(new_board)
+    assert result.best_move == 26
+
+def test_tree_is_reused_after_move_and_reply(new_board):
+    engine = MCTSEngine(playout_limit=300, time_limit=None, seed=3)
+    new_board.push(40)
+    first_result = engine.search(new_board)
+    new_board.push(first_result.best_move)
+    new_board.push(new_board.legal_moves()[0])
+    second_result = engine.search(new_board)
+    assert second_result.reused_playouts > 0
+
+def test_root_parallel_search_sums_playouts_of_all_processes(new_board):
+    with MCTSEngine(playout_limit=100, time_limit=None, workers=2, seed=5) as engine:
+        result = engine.search(new_board)
+    assert result.playouts == 200
+    assert new_board.is_legal_move(result.best_move)
+
+def test_invalid_budget_and_workers_raise_error():
+    with pytest.raises(ValueError, match="The search needs a playout limit or a time limit."):
+        MCTSEngine(playout_limit=None, time_limit=None)
+    with pytest.raises(ValueError, match="Invalid number of workers."):
+        MCTSEngine(workers=0)
+
+def test_workers_stop_at_the_deadline_of_the_search(new_board):
+    # A worker starting after the deadline of the search does not search for another time limit.
+    assert _search_in_worker(new_board, 1.4, None, time.time() - 1, 7) == (0, {})
+
+    # The deadline has passed when the workers start, so only the one playout of the main process is played.
+    with MCTSEngine(time_limit=0, workers=3, seed=5) as engine:
+        result = engine.search(new_board)
+    assert result.playouts == 1 and new_board.is_legal_move(result.best_move)
+
+def test_search_without_time_for_a_playout_returns_legal_move(new_board):
+    new_board.push(40)
+    result = MCTSEngine(time_limit=0, seed=1).search(new_board)
+    assert result.playouts == 1 and new_board.is_legal_move(result.best_move)
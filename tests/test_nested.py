@@ -0,0 +1,65 @@
+import random
+import pytest
+from src.board import TicTacToe_Board_2_layers
+from src.nested import NestedBoard
+from src.perft import PERFT_POSITIONS, perft
+
+def test_depth_2_matches_the_2_layered_board():
+    nested_board = NestedBoard()
+    assert [perft(nested_board, depth) for depth in range(1, 4)] == [81, 720, 6336]
+    for move in TicTacToe_Board_2_layers.from_notation(PERFT_POSITIONS['free-choice']).game_record():
+        nested_board.push(move)
+    assert [perft(nested_board, depth) for depth in range(1, 4)] == [57, 552, 5246]
+
+    rng = random.Random(2)
+    for _ in range(20):
+        board, nested_board = TicTacToe_Board_2_layers(), NestedBoard()
+        while not board.is_game_over():
+            assert nested_board.legal_moves() == board.legal_moves()
+            move = rng.choice(board.legal_moves())
+            board.push(move)
+            nested_board.push(move)
+        assert nested_board.game_result == board.game_result
+
+def test_depth_3_forced_fields_and_undo():
+    board = NestedBoard(depth=3)
+    assert board.number_of_cells == 729 and board.count_legal_moves() == 729
+    board.push(9 * 9 * 4 + 9 * 2 + 7)  # Slots (4, 2, 7): the opponent plays in the smallest field (2, 7).
+    assert board.where_to_play_next == (2, 9 * 2 + 7)
+    assert board.legal_moves() == list(range(9 * 9 * 2 + 9 * 7, 9 * 9 * 2 + 9 * 7 + 9))
+
+    rng = random.Random(5)
+    while not board.is_game_over():
+        board.push(rng.choice(board.legal_moves()))
+    assert board.field_result(0, 0) == board.game_result and board.legal_moves() == []
+    while True:
+        try:
+            board.pop()
+        except ValueError:
+            break
+    assert board.count_legal_moves() == 729 and board.field_result(0, 0) is None and board.active_player == 'X'
+
+def test_plain_and_larger_fields():
+    board = NestedBoard(depth=1)
+    for move in [0, 3, 1, 4, 2]:
+        board.push(move)
+    assert board.game_result == 'X'
+    with pytest.raises(ValueError, match="The game is already over."):
+        board.push(8)
+
+    board = NestedBoard(depth=1, size=4)
+    for move in [0, 1, 5, 2, 10, 3]:
+        board.push(move)
+    assert board.game_result is None
+    board.push(15)
+    assert board.game_result == 'X'
+
+def test_invalid_boards_and_moves():
+    with pytest.raises(ValueError):
+        NestedBoard(depth=0)
+    with pytest.raises(ValueError):
+        NestedBoard(size=1)
+    board = NestedBoard()
+    board.push(40)
+    with pytest.raises(ValueError, match="Illegal move."):
+        board.push(0)
@@ -0,0 +1,25 @@
+import pytest
+from src.board import TicTacToe_Board_2_layers
+from src.perft import PERFT_POSITIONS, divide, perft
+
+# Reference leaf counts for depth 1, 2, ... of the positions in PERFT_POSITIONS.
+PERFT_REFERENCE_COUNTS = {
+    'start': [81, 720, 6336, 55080, 473256],
+    'forced-center': [7, 63, 532, 4487, 37417],
+    'free-choice': [57, 552, 5246, 48436],
+    'endgame': [3, 10, 30, 77, 120],
+}
+
+@pytest.mark.parametrize("name", PERFT_REFERENCE_COUNTS)
+def test_perft_matches_reference_counts(name):
+    board = TicTacToe_Board_2_layers.from_notation(PERFT_POSITIONS[name])
+    position = board.to_bytes()
+    assert [perft(board, depth) for depth in range(1, len(PERFT_REFERENCE_COUNTS[name]) + 1)] == PERFT_REFERENCE_COUNTS[name]
+    assert board.to_bytes() == position
+
+def test_divide_sums_up_to_perft():
+    board = TicTacToe_Board_2_layers.from_notation(PERFT_POSITIONS['forced-center'])
+    leaves_per_move = divide(board, 3)
+    assert sorted(leaves_per_move) == board.legal_moves()
+    assert sum(leaves_per_move.values()) == 532
+    assert perft(board, 0) == 1
@@ -0,0 +1,32 @@
+import pickle
+import random
+import sys
+import pytest
+from src.board import TicTacToe_Board_2_layers
+from src.position import Position
+
+def test_positions_round_trip_through_boards():
+    rng = random.Random(8)
+    board = TicTacToe_Board_2_layers()
+    assert Position.from_board(board) == Position()
+    while not board.is_game_over():
+        position = Position.from_board(board)
+        restored_board = position.to_board()
+        assert restored_board.to_bytes() == board.to_bytes() and restored_board.zobrist_hash == board.zobrist_hash
+        assert position.active_player == board.active_player and position.where_to_play_next == board.where_to_play_next
+        assert position.legal_moves() == board.legal_moves()
+        move = rng.choice(board.legal_moves())
+        board.push(move)
+        assert position.play(move) == Position.from_board(board)
+    assert Position.from_board(board).game_result == board.game_result
+
+def test_positions_are_hashable_ordered_and_immutable():
+    first = TicTacToe_Board_2_layers.from_notation('e5 e4 e2')
+    second = TicTacToe_Board_2_layers.from_bytes(first.to_bytes())
+    positions = {Position.from_board(first), Position.from_board(second), Position()}
+    assert len(positions) == 2 and sorted(positions)[0] == Position()
+    position = Position.from_board(first)
+    assert pickle.loads(pickle.dumps(position)) == position
+    with pytest.raises(AttributeError):
+        position.packed = 0
+    assert not hasattr(position, '__dict__') and sys.getsizeof(position) + sys.getsizeof(position.packed) < 120
@@ -0,0 +1,60 @@
+import pytest
+from src.board import TicTacToe_Board_2_layers
+from src.game import play_random_games
+from src.records import GameLog, GameLogWriter, read_games, replay
+
+def test_games_are_read_back_sequentially_and_randomly(tmp_path):
+    path = tmp_path / 'games.tttlog'
+    boards = list(play_random_games(20, seed=4))
+    with GameLogWriter(path) as writer:
+        for board in boards[:15]:
+            writer.write_board(board)
+    with GameLogWriter(path) as writer:  # Appending to an existing log.
+        assert writer.number_of_games == 15
+        for board in boards[15:]:
+            writer.write_board(board)
+        assert writer.write(bytes([40, 36])) == 20
+
+    # The index holds the offsets little-endian, whatever the byte order of the host.
+    index_bytes = (tmp_path / 'games.tttlog.idx').read_bytes()
+    assert index_bytes[:16] == (8).to_bytes(8, 'little') + (10 + len(boards[0].game_record())).to_bytes(8, 'little')
+
+    expected_games = [(board.game_record(), board.game_result) for board in boards] + [(bytes([40, 36]), None)]
+    assert list(read_games(path)) == expected_games
+
+    with GameLog(path) as game_log:
+        assert len(game_log) == 21
+        for game_index in [0, 14, 15, 19]:
+            moves = game_log[game_index]
+            assert isinstance(moves, memoryview) and moves == boards[game_index].game_record()
+            assert game_log.game_result(game_index) == boards[game_index].game_result
+            del moves
+        assert game_log.game_result(20) is None
+
+def test_replay_plays_the_game_move_by_move(tmp_path):
+    path = tmp_path / 'games.tttlog'
+    board = next(play_random_games(1, seed=9))
+    with GameLogWriter(path) as writer:
+        writer.write_board(board)
+    with GameLog(path) as game_log:
+        number_of_positions = 0
+        for number_of_positions, replayed_board in enumerate(game_log.replay(0), start=1):
+            assert replayed_board.to_bytes() == TicTacToe_Board_2_layers.from_game_record(board.game_record()[:number_of_positions]).to_bytes()
+        assert number_of_positions == len(board.game_record())
+        assert replayed_board.game_result == board.game_result
+    with pytest.raises(ValueError, match="Illegal move."):
+        list(replay(bytes([40, 40])))
+
+def test_invalid_files_are_rejected(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a game log')
+    with pytest.raises(ValueError, match="Invalid game log"):
+        GameLogWriter(path)
+    with pytest.raises(ValueError, match="Invalid game log"):
+        list(read_games(path))
+    path = tmp_path / 'truncated.tttlog'
+    with GameLogWriter(path) as writer:
+        writer.write(bytes([40, 36, 0]), 'X')
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="The file ends within a game."):
+        list(read_games(path))
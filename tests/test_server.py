@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src import server as server_module
+from src.server import GameServer, percentile, run_load_test
+
+def _run_with_server(test, **server_options):
+    async def run():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            server = await GameServer(port=0, executor=executor, **server_options).start()
+            try:
+                return await test(server)
+            finally:
+                await server.close()
+    return asyncio.run(run())
+
+def test_games_are_played_over_the_line_protocol():
+    async def test(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+
+        async def request(command):
+            writer.write(command.encode() + b'\n')
+            await writer.drain()
+            return (await reader.readline()).decode().rstrip('\n')
+
+        assert await request('NEW') == 'OK 1 - -'
+        assert await request('MOVE 1 e5') == 'OK 1 - -'
+        assert await request('MOVE 1 a1') == "ERR Illegal move 'a1'. Choose an empty cell in an allowed inner field."
+        assert (await request('MOVE 1 z9')).startswith("ERR Invalid move notation 'z9'.")
+        assert await request('STATE 1') == 'OK 1 O mid-mid - e5'
+        game_id, ai_move, result = (await request('NEW O random')).split()[1:]
+        assert game_id == '2' and ai_move == '-' and result == '-'
+        _, _, ai_move, result = (await request('MOVE 2 e5')).split()
+        assert ai_move[0] in 'def' and ai_move[1] in '456' and result == '-'
+        assert (await request('STATS')).startswith('OK games=2 moves=3 ')
+        assert await request('QUIT 2') == 'OK 2'
+        assert await request('STATE 2') == "ERR Unknown game '2'."
+        assert await request('JUMP') == "ERR Unknown command 'JUMP'. Use NEW, MOVE, STATE, QUIT or STATS."
+        writer.close()
+    _run_with_server(test)
+
+def test_ai_opens_as_x_and_inactive_games_expire():
+    async def test(server):
+        _, game_id, ai_move, _ = (await server.handle_command('NEW X greedy')).split()
+        assert (await server.handle_command(f'STATE {game_id}')).split()[5:] == [ai_move]
+        assert (await server.handle_command('NEW X minimax')).startswith("ERR Unknown agent 'minimax'")
+        assert (await server.handle_command('NEW O alphabeta:book=/nonexistent')).startswith("ERR Unknown agent")
+        assert server.expire_games() == 1 and not server.games
+    _run_with_server(test, session_timeout=0)
+
+def test_failed_ai_searches_are_reported():
+    async def test(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+
+        async def request(command):
+            writer.write(command.encode() + b'\n')
+            await writer.drain()
+            return (await reader.readline()).decode().rstrip('\n')
+
+        assert (await request('NEW X broken')).startswith("ERR AI search of game 1 failed (FileNotFoundError: ")
+        assert (await request('STATS')).startswith('OK games=0 ')
+        writer.close()
+    _run_with_server(test, agents={'broken': 'alphabeta:book=/nonexistent.tttbook'})
+
+def test_load_test_plays_concurrent_games():
+    async def test(server):
+        results = await run_load_test(server.host, server.port, 30, connections=4)
+        assert results['games'] == 30 and results['moves'] > 30 * 5
+        assert not server.games and server.statistics()['p99_ms'] >= server.statistics()['p50_ms'] > 0
+    _run_with_server(test)
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile(list(range(1, 101)), 0.5) == 50 and percentile(list(range(1, 101)), 0.99) == 99
+
+def test_worker_agent_cache_is_bounded():
+    server_module._worker_agents.clear()
+    for node_limit in range(1, server_module.WORKER_AGENT_CACHE_SIZE + 3):
+        assert 0 <= server_module._search_ai_move(b'', f'alphabeta:nodes={node_limit},tt=0.01') < 81
+    assert len(server_module._worker_agents) == server_module.WORKER_AGENT_CACHE_SIZE
+    assert 'alphabeta:nodes=1,tt=0.01' not in server_module._worker_agents
+    server_module._worker_agents.clear()
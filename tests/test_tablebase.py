@@ -0,0 +1,80 @@
+import pytest
+import src.tablebase as tablebase_module
+from src.board import TicTacToe_Board_2_layers
+from src.engine import WIN_SCORE, AlphaBetaEngine
+from src.tablebase import Tablebase, TablebaseEngine, build_tablebase, open_cells_mask, sample_endgames
+
+@pytest.fixture
+def tablebase_path(tmp_path):
+    path = tmp_path / 'endgame.tttbase'
+    assert build_tablebase(path, max_open_cells=4, seed_boards=sample_endgames(20, 4)) > 20
+    return path
+
+def test_probe_matches_a_full_search(tablebase_path):
+    engine = AlphaBetaEngine(time_limit=None)
+    with Tablebase(tablebase_path) as tablebase:
+        assert tablebase.max_open_cells == 4
+        for board in sample_endgames(20, 4):
+            score = engine.search(board).score
+
+            # The same entry, mapped to each orientation of the position.
+            for symmetry in range(8):
+                twin = board.transform(symmetry)
+                winner, move, distance = twin.probe(tablebase)
+                assert twin.is_legal_move(move)
+                if score == 0:
+                    assert winner == twin.DRAW_SYMBOL
+                else:
+                    assert (winner == twin.active_player) == (score > 0) and abs(score) == WIN_SCORE - distance
+
+def test_probe_solves_endgames_missing_in_the_file(tablebase_path):
+    engine = AlphaBetaEngine(time_limit=None)
+    unseeded_boards = list(sample_endgames(30, 4, seed=2))
+    with Tablebase(tablebase_path, solve_misses=False) as tablebase:
+        file_hits = sum(board.probe(tablebase) is not None for board in unseeded_boards)
+    assert file_hits < len(unseeded_boards)
+
+    # Every miss is solved exactly, using the entries of the file for the positions reachable from it.
+    with Tablebase(tablebase_path) as tablebase:
+        number_of_file_entries = len(tablebase)
+        for board in unseeded_boards:
+            winner, move, distance = board.probe(tablebase)
+            score = engine.search(board).score
+            assert board.is_legal_move(move)
+            assert winner == board.DRAW_SYMBOL if score == 0 else abs(score) == WIN_SCORE - distance
+        assert len(tablebase) > number_of_file_entries
+        assert tablebase.save() == len(tablebase)
+
+    # The solved positions were saved to the file.
+    with Tablebase(tablebase_path, solve_misses=False) as tablebase:
+        assert all(board.probe(tablebase) is not None for board in unseeded_boards)
+
+def test_full_cache_evicts_the_positions_solved_first(tablebase_path, monkeypatch):
+    monkeypatch.setattr(tablebase_module, 'SOLVED_CACHE_SIZE', 50)
+    unseeded_boards = list(sample_endgames(30, 4, seed=2))
+    with Tablebase(tablebase_path) as tablebase:
+        number_of_file_entries = len(tablebase)
+        for board in unseeded_boards:
+            assert board.probe(tablebase) is not None
+            assert len(tablebase) - number_of_file_entries <= 50
+
+        # The positions of the last probe are kept.
+        last_key = tablebase_module.endgame_key(unseeded_boards[-1])[0]
+        assert last_key in tablebase._solved_entries
+
+def test_positions_outside_the_tablebase_are_searched(tablebase_path):
+    with Tablebase(tablebase_path) as tablebase:
+        board = TicTacToe_Board_2_layers.from_notation('e5 e4 e2')
+        assert open_cells_mask(board).bit_count() == 78 and board.probe(tablebase) is None
+
+        engine = TablebaseEngine(tablebase, AlphaBetaEngine(time_limit=None, max_depth=2))
+        assert engine.search(board).nodes > 0
+        assert engine.search(next(sample_endgames(20, 4))).nodes == 0
+
+def test_invalid_tablebase_is_rejected(tmp_path):
+    path = tmp_path / 'opening.tttbook'
+    path.write_bytes(b'TTT2BOOK\x04')
+    with pytest.raises(ValueError):
+        Tablebase(path)
+    with pytest.raises(ValueError):
+        build_tablebase(tmp_path / 'endgame.tttbase', max_open_cells=0)
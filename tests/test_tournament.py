@@ -0,0 +1,64 @@
+import json
+import time
+import pytest
+from src.tournament import (ResultWriter, create_agent, elo_difference, play_tournament, schedule_games, summarize,
+                            validate_agent_spec)
+
+def test_elo_difference():
+    assert elo_difference(10, 0, 10) == (0.0, pytest.approx(-163, abs=1), pytest.approx(163, abs=1))
+    elo, elo_low, elo_high = elo_difference(75, 0, 25)
+    assert elo == pytest.approx(190.8, abs=0.1) and elo_low < elo < elo_high
+    assert elo_difference(0, 0, 5)[0] == float('-inf')
+
+def test_schedule_alternates_colors_with_shared_openings():
+    tasks = schedule_games(['random', 'greedy', 'alphabeta:depth=1'], 4)
+    assert len(tasks) == 12 and [task[0] for task in tasks] == list(range(12))
+    assert [task[1:3] for task in tasks[:2]] == [('random', 'greedy'), ('greedy', 'random')]
+    assert tasks[0][3] == tasks[1][3] != tasks[2][3]
+
+def test_tournament_standings_and_process_pool():
+    records = list(play_tournament(['random', 'greedy'], 6, workers=1, seed=3))
+    assert [record['game'] for record in records] == list(range(6))
+    pool_records = sorted(play_tournament(['random', 'greedy'], 6, workers=2, seed=3), key=lambda record: record['game'])
+    assert [record['moves'] for record in pool_records] == [record['moves'] for record in records]
+    assert {record['pairing'] for record in pool_records} == {0}
+
+    standings = summarize(records)
+    random_standing, greedy_standing = standings['agents']['random'], standings['agents']['greedy']
+    assert random_standing['games'] == greedy_standing['games'] == 6
+    assert random_standing['wins'] == greedy_standing['losses'] and random_standing['draws'] == greedy_standing['draws']
+    assert greedy_standing['nodes_per_second'] > 0 and greedy_standing['latency'] > 0
+    assert standings['pairings'][('random', 'greedy')]['wins'] == random_standing['wins']
+    assert summarize(reversed(records))['pairings'] == standings['pairings']
+
+def test_invalid_agents_are_rejected():
+    with pytest.raises(ValueError, match="Unknown agent 'minimax'"):
+        create_agent('minimax')
+    with pytest.raises(ValueError, match="Unknown options of agent 'mcts': depth."):
+        create_agent('mcts:depth=3')
+    with pytest.raises(ValueError):
+        play_tournament(['random', 'random'], 2)
+
+    # Validation does not open the book, only the agents playing the games do.
+    assert validate_agent_spec('alphabeta:depth=3,book=missing.tttbook') == ('alphabeta', {'depth': 3, 'book': 'missing.tttbook'})
+    with pytest.raises(ValueError, match="Invalid value 'deep' of option 'depth'"):
+        play_tournament(['random', 'alphabeta:depth=deep'], 2)
+
+def test_results_are_streamed_to_csv_and_jsonl(tmp_path):
+    records = list(play_tournament(['random', 'greedy'], 2))
+    for file_name in ['results.csv', 'results.jsonl']:
+        with ResultWriter(str(tmp_path / file_name)) as writer:
+            for record in records:
+                writer.write(record)
+    assert (tmp_path / 'results.csv').read_text().splitlines()[0].startswith('game,pairing,x,o,seed,result')
+    assert [json.loads(line) for line in (tmp_path / 'results.jsonl').read_text().splitlines()] == records
+    with pytest.raises(ValueError):
+        ResultWriter(str(tmp_path / 'results.txt'))
+
+def test_stopping_early_cancels_the_queued_games():
+    # Playing all 200 games takes minutes, stopping after the first one does not wait for them.
+    start_time = time.perf_counter()
+    records = play_tournament(['greedy', 'alphabeta:time=0.05'], 200, workers=2)
+    assert next(records)['moves']
+    records.close()
+    assert time.perf_counter() - start_time < 30
@@ -0,0 +1,32 @@
+import pytest
+from src.transposition import TranspositionTable
+
+def test_store_and_probe_round_trip():
+    table = TranspositionTable(size_mb=1)
+    table.store(123456789, 5, -42, TranspositionTable.LOWER_BOUND, 80)
+    table.store(987654321, 0, 999999, TranspositionTable.EXACT)
+    assert table.probe(123456789) == (5, -42, TranspositionTable.LOWER_BOUND, 80)
+    assert table.probe(987654321) == (0, 999999, TranspositionTable.EXACT, None)
+    assert table.probe(555) is None
+    assert (table.probes, table.hits) == (3, 2)
+
+def test_memory_cap_bounds_the_number_of_entries():
+    table = TranspositionTable(size_mb=1)
+    assert table.size_bytes <= 1024 * 1024
+    assert table.number_of_buckets == 1024 * 1024 // 32
+    with pytest.raises(ValueError, match="Invalid size."):
+        TranspositionTable(size_mb=0)
+
+def test_depth_preferred_and_always_replace_slots():
+    table = TranspositionTable(size_mb=32 / (1024 * 1024))  # A single bucket.
+    table.store(1, 6, 10, TranspositionTable.EXACT, 4)
+    table.store(2, 2, 20, TranspositionTable.EXACT, 5)
+    table.store(3, 1, 30, TranspositionTable.EXACT, 6)
+    # The deep entry survives, the always-replace slot holds the latest shallow entry.
+    assert table.probe(1) == (6, 10, TranspositionTable.EXACT, 4)
+    assert table.probe(2) is None
+    assert table.probe(3) == (1, 30, TranspositionTable.EXACT, 6)
+    table.store(4, 7, 40, TranspositionTable.UPPER_BOUND, 7)
+    assert table.probe(4) == (7, 40, TranspositionTable.UPPER_BOUND, 7)
+    table.clear()
+    assert table.probe(4) is None